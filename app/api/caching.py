@@ -0,0 +1,190 @@
+"""
+HTTP Conditional Caching
+Weak ETags derived from data watermarks, so unchanged pages, partials and
+API responses are answered with 304 Not Modified before any query runs.
+
+A validator combines:
+- the request path and query string (minus per-page tokens),
+- the current date (every view is a window relative to today),
+- the product's or lot's data watermark (latest REGIST_DATE),
+- the settings version (active products, yield targets),
+- the release id (changes when code or templates change).
+"""
+import hashlib
+from datetime import date
+from typing import Iterable, Optional
+
+from fastapi import Request, Response
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import GZipMiddleware as _GZipMiddleware
+from starlette.middleware.gzip import GZipResponder, IdentityResponder
+
+from app.core.config import settings
+from app.core.release import RELEASE_ID
+from app.services.cache import TTLCache
+
+# Query parameters that identify server-side state rather than content
+IGNORED_PARAMS = {"stats_token"}
+
+CACHE_CONTROL = "private, no-cache"
+
+# Any response may be gzipped by the middleware, which only adds Vary to the
+# responses it compresses; a 304 has to repeat what the 200 would carry
+VARY = "Accept-Encoding"
+
+# Watermark queries are cheap but not free; share results briefly
+watermark_cache = TTLCache(maxsize=1024, ttl=settings.WATERMARK_TTL_SECONDS, name="watermarks", shared=True)
+
+
+def product_watermark(db_service, product_id: str) -> Optional[str]:
+    key = ("product", product_id)
+    watermark = watermark_cache.get(key)
+    if watermark is None:
+        watermark = db_service.get_product_watermark(product_id)
+        if watermark is not None:
+            watermark_cache.set(key, watermark)
+    return watermark
+
+
+def lot_watermark(db_service, lot_id: str) -> Optional[str]:
+    key = ("lot", lot_id)
+    watermark = watermark_cache.get(key)
+    if watermark is None:
+        watermark = db_service.get_lot_watermark(lot_id)
+        if watermark is not None:
+            watermark_cache.set(key, watermark)
+    return watermark
+
+
+def make_etag(request: Request, *parts) -> str:
+    """Weak ETag for a request given its data versions"""
+    params = sorted(
+        (k, v) for k, v in request.query_params.multi_items() if k not in IGNORED_PARAMS
+    )
+    digest = hashlib.blake2b(digest_size=12)
+    for part in (RELEASE_ID, request.url.path, params, date.today().isoformat(), *parts):
+        digest.update(repr(part).encode())
+        digest.update(b"\0")
+    return f'W/"{digest.hexdigest()}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:]
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def not_modified(request: Request, etag: Optional[str], vary: str = VARY) -> Optional[Response]:
+    """
+    304 response if the client's cached copy is still current, else None
+
+    Carries the ETag, Cache-Control and Vary the full response would have
+    (RFC 9110 15.4.5), so caches keep storing the variants separately.
+    """
+    if etag is None:
+        return None
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL, "Vary": vary})
+    return None
+
+
+def accepts_encoding(headers, coding: str) -> bool:
+    """Whether Accept-Encoding allows a content coding (q=0 means "not acceptable")"""
+    qualities = {}
+    for item in headers.get("accept-encoding", "").split(","):
+        name, _, params = item.partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if name.strip():
+            qualities[name.strip().lower()] = q
+    return qualities.get(coding, qualities.get("*", 0.0)) > 0
+
+
+class GZipMiddleware(_GZipMiddleware):
+    """
+    Starlette's GZip with q-values honoured and a de-duplicated Vary
+
+    Starlette looks for "gzip" anywhere in Accept-Encoding (so gzip;q=0
+    still compresses) and appends Accept-Encoding to a Vary the route
+    already set.
+    """
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_vary(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                if "vary" in headers:
+                    tokens = {}
+                    for token in ",".join(headers.getlist("vary")).split(","):
+                        if token.strip():
+                            tokens.setdefault(token.strip().lower(), token.strip())
+                    del headers["vary"]
+                    headers["Vary"] = ", ".join(tokens.values())
+            await send(message)
+
+        if accepts_encoding(Headers(scope=scope), "gzip"):
+            responder = GZipResponder(self.app, self.minimum_size, compresslevel=self.compresslevel)
+        else:
+            responder = IdentityResponder(self.app, self.minimum_size)
+        await responder(scope, receive, send_with_vary)
+
+
+def set_validators(response: Response, etag: Optional[str], vary: Optional[str] = None) -> Response:
+    if etag is not None:
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = CACHE_CONTROL
+    if vary is not None and "vary" not in response.headers:
+        response.headers["Vary"] = vary
+    return response
+
+
+def product_version(db_service, settings_service, product_id: str) -> Optional[tuple]:
+    """
+    What a product's computed views depend on: its watermark, the settings
+    version and today's date. None when the watermark is unknown.
+    """
+    try:
+        watermark = product_watermark(db_service, product_id)
+        if watermark is None:
+            return None
+        return (watermark, settings_service.settings_version(), date.today().isoformat())
+    except Exception as e:
+        print(f"Data version lookup failed: {e}")
+        return None
+
+
+def product_etag(request: Request, db_service, settings_service, product_ids: Iterable[str], *parts) -> Optional[str]:
+    """ETag for views over one or more products; None when any watermark is unknown"""
+    try:
+        watermarks = [product_watermark(db_service, p) for p in product_ids]
+        if any(w is None for w in watermarks):
+            return None
+        return make_etag(request, watermarks, settings_service.settings_version(), *parts)
+    except Exception as e:
+        print(f"ETag computation failed: {e}")
+        return None
+
+
+def lot_etag(request: Request, db_service, lot_id: str, *parts) -> Optional[str]:
+    """ETag for views over a single lot's wafers"""
+    try:
+        watermark = lot_watermark(db_service, lot_id)
+        return None if watermark is None else make_etag(request, watermark, *parts)
+    except Exception as e:
+        print(f"ETag computation failed: {e}")
+        return None
@@ -0,0 +1,67 @@
+"""
+Request Cancellation (HTTP)
+Cancels a handler's work when the client disconnects, or when a newer
+request from the same browser tab targets the same element: HTMX sends
+HX-Target, and base.html adds a per-tab X-Client-Id to every request.
+
+Cancelled handlers answer 204 No Content, which HTMX does not swap.
+"""
+import asyncio
+import functools
+from typing import Hashable, Optional
+
+from fastapi import Request, Response
+
+from app.services import metrics
+from app.services.cancellation import (
+    CancelToken, Cancelled, reset_current_token, set_current_token, supersede_registry
+)
+
+DISCONNECT_POLL_SECONDS = 0.1
+
+
+def supersede_key(request: Request) -> Optional[Hashable]:
+    client_id = request.headers.get("x-client-id")
+    target = request.headers.get("hx-target")
+    if not client_id or not target:
+        return None
+    return (client_id, target)
+
+
+async def _watch_disconnect(request: Request, token: CancelToken):
+    while not token.cancelled:
+        if await request.is_disconnected():
+            token.cancel("disconnected")
+            return
+        await asyncio.sleep(DISCONNECT_POLL_SECONDS)
+
+
+def cancellable(handler):
+    """
+    Route decorator (below @router.get): runs the handler under a CancelToken
+
+    The token follows run_in_threadpool into the DB and analytics work;
+    handlers call check_cancelled() between expensive steps.
+    """
+
+    @functools.wraps(handler)
+    async def wrapper(*args, **kwargs):
+        request: Request = kwargs["request"]
+        token = CancelToken()
+        key = supersede_key(request)
+        if key is not None:
+            supersede_registry.register(key, token)
+        watcher = asyncio.create_task(_watch_disconnect(request, token))
+        reset = set_current_token(token)
+        try:
+            return await handler(*args, **kwargs)
+        except Cancelled:
+            metrics.cancelled_requests.inc((handler.__name__, token.reason or "cancelled"))
+            return Response(status_code=204)
+        finally:
+            reset_current_token(reset)
+            watcher.cancel()
+            if key is not None:
+                supersede_registry.release(key, token)
+
+    return wrapper
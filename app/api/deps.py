@@ -1,20 +1,44 @@
 from app.core.config import settings
-from app.services.mock_db import mock_db_service
+from app.services.mock_db import mock_db_service, mock_settings_service
 
-# Lazy import to avoid import errors if oracledb is not installed or configured
-# In a real app, we might handle this differently.
-try:
-    from app.services.oracle_db import oracle_db_service
-except ImportError:
-    oracle_db_service = None
+def get_db_backend() -> str:
+    """Selected backend name (mock, oracle or sqlite)"""
+    if settings.DB_BACKEND:
+        return settings.DB_BACKEND.lower()
+    return "mock" if settings.USE_MOCK_DB else "oracle"
+
+_latency_wrappers = {}
 
 def get_db_service():
-    if settings.USE_MOCK_DB:
+    service = _get_backend_service()
+    if settings.DB_LATENCY_INJECTION:
+        from app.services.latency_injection import LatencyInjectingDBService
+        key = id(service)
+        if key not in _latency_wrappers:
+            _latency_wrappers[key] = LatencyInjectingDBService(service)
+        return _latency_wrappers[key]
+    return service
+
+def _get_backend_service():
+    backend = get_db_backend()
+    if backend == "mock":
         return mock_db_service
     
-    if oracle_db_service:
+    if backend == "sqlite":
+        from app.services.sqlite_db import sqlite_db_service
+        return sqlite_db_service
+    
+    # Imported on first use: SQLAlchemy is only needed by the SQL backends
+    try:
+        from app.services.oracle_db import oracle_db_service
         return oracle_db_service
-    else:
+    except ImportError:
         # Fallback to mock if oracle service failed to load (e.g. missing lib)
         print("Warning: OracleDBService not available, falling back to MockDBService")
         return mock_db_service
+
+def get_settings_service():
+    """Products and yield targets: in-memory for mock, settings store otherwise"""
+    if get_db_backend() == "mock":
+        return mock_settings_service
+    return get_db_service()
@@ -0,0 +1,64 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from datetime import date, timedelta
+from typing import Optional
+from app.api.deps import get_db_service
+from app.services import export
+
+router = APIRouter()
+
+@router.get("/cp")
+def export_cp_data(
+    product_id: str,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    format: str = "csv",
+    batch_size: int = 5000,
+    db_service = Depends(get_db_service)
+):
+    """
+    Stream CP header + bin data for a product over whole days [start_date, end_date]
+    
+    Rows are read with a server-side cursor in fetchmany batches and written
+    out batch by batch, so memory stays flat and the first bytes arrive
+    before the query has finished.
+    """
+    if format not in export.FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(export.FORMATS)}")
+    if not end_date:
+        end_date = date.today()
+    if not start_date:
+        start_date = end_date - timedelta(days=30)
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date is after end_date")
+    batch_size = max(100, min(batch_size, 50_000))
+    
+    bin_keys = []
+    if format != "ndjson":
+        try:
+            bin_keys = db_service.get_export_bin_keys(product_id, start_date, end_date)
+        except Exception as e:
+            print(f"Export Error getting bin keys: {e}")
+            raise HTTPException(status_code=503, detail="Database unavailable")
+    
+    def batches():
+        try:
+            yield from db_service.iter_cp_export(product_id, start_date, end_date, batch_size)
+        except Exception as e:
+            # Headers (200) are already sent; re-raise so the server aborts the
+            # response without the closing chunk and the client sees a failed
+            # download rather than a truncated file that looks complete
+            print(f"Export Error streaming {product_id}: {e}")
+            raise
+    
+    if format == "csv":
+        body = export.iter_csv(batches(), bin_keys)
+    elif format == "columnar":
+        body = export.iter_columnar(batches(), bin_keys)
+    else:
+        body = export.iter_ndjson(batches())
+    
+    filename = export.export_filename(product_id, start_date, end_date, format)
+    return StreamingResponse(body, media_type=export.FORMATS[format], headers={
+        "Content-Disposition": f'attachment; filename="{filename}"'
+    })
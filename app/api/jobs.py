@@ -0,0 +1,71 @@
+import asyncio
+import json
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse, StreamingResponse
+from pydantic import BaseModel
+from typing import Any, Dict
+from app.api.responses import FastJSONResponse
+from app.services.jobs import DONE, JobQueueFull, job_queue
+import app.services.analytics_jobs  # registers the job kinds
+
+router = APIRouter()
+
+# Suggested wait when the queue is full
+JOB_RETRY_AFTER_SECONDS = 30
+
+class JobRequest(BaseModel):
+    kind: str  # trend, export, stacked_map
+    params: Dict[str, Any] = {}
+
+def _get_job(job_id: str):
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job
+
+@router.post("", status_code=202)
+def submit_job(body: JobRequest):
+    """Queue a job; an identical queued, running or retained job is returned instead"""
+    try:
+        job = job_queue.submit(body.kind, body.params)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(JOB_RETRY_AFTER_SECONDS)})
+    return job.to_dict()
+
+@router.get("/{job_id}")
+def get_job(job_id: str):
+    return _get_job(job_id).to_dict()
+
+@router.delete("/{job_id}")
+def cancel_job(job_id: str):
+    return job_queue.cancel(_get_job(job_id).id).to_dict()
+
+@router.get("/{job_id}/result")
+def get_job_result(job_id: str):
+    job = _get_job(job_id)
+    if job.status != DONE:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    if job.kind == "export":
+        return FileResponse(job.result["path"], media_type=job.result["media_type"], filename=job.result["filename"])
+    return FastJSONResponse(job.result)
+
+@router.get("/{job_id}/events")
+async def job_events(request: Request, job_id: str):
+    """Server-Sent Events: a "progress" event on every change, until the job finishes"""
+    job = _get_job(job_id)
+    
+    async def stream():
+        last = None
+        while not await request.is_disconnected():
+            state = job.to_dict()
+            snapshot = (state["status"], state["progress"], state["message"])
+            if snapshot != last:
+                last = snapshot
+                yield f"event: progress\ndata: {json.dumps(state)}\n\n"
+            if job.finished:
+                break
+            await asyncio.sleep(0.5)
+    
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
@@ -0,0 +1,149 @@
+"""
+Metrics API
+Server-Timing middleware and a Prometheus text endpoint with request and
+span latency histograms, DB pool usage, cache hit rates and job/live-feed
+gauges.
+"""
+import time
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from starlette.datastructures import MutableHeaders
+
+from app.core.config import settings
+from app.services import metrics
+from app.services.cache import caches
+from app.services.jobs import job_queue
+from app.services.shared_cache import get_shared_cache
+from app.services.live_yield import live_yield_hub
+
+router = APIRouter()
+
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _handler_name(scope) -> str:
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return "unmatched"
+    return getattr(endpoint, "__name__", type(endpoint).__name__)
+
+
+class ServerTimingMiddleware:
+    """
+    Collects spans per request, sends them as a Server-Timing header and
+    records the request in the latency histogram
+
+    Spans finishing after the headers went out (streamed bodies) still
+    reach the histograms, just not the header.
+    """
+
+    def __init__(self, app, header: bool = True):
+        self.app = app
+        self.header = header
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        spans, token = metrics.start_request()
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.header:
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", metrics.server_timing(spans, time.perf_counter() - started))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            metrics.end_request(token)
+            metrics.request_seconds.observe(
+                (scope["method"], _handler_name(scope), str(status)),
+                time.perf_counter() - started
+            )
+
+
+def _pool_samples():
+    """Connection pool usage of the active DB service, if it has an engine yet"""
+    from app.api.deps import get_db_backend, get_db_service
+
+    service = get_db_service()
+    # Unwrap the latency-injection proxy
+    service = getattr(service, "inner", service)
+    engine = getattr(service, "_engine", None)
+    pool = getattr(engine, "pool", None)
+    if pool is None:
+        return []
+    backend = get_db_backend()
+    if not hasattr(pool, "checkedout"):
+        return []
+    return [
+        ({"backend": backend, "state": "size"}, pool.size()),
+        ({"backend": backend, "state": "checked_out"}, pool.checkedout()),
+        ({"backend": backend, "state": "idle"}, pool.checkedin()),
+        # Negative while the base pool is not yet full
+        ({"backend": backend, "state": "overflow"}, max(0, pool.overflow())),
+        # Most connections this worker will open (DB_POOL_SIZE + DB_POOL_MAX_OVERFLOW)
+        ({"backend": backend, "state": "limit"}, pool.size() + settings.DB_POOL_MAX_OVERFLOW),
+    ]
+
+
+def render_metrics() -> str:
+    lines = []
+    lines += metrics.request_seconds.render()
+    lines += metrics.span_seconds.render()
+    lines += metrics.db_rows.render()
+
+    lines += metrics.sample_lines("sonar_db_pool_connections", "DB connection pool usage", _pool_samples())
+    lines += metrics.db_pool_wait_seconds.render()
+    lines += metrics.db_connect_seconds.render()
+    lines += metrics.db_pool_timeouts.render()
+    lines += metrics.db_pool_invalidations.render()
+    lines += metrics.singleflight_calls.render()
+    lines += metrics.cancelled_requests.render()
+    lines += metrics.jobs_finished.render()
+
+    cache_stats = sorted((c.stats() for c in list(caches)), key=lambda s: s["name"])
+    lines += metrics.sample_lines(
+        "sonar_cache_hits_total", "Cache hits", [({"cache": s["name"]}, s["hits"]) for s in cache_stats], kind="counter"
+    )
+    lines += metrics.sample_lines(
+        "sonar_cache_misses_total", "Cache misses", [({"cache": s["name"]}, s["misses"]) for s in cache_stats], kind="counter"
+    )
+    lines += metrics.sample_lines(
+        "sonar_cache_shared_hits_total", "Local misses served by the host-wide shared cache",
+        [({"cache": s["name"]}, s["shared_hits"]) for s in cache_stats], kind="counter"
+    )
+    lines += metrics.sample_lines("sonar_cache_hit_ratio", "Cache hit ratio since start", [({"cache": s["name"]}, s["hit_rate"]) for s in cache_stats])
+    lines += metrics.sample_lines("sonar_cache_entries", "Entries held per cache", [({"cache": s["name"]}, s["size"]) for s in cache_stats])
+
+    shared = get_shared_cache()
+    if shared is not None:
+        shared_stats = shared.stats()
+        lines += metrics.sample_lines("sonar_shared_cache_entries", "Entries in the host-wide shared cache", [({}, shared_stats["entries"])])
+        lines += metrics.sample_lines("sonar_shared_cache_bytes", "Encoded bytes in the host-wide shared cache", [({}, shared_stats["bytes"])])
+        lines += metrics.sample_lines(
+            "sonar_shared_cache_evictions_total", "Shared cache entries evicted or expired by this worker", [({}, shared_stats["evictions"])], kind="counter"
+        )
+
+    job_stats = job_queue.stats()
+    lines += metrics.sample_lines("sonar_jobs", "Tracked background jobs by status", [
+        ({"status": status}, count) for status, count in sorted(job_stats.items()) if status != "jobs"
+    ])
+    hub_stats = live_yield_hub.stats()
+    lines += metrics.sample_lines("sonar_live_feeds", "Products with a live yield poller", [({}, hub_stats["products"])])
+    lines += metrics.sample_lines("sonar_live_subscribers", "Connected live yield subscribers", [({}, hub_stats["subscribers"])])
+    return "\n".join(lines) + "\n"
+
+
+@router.get("", response_class=PlainTextResponse)
+def get_metrics():
+    """Prometheus text exposition"""
+    return PlainTextResponse(render_metrics(), media_type=PROMETHEUS_MEDIA_TYPE)
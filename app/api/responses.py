@@ -0,0 +1,82 @@
+"""
+Fast JSON Responses
+For payloads the app built itself: no response_model re-validation, and
+NumPy scalars/arrays serialized directly. Uses orjson when installed,
+otherwise the standard library encoder with a NumPy-aware default.
+
+Both encoders write UTF-8 as is and NaN/Infinity as null (which JSON has
+no token for), so the output does not depend on which one is installed.
+"""
+import json
+import math
+from datetime import date, datetime
+from typing import Any
+
+import numpy as np
+from fastapi import Response
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _finite(value: Any) -> Any:
+    """value with non-finite floats (NumPy included) replaced by None"""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {k: _finite(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(v) for v in value]
+    if isinstance(value, (np.ndarray, np.generic)):
+        return _finite(value.tolist())
+    if isinstance(value, BaseModel):
+        return _finite(value.model_dump(mode="json"))
+    return value
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=_ORJSON_OPTIONS)
+else:
+    def dumps(content: Any) -> bytes:
+        try:
+            return json.dumps(
+                content, default=_default, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+            ).encode()
+        except ValueError:
+            # Rare: only payloads holding NaN/Infinity pay for the extra pass
+            return json.dumps(
+                _finite(content), default=_default, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+            ).encode()
+
+
+class FastJSONResponse(Response):
+    """
+    JSONResponse for trusted, self-constructed content
+
+    Returning it from a route bypasses the route's response_model, which
+    then only documents the shape in OpenAPI.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
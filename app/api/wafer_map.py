@@ -1,17 +1,47 @@
-from fastapi import APIRouter, Depends
+import zlib
+from fastapi import APIRouter, Depends, Request, Response
 from app.models.wafer_map import WaferMapResponse
 from app.api.deps import get_db_service
-from typing import List
+from app.api.caching import accepts_encoding, lot_etag, not_modified, set_validators
+from app.api.responses import FastJSONResponse
+from app.services import wafer_codec
+from typing import List, Optional
 
 router = APIRouter()
 
+# JSON and binary are negotiated on Accept as well as encoding
+VARY = "Accept, Accept-Encoding"
+
+def wants_binary(request: Request, format: Optional[str]) -> bool:
+    """Binary wire format via ?format=binary or Accept: application/vnd.sonar.wafermap"""
+    return format == "binary" or wafer_codec.MEDIA_TYPE in request.headers.get("accept", "")
+
+def binary_response(request: Request, body: bytes) -> Response:
+    """Packed wafer maps, deflated at the HTTP layer when the client accepts it"""
+    headers = {"Vary": VARY}
+    if accepts_encoding(request.headers, "deflate"):
+        body = zlib.compress(body, 6)
+        headers["Content-Encoding"] = "deflate"
+    return Response(content=body, media_type=wafer_codec.MEDIA_TYPE, headers=headers)
+
 @router.get("/map", response_model=WaferMapResponse)
 def get_wafer_map(
+    request: Request,
     lot_id: str,
     wafer_id: int,
+    format: Optional[str] = None,
     db_service = Depends(get_db_service)
 ):
-    return db_service.get_wafer_map(lot_id, wafer_id)
+    binary = wants_binary(request, format)
+    etag = lot_etag(request, db_service, lot_id, binary)
+    cached = not_modified(request, etag, VARY)
+    if cached:
+        return cached
+    wafer = db_service.get_wafer_map(lot_id, wafer_id).model_dump()
+    if binary:
+        body = b"".join(wafer_codec.encode_wafer(wafer_codec.as_arrays(wafer)))
+        return set_validators(binary_response(request, body), etag)
+    return set_validators(FastJSONResponse(wafer), etag, VARY)
 
 @router.get("/lots", response_model=List[str])
 def get_lots(
@@ -22,7 +52,18 @@ def get_lots(
 
 @router.get("/lot_maps", response_model=List[WaferMapResponse])
 def get_lot_wafer_maps(
+    request: Request,
     lot_id: str,
+    format: Optional[str] = None,
     db_service = Depends(get_db_service)
 ):
-    return db_service.get_lot_wafer_maps(lot_id)
+    binary = wants_binary(request, format)
+    etag = lot_etag(request, db_service, lot_id, binary)
+    cached = not_modified(request, etag, VARY)
+    if cached:
+        return cached
+    # Straight from NumPy buffers: no int lists, no pydantic validation
+    wafers = db_service.get_lot_wafer_arrays(lot_id)
+    if binary:
+        return set_validators(binary_response(request, wafer_codec.encode_lot(wafers)), etag)
+    return set_validators(FastJSONResponse(wafers), etag, VARY)
@@ -1,15 +1,22 @@
-from fastapi import APIRouter, Query, Depends
+import asyncio
+from fastapi import APIRouter, Query, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from datetime import date, timedelta
 from typing import Optional, List, Any
 from pydantic import BaseModel
-from app.models.yield_data import YieldTrendResponse
-from app.api.deps import get_db_service
+from app.core.config import settings
+from app.models.yield_data import YieldTrendBatchRequest, YieldTrendBatchResponse, YieldTrendResponse
+from app.api.deps import get_db_service, get_settings_service
+from app.api.caching import not_modified, product_etag, set_validators
+from app.api.responses import FastJSONResponse
 from app.services.analytics import analytics_service
+from app.services import yield_batch
 
 router = APIRouter()
 
 @router.get("/trend", response_model=YieldTrendResponse)
 def get_yield_trend(
+    request: Request,
     product_id: str,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
@@ -19,6 +26,11 @@ def get_yield_trend(
         end_date = date.today()
     if not start_date:
         start_date = end_date - timedelta(days=30)
+    
+    etag = product_etag(request, db_service, get_settings_service(), [product_id])
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
         
     # Get data using injected service
     data = db_service.get_cp_yield_trend(product_id, start_date, end_date)
@@ -27,14 +39,56 @@ def get_yield_trend(
     stats = analytics_service.calculate_yield_stats(data)
     
     # Inject dynamic target from settings
-    from app.services.mock_db import mock_settings_service
-    target = mock_settings_service.get_target(product_id, start_date.strftime("%Y-%m") if start_date else None)
+    target = get_settings_service().get_target(product_id, start_date.strftime("%Y-%m") if start_date else None)
     stats['target'] = target
 
-    return YieldTrendResponse(
-        product_id=product_id,
-        start_date=start_date,
-        end_date=end_date,
-        daily_trends=stats.get('daily_trends', []),
-        statistics=stats
+    # Built here from analytics output: serialize directly, skip re-validation
+    return set_validators(FastJSONResponse({
+        "product_id": product_id,
+        "start_date": start_date,
+        "end_date": end_date,
+        "daily_trends": stats.get('daily_trends', []),
+        "statistics": stats
+    }), etag)
+
+
+@router.post("/trend/batch", response_model=YieldTrendBatchResponse)
+async def get_yield_trend_batch(
+    request: Request,
+    batch: YieldTrendBatchRequest,
+    format: Optional[str] = Query(default=None, description="json (default) or ndjson"),
+    db_service = Depends(get_db_service)
+):
+    """
+    Yield trends for many (product_id, start_date, end_date) specs
+    
+    Overlapping ranges of a product are fetched once and run concurrently
+    on a bounded pool. NDJSON (format=ndjson or Accept: application/x-ndjson)
+    streams one result per line as soon as its range completes; each line
+    carries the index of its spec.
+    """
+    if len(batch.specs) > settings.YIELD_BATCH_MAX_SPECS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.YIELD_BATCH_MAX_SPECS} specs per batch"
+        )
+    
+    ranges = yield_batch.plan_ranges(batch.specs)
+    futures = yield_batch.submit_batch(db_service, get_settings_service().get_target, ranges)
+    
+    ndjson = format == "ndjson" or "application/x-ndjson" in request.headers.get("accept", "")
+    if ndjson:
+        async def stream():
+            for next_done in asyncio.as_completed([asyncio.wrap_future(f) for f in futures]):
+                for line in yield_batch.iter_ndjson(await next_done):
+                    yield line
+        
+        return StreamingResponse(stream(), media_type="application/x-ndjson", headers={
+            "X-Batch-Queries": str(len(ranges))
+        })
+    
+    await asyncio.gather(*(asyncio.wrap_future(f) for f in futures))
+    return YieldTrendBatchResponse(
+        results=yield_batch.ordered_results(futures, len(batch.specs)),
+        queries=len(ranges)
     )
@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -6,10 +7,76 @@ class Settings(BaseSettings):
     
     # Database Settings
     USE_MOCK_DB: bool = True
+    # "mock", "oracle" or "sqlite"; unset derives mock/oracle from USE_MOCK_DB
+    DB_BACKEND: Optional[str] = None
+    SQLITE_DB_PATH: str = "data/sonar.db"
+
+    # Latency / failure injection around the DB service (local load testing)
+    DB_LATENCY_INJECTION: bool = False
+    DB_LATENCY_MEDIAN_MS: float = 40.0
+    DB_LATENCY_P99_MS: float = 400.0
+    DB_LATENCY_PER_ROW_MS: float = 0.0
+    DB_LATENCY_TIMEOUT_MS: Optional[float] = None
+    DB_LATENCY_ERROR_RATE: float = 0.0
+    DB_LATENCY_SEED: int = 0
+    # Connection pool of the SQL backends (per worker process)
+    DB_POOL_SIZE: int = 5
+    DB_POOL_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 3600
+    DB_POOL_PRE_PING: bool = True
+    # Per-round-trip limit set on each connection (python-oracledb call_timeout)
+    DB_CALL_TIMEOUT_MS: Optional[int] = None
+    # Open DB_POOL_SIZE connections during the startup warm-up
+    DB_POOL_PREWARM: bool = True
+
     ORACLE_USER: str = "user"
     ORACLE_PASSWORD: str = "password"
     ORACLE_DSN: str = "localhost:1521/xe"
 
+    # Mock wafer map geometry (default ~700 dies; e.g. 1.2mm dies give ~50k)
+    MOCK_WAFER_DIAMETER_MM: float = 300.0
+    MOCK_DIE_SIZE_MM: float = 10.0
+    # Directory written by app.services.synthetic_dataset (memory-mapped when set)
+    MOCK_DATASET_DIR: Optional[str] = None
+
+    # Wafer grid: concurrent lot fetches per worker and thumbnail render threads
+    WAFER_LOT_CONCURRENCY: int = 5
+    RENDER_WORKERS: int = 4
+    # Wafer detail cache: cached wafers per worker, neighbours prefetched each side
+    WAFER_CACHE_SIZE: int = 512
+    WAFER_PREFETCH_RADIUS: int = 1
+
+    # HTTP caching: how long data watermarks are trusted; smallest body to gzip
+    WATERMARK_TTL_SECONDS: float = 15.0
+    GZIP_MIN_SIZE: int = 1024
+
+    # Load Plotly / the SQL backend / templates on a background thread after startup
+    STARTUP_WARMUP: bool = True
+
+    # Host-wide cache tier shared by all worker processes (SQLite file); opt-in,
+    # since every local process that can write the file can change cached data
+    SHARED_CACHE_ENABLED: bool = False
+    SHARED_CACHE_PATH: str = "data/shared_cache.db"
+    SHARED_CACHE_MAX_MB: float = 256.0
+
+    # Per-response Server-Timing header (spans are always aggregated for /metrics)
+    SERVER_TIMING_HEADER: bool = True
+
+    # Live dashboard: seconds between shared per-product watermark polls
+    LIVE_POLL_SECONDS: float = 30.0
+
+    # Batch yield-trend API: parallel range queries and specs per request
+    YIELD_BATCH_CONCURRENCY: int = 4
+    YIELD_BATCH_MAX_SPECS: int = 1000
+
+    # Background jobs: concurrent jobs, queued+running limit, result retention,
+    # export file location
+    JOB_WORKERS: int = 2
+    JOB_MAX_PENDING: int = 32
+    JOB_RETENTION_SECONDS: float = 900.0
+    JOB_EXPORT_DIR: str = "data/exports"
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,20 @@
+"""
+Release Identity
+Changes whenever code or templates change; part of HTTP validators and of
+the shared cache namespace.
+"""
+import hashlib
+from pathlib import Path
+
+
+def _release_id() -> str:
+    root = Path(__file__).resolve().parents[2]
+    digest = hashlib.blake2b(digest_size=8)
+    for directory in ("app", "templates"):
+        for path in sorted((root / directory).rglob("*")):
+            if path.suffix in (".py", ".html"):
+                digest.update(f"{path}:{path.stat().st_mtime_ns}".encode())
+    return digest.hexdigest()
+
+
+RELEASE_ID = _release_id()
@@ -1,14 +1,26 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from sqlalchemy import text
 from app.core.config import settings
-from app.api import yield_trend, wafer_map
+from app.api import yield_trend, wafer_map, export, jobs, metrics
+from app.api.caching import GZipMiddleware
 from app.views.pages import router as pages_router
+from app.services.warmup import start_warmup, warmup_status
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Heavy modules load in the background; the server accepts connections meanwhile
+    if settings.STARTUP_WARMUP:
+        start_warmup()
+    yield
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan
 )
 
 # Mount static files
@@ -23,9 +35,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress HTML/JSON when the client accepts it (event streams are never buffered)
+app.add_middleware(GZipMiddleware, minimum_size=settings.GZIP_MIN_SIZE, compresslevel=6)
+
+# Outermost: time the whole request, including compression
+app.add_middleware(metrics.ServerTimingMiddleware, header=settings.SERVER_TIMING_HEADER)
+
 # API routes (keep existing for compatibility)
 app.include_router(yield_trend.router, prefix=f"{settings.API_V1_STR}/yield", tags=["yield"])
 app.include_router(wafer_map.router, prefix=f"{settings.API_V1_STR}/wafer", tags=["wafer"])
+app.include_router(export.router, prefix=f"{settings.API_V1_STR}/export", tags=["export"])
+app.include_router(jobs.router, prefix=f"{settings.API_V1_STR}/jobs", tags=["jobs"])
+app.include_router(metrics.router, prefix=f"{settings.API_V1_STR}/metrics", tags=["metrics"])
 
 # HTML page routes
 app.include_router(pages_router)
@@ -34,20 +55,33 @@ app.include_router(pages_router)
 @app.get(f"{settings.API_V1_STR}/health")
 def health_check():
     """Check database connection status"""
-    from app.api.deps import get_db_service
+    from sqlalchemy import text
+    from app.api.deps import get_db_service, get_db_backend
     from app.services.mock_db import MockDBService
     
     db_service = get_db_service()
     is_mock = isinstance(db_service, MockDBService)
+    backend = "mock" if is_mock else get_db_backend()
     
     result = {
         "status": "ok",
-        "database_mode": "mock" if is_mock else "oracle",
+        "database_mode": backend,
         "use_mock_db_setting": settings.USE_MOCK_DB,
+        "warmup": warmup_status,
     }
     
+    if backend == "sqlite":
+        try:
+            with db_service.engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            result["sqlite_connection"] = "success"
+            result["sqlite_path"] = str(db_service.db_path)
+        except Exception as e:
+            result["sqlite_connection"] = "failed"
+            result["sqlite_error"] = str(e)
+    
     # If using Oracle, test the connection
-    if not is_mock:
+    if backend == "oracle":
         try:
             from app.services.oracle_db import oracle_db_service
             with oracle_db_service.engine.connect() as conn:
@@ -64,6 +98,7 @@ def health_check():
 @app.get(f"{settings.API_V1_STR}/debug/oracle")
 def debug_oracle(product_id: str = None):
     """Debug Oracle connection and data"""
+    from sqlalchemy import text
     from app.api.deps import get_db_service
     from app.services.mock_db import MockDBService
     from datetime import date, timedelta
@@ -135,6 +170,7 @@ def debug_oracle(product_id: str = None):
 @app.get(f"{settings.API_V1_STR}/debug/columns")
 def debug_columns():
     """Get column names from SEMI_CP_HEADER"""
+    from sqlalchemy import text
     from app.services.oracle_db import oracle_db_service
     
     try:
@@ -154,6 +190,7 @@ def debug_columns():
 @app.get(f"{settings.API_V1_STR}/debug/trend")
 def debug_trend(product_id: str):
     """Debug raw yield trend data from Oracle"""
+    from sqlalchemy import text
     from datetime import date, timedelta
     from app.api.deps import get_db_service
     from app.services.mock_db import MockDBService
@@ -225,11 +262,12 @@ def debug_trend(product_id: str):
     return result
 
 
-from app.services.mock_db import mock_settings_service
+from app.api.deps import get_settings_service
 from pydantic import BaseModel
 from typing import List
 from fastapi import Request
 from fastapi.responses import HTMLResponse
+from starlette.concurrency import run_in_threadpool
 
 class ProductToggleRequest(BaseModel):
     active: bool
@@ -241,36 +279,19 @@ class TargetSetRequest(BaseModel):
 
 @app.get(f"{settings.API_V1_STR}/settings/products")
 def get_products():
-    if settings.USE_MOCK_DB:
-        return mock_settings_service.get_products()
-    else:
-        from app.services.oracle_db import oracle_db_service
-        return oracle_db_service.get_products()
+    return get_settings_service().get_products()
 
 @app.post(f"{settings.API_V1_STR}/settings/products/{{product_id}}")
 def toggle_product(product_id: str, request: ProductToggleRequest):
-    if settings.USE_MOCK_DB:
-        result = mock_settings_service.toggle_product(product_id, request.active)
-    else:
-        from app.services.oracle_db import oracle_db_service
-        result = oracle_db_service.toggle_product(product_id, request.active)
-    return result
+    return get_settings_service().toggle_product(product_id, request.active)
 
 @app.get(f"{settings.API_V1_STR}/settings/targets")
 def get_target(product_id: str, month: str = None):
-    if settings.USE_MOCK_DB:
-        return {"target": mock_settings_service.get_target(product_id, month)}
-    else:
-        from app.services.oracle_db import oracle_db_service
-        return {"target": oracle_db_service.get_target(product_id, month)}
+    return {"target": get_settings_service().get_target(product_id, month)}
 
 @app.post(f"{settings.API_V1_STR}/settings/targets")
 def set_target(request: TargetSetRequest):
-    if settings.USE_MOCK_DB:
-        mock_settings_service.set_target(request.product_id, request.month, request.target)
-    else:
-        from app.services.oracle_db import oracle_db_service
-        oracle_db_service.set_target(request.product_id, request.month, request.target)
+    get_settings_service().set_target(request.product_id, request.month, request.target)
     return {"status": "success"}
 
 @app.post(f"{settings.API_V1_STR}/settings/targets/bulk")
@@ -280,16 +301,15 @@ async def set_targets_bulk(request: Request):
     product_id = form_data.get("product_id")
     year = form_data.get("year")
     
+    targets = {}
     for key, value in form_data.items():
         if key.startswith(f"target_{product_id}"):
             parts = key.split("_")
             if len(parts) >= 3:
                 month = parts[-1]
                 if value:
-                    if settings.USE_MOCK_DB:
-                        mock_settings_service.set_target(product_id, month, float(value))
-                    else:
-                        from app.services.oracle_db import oracle_db_service
-                        oracle_db_service.set_target(product_id, month, float(value))
+                    targets[month] = float(value)
+    # One write for the whole year (the settings store is SQLite: off the loop)
+    await run_in_threadpool(get_settings_service().set_targets, product_id, targets)
     
     return {"status": "success"}
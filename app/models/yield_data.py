@@ -23,3 +23,20 @@ class YieldTrendResponse(BaseModel):
     end_date: date
     daily_trends: List[DailyYieldStats]
     statistics: dict
+
+class YieldTrendSpec(BaseModel):
+    product_id: str
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+
+class YieldTrendBatchRequest(BaseModel):
+    specs: List[YieldTrendSpec]
+
+class YieldTrendBatchResult(BaseModel):
+    index: int  # Position of the spec in the request
+    trend: Optional[YieldTrendResponse] = None
+    error: Optional[str] = None
+
+class YieldTrendBatchResponse(BaseModel):
+    results: List[YieldTrendBatchResult]
+    queries: int  # Range queries actually issued after deduplication
@@ -2,8 +2,10 @@ import numpy as np
 from typing import List, Dict, Any
 from app.models.sonar_schema import SemiCpHeader
 from datetime import datetime
+from app.services.metrics import timed
 
 class AnalyticsService:
+    @timed("analytics.yield_stats")
     def calculate_yield_stats(self, data: List[Dict[str, Any]]) -> Dict[str, Any]:
         if not data:
             return {}
@@ -0,0 +1,154 @@
+"""
+Analytics Jobs
+Handlers for the background job queue: long-range trends, file exports
+and stacked (multi-lot) wafer maps. Each reports progress per step.
+"""
+import os
+from datetime import date, timedelta
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+from app.core.config import settings
+from app.services import export
+from app.services.analytics import analytics_service
+from app.services.jobs import Job, job_queue
+from app.services.wafer_synth import BIN_PASS
+
+# Range fetched per step of a trend job (one progress tick each)
+TREND_CHUNK_DAYS = 31
+
+
+def _db_service():
+    from app.api.deps import get_db_service
+    return get_db_service()
+
+
+def _settings_service():
+    from app.api.deps import get_settings_service
+    return get_settings_service()
+
+
+def _as_date(value) -> date:
+    return value if isinstance(value, date) else date.fromisoformat(str(value))
+
+
+def trend_job(job: Job, product_id: str, start_date: str, end_date: str) -> dict:
+    """
+    Trend over any range, fetched in month-sized chunks
+
+    Chunks go through the export query, which is bounded by calendar days;
+    get_cp_yield_trend's window is relative to the current time of day and
+    would drop part of a day at every chunk boundary.
+    """
+    start, end = _as_date(start_date), _as_date(end_date)
+    db_service = _db_service()
+    total_days = (end - start).days + 1
+
+    rows = []
+    chunk_start = start
+    while chunk_start <= end:
+        chunk_end = min(chunk_start + timedelta(days=TREND_CHUNK_DAYS - 1), end)
+        job.report((chunk_start - start).days / total_days, f"Fetching {chunk_start} - {chunk_end}")
+        for batch in db_service.iter_cp_export(product_id, chunk_start, chunk_end):
+            rows.extend(batch)
+        chunk_start = chunk_end + timedelta(days=1)
+
+    job.report(0.95, f"Computing statistics over {len(rows):,} wafers")
+    stats = analytics_service.calculate_yield_stats(rows)
+    stats["target"] = _settings_service().get_target(product_id, start.strftime("%Y-%m"))
+    return {
+        "product_id": product_id,
+        "start_date": start,
+        "end_date": end,
+        "daily_trends": stats.get("daily_trends", []),
+        "statistics": stats
+    }
+
+
+def _remove_file(result):
+    if result and result.get("path"):
+        Path(result["path"]).unlink(missing_ok=True)
+
+
+def export_job(job: Job, product_id: str, start_date: str, end_date: str, format: str = "csv") -> dict:
+    """Export to a file under JOB_EXPORT_DIR (deleted when the job expires)"""
+    if format not in export.FORMATS:
+        raise ValueError(f"format must be one of {', '.join(export.FORMATS)}")
+    start, end = _as_date(start_date), _as_date(end_date)
+    db_service = _db_service()
+    bin_keys = [] if format == "ndjson" else db_service.get_export_bin_keys(product_id, start, end)
+    total_days = (end - start).days + 1
+    counted = {"rows": 0}
+
+    def batches():
+        for batch in db_service.iter_cp_export(product_id, start, end):
+            counted["rows"] += len(batch)
+            last = batch[-1].get("REGIST_DATE")
+            done_days = (last.date() - start).days + 1 if hasattr(last, "date") else 0
+            job.report(done_days / total_days, f"{counted['rows']:,} wafers exported")
+            yield batch
+
+    if format == "csv":
+        chunks = export.iter_csv(batches(), bin_keys)
+    elif format == "columnar":
+        chunks = export.iter_columnar(batches(), bin_keys)
+    else:
+        chunks = export.iter_ndjson(batches())
+
+    out_dir = Path(settings.JOB_EXPORT_DIR)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    filename = export.export_filename(product_id, start, end, format)
+    path = out_dir / f"{job.id}-{filename}"
+    job.cleanup = _remove_file
+    try:
+        with open(path, "w", newline="") as f:
+            for chunk in chunks:
+                f.write(chunk)
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+    return {
+        "path": str(path),
+        "filename": filename,
+        "media_type": export.FORMATS[format],
+        "rows": counted["rows"],
+        "bytes": os.path.getsize(path)
+    }
+
+
+def stacked_map_job(job: Job, lot_ids: List[str]) -> dict:
+    """Fail rate per die position across every wafer of the given lots"""
+    db_service = _db_service()
+    xs, ys, fails = [], [], []
+    wafers = 0
+    for i, lot_id in enumerate(lot_ids):
+        job.report(i / len(lot_ids), f"Loading {lot_id} ({i + 1}/{len(lot_ids)})")
+        for wafer in db_service.get_lot_wafer_arrays(lot_id):
+            xs.append(np.asarray(wafer["x"], dtype=np.int32))
+            ys.append(np.asarray(wafer["y"], dtype=np.int32))
+            fails.append(np.asarray(wafer["bin"]) != BIN_PASS)
+            wafers += 1
+
+    job.report(0.95, f"Stacking {wafers} wafers")
+    if not wafers:
+        return {"lot_ids": lot_ids, "wafers": 0, "x": [], "y": [], "fail_rate": [], "count": []}
+    x, y = np.concatenate(xs), np.concatenate(ys)
+    # One slot per die position, then count tested and failed dies per slot
+    positions, slot = np.unique(np.stack([x, y], axis=1), axis=0, return_inverse=True)
+    tested = np.bincount(slot)
+    failed = np.bincount(slot, weights=np.concatenate(fails))
+    return {
+        "lot_ids": lot_ids,
+        "wafers": wafers,
+        "x": positions[:, 0],
+        "y": positions[:, 1],
+        "fail_rate": np.round(failed / tested * 100.0, 2),
+        "count": tested
+    }
+
+
+job_queue.register("trend", trend_job)
+job_queue.register("export", export_job)
+job_queue.register("stacked_map", stacked_map_job)
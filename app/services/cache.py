@@ -0,0 +1,121 @@
+"""
+In-Process Cache
+Thread-safe LRU cache with per-entry expiry, optionally backed by the
+host-wide shared cache so entries computed by one worker are hits for the
+others
+"""
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from app.services.shared_cache import get_shared_cache
+
+# Every live cache, for the metrics endpoint
+caches: "weakref.WeakSet[TTLCache]" = weakref.WeakSet()
+
+
+class TTLCache:
+    """
+    Size-bounded LRU cache whose entries expire after a TTL
+
+    Args:
+        maxsize: Maximum number of entries (least recently used evicted first)
+        ttl: Default time-to-live in seconds
+        name: Label used when reporting cache statistics; also the key
+            namespace in the shared tier, so it must be unique
+        shared: Also store entries in the host-wide shared cache (keys must
+            have a stable repr and values must be storable by
+            shared_cache: dicts, lists, tuples, scalars, dates, NumPy arrays)
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 300.0, name: str = "cache", shared: bool = False):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+        self.shared = get_shared_cache() if shared else None
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.shared_hits = 0
+        caches.add(self)
+
+    def _shared_key(self, key: Hashable) -> str:
+        return f"{self.name}:{key!r}"
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires >= time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            if self.shared is None:
+                self.misses += 1
+                return default
+
+        found = self.shared.get(self._shared_key(key))
+        if found is None:
+            with self._lock:
+                self.misses += 1
+            return default
+        value, expires_at = found
+        # Keep it locally for what is left of the shared entry's lifetime
+        self._set_local(key, value, time.monotonic() + (expires_at - time.time()))
+        with self._lock:
+            self.hits += 1
+            self.shared_hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        self._set_local(key, value, time.monotonic() + ttl)
+        if self.shared is not None:
+            self.shared.set(self._shared_key(key), value, ttl)
+
+    def _set_local(self, key: Hashable, value: Any, expires: float):
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.pop(key, None)
+        if self.shared is not None:
+            self.shared.delete(self._shared_key(key))
+        return default if entry is None else entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+        if self.shared is not None:
+            self.shared.clear(f"{self.name}:")
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] >= time.monotonic():
+                return True
+        return self.shared is not None and self.shared.contains(self._shared_key(key))
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "name": self.name,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "shared_hits": self.shared_hits,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
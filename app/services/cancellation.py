@@ -0,0 +1,123 @@
+"""
+Request Cancellation
+Cooperative cancellation for work done on behalf of a request: a token in
+a context variable (so it follows run_in_threadpool), checked at safe
+points between steps and able to interrupt a running DB statement.
+"""
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, Hashable, List, Optional
+
+
+class Cancelled(BaseException):
+    """
+    The request this work was for has gone away (disconnected or superseded)
+
+    A BaseException, like asyncio.CancelledError, so the services' broad
+    `except Exception` fallbacks don't turn it into an empty result.
+    """
+
+
+class CancelToken:
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+        self.reason: Optional[str] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str):
+        """Mark cancelled and run the registered callbacks (once)"""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Cancellation callback failed: {e}")
+
+    def on_cancel(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """Run callback when cancelled; returns a function that unregisters it"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+
+                def remove():
+                    with self._lock:
+                        if callback in self._callbacks:
+                            self._callbacks.remove(callback)
+
+                return remove
+        callback()
+        return lambda: None
+
+    def check(self):
+        if self._event.is_set():
+            raise Cancelled(self.reason)
+
+    def sleep(self, seconds: float):
+        """time.sleep that raises Cancelled as soon as the token is cancelled"""
+        if self._event.wait(seconds):
+            raise Cancelled(self.reason)
+
+
+_current_token: ContextVar[Optional[CancelToken]] = ContextVar("cancel_token", default=None)
+
+
+def current_token() -> Optional[CancelToken]:
+    return _current_token.get()
+
+
+def set_current_token(token: Optional[CancelToken]):
+    """Returns the ContextVar reset token"""
+    return _current_token.set(token)
+
+
+def reset_current_token(reset):
+    _current_token.reset(reset)
+
+
+def check_cancelled():
+    """Raise Cancelled if the current request's work has been cancelled"""
+    token = _current_token.get()
+    if token is not None:
+        token.check()
+
+
+def cancellable_sleep(seconds: float):
+    token = _current_token.get()
+    if token is None:
+        time.sleep(seconds)
+    else:
+        token.sleep(seconds)
+
+
+class SupersedeRegistry:
+    """Latest token per key; registering a newer one cancels the previous"""
+
+    def __init__(self):
+        self._tokens: Dict[Hashable, CancelToken] = {}
+        self._lock = threading.Lock()
+
+    def register(self, key: Hashable, token: CancelToken):
+        with self._lock:
+            previous = self._tokens.get(key)
+            self._tokens[key] = token
+        if previous is not None:
+            previous.cancel("superseded")
+
+    def release(self, key: Hashable, token: CancelToken):
+        with self._lock:
+            if self._tokens.get(key) is token:
+                del self._tokens[key]
+
+
+supersede_registry = SupersedeRegistry()
@@ -1,13 +1,19 @@
 """
 Chart Generator Service
 Generates Plotly charts as HTML for server-side rendering
+
+Plotly is imported by the chart functions themselves (it is the largest
+import in the app); app.services.warmup loads it after startup.
 """
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 from typing import List, Dict, Any, Optional
 from datetime import datetime
+import numpy as np
+
+from app.services.metrics import span, timed
+from app.services.wafer_grid import wafer_bin_grid
 
 
+@timed("chart.aggregate")
 def aggregate_data(daily_trends: List[Dict], mode: str = "daily") -> List[Dict]:
     """Aggregate daily data by specified period"""
     if mode == "daily" or not daily_trends:
@@ -79,6 +85,8 @@ def generate_yield_trend_chart(
     Returns:
         HTML string with the chart
     """
+    import plotly.graph_objects as go
+
     daily_trends = data.get("daily_trends", [])
     statistics = data.get("statistics", {})
     
@@ -191,11 +199,12 @@ def generate_yield_trend_chart(
         )
     )
     
-    return fig.to_html(
-        include_plotlyjs=include_plotlyjs,
-        full_html=False,
-        config={'displayModeBar': False}
-    )
+    with span("chart.to_html"):
+        return fig.to_html(
+            include_plotlyjs=include_plotlyjs,
+            full_html=False,
+            config={'displayModeBar': False}
+        )
 
 
 def generate_fail_ratio_chart(
@@ -203,6 +212,8 @@ def generate_fail_ratio_chart(
     include_plotlyjs: str = False
 ) -> str:
     """Generate fail ratio pie chart HTML"""
+    import plotly.graph_objects as go
+
     daily_trends = data.get("daily_trends", [])
     
     if not daily_trends:
@@ -246,11 +257,12 @@ def generate_fail_ratio_chart(
         showlegend=False
     )
     
-    return fig.to_html(
-        include_plotlyjs=include_plotlyjs,
-        full_html=False,
-        config={'displayModeBar': False, 'responsive': True}
-    )
+    with span("chart.to_html"):
+        return fig.to_html(
+            include_plotlyjs=include_plotlyjs,
+            full_html=False,
+            config={'displayModeBar': False, 'responsive': True}
+        )
 
 
 def generate_wafer_svg(wafer_data: Dict[str, Any], size: int = 100) -> str:
@@ -306,11 +318,29 @@ def generate_wafer_svg(wafer_data: Dict[str, Any], size: int = 100) -> str:
     return ''.join(svg_parts)
 
 
+def _discrete_bin_colorscale(codes: List[int], bin_colors: Dict[int, str], default_color: str) -> List[List[Any]]:
+    """Build a stepped colorscale giving each bin code its own solid band"""
+    zmin, zmax = codes[0] - 0.5, codes[-1] + 0.5
+    span = zmax - zmin
+    colorscale = []
+    for i, code in enumerate(codes):
+        lo = 0.0 if i == 0 else ((codes[i - 1] + code) / 2 - zmin) / span
+        hi = 1.0 if i == len(codes) - 1 else ((code + codes[i + 1]) / 2 - zmin) / span
+        color = bin_colors.get(code, default_color)
+        colorscale.append([lo, color])
+        colorscale.append([hi, color])
+    return colorscale
+
+
 def generate_wafer_map_detail(wafer_data: Dict[str, Any]) -> str:
-    """Generate larger Plotly chart for wafer detail modal"""
-    x_coords = wafer_data.get("x", [])
-    y_coords = wafer_data.get("y", [])
-    bins = wafer_data.get("bin", [])
+    """
+    Generate larger Plotly chart for wafer detail modal
+
+    Dies are scattered into a dense bin grid and drawn as a single Heatmap,
+    so the payload is one typed array and stays flat as die count grows.
+    """
+    import plotly.graph_objects as go
+
     wafer_id = wafer_data.get("wafer_id", "Unknown")
     lot_id = wafer_data.get("lot_id", "")
     
@@ -319,21 +349,31 @@ def generate_wafer_map_detail(wafer_data: Dict[str, Any]) -> str:
         3: "#ef4444", 
         7: "#f59e0b",
     }
-    colors = [bin_colors.get(b, "#8b5cf6") for b in bins]
-    
-    fig = go.Figure(data=go.Scatter(
-        x=x_coords,
-        y=y_coords,
-        mode='markers',
-        marker=dict(
-            size=8,
-            symbol='square',
-            color=colors
-        ),
-        hoverinfo='x+y+text',
-        text=[f'Bin {b}' for b in bins]
+    default_color = "#8b5cf6"
+    
+    x_axis, y_axis, grid = wafer_bin_grid(wafer_data)
+    if grid.size == 0:
+        return '<div class="loading">No wafer map data</div>'
+    
+    codes = [int(c) for c in np.unique(grid[~np.isnan(grid)])]
+    
+    fig = go.Figure(data=go.Heatmap(
+        x=x_axis,
+        y=y_axis,
+        z=grid,
+        zmin=codes[0] - 0.5,
+        zmax=codes[-1] + 0.5,
+        colorscale=_discrete_bin_colorscale(codes, bin_colors, default_color),
+        showscale=False,
+        hoverongaps=False,
+        hovertemplate='x: %{x}<br>y: %{y}<br>Bin %{z}<extra></extra>',
+        xgap=1 if len(x_axis) <= 64 else 0,
+        ygap=1 if len(y_axis) <= 64 else 0
     ))
     
+    x_range = [float(x_axis[0]) - 0.5, float(x_axis[-1]) + 0.5]
+    y_range = [float(y_axis[0]) - 0.5, float(y_axis[-1]) + 0.5]
+    
     fig.update_layout(
         autosize=True,
         width=480,
@@ -344,7 +384,7 @@ def generate_wafer_map_detail(wafer_data: Dict[str, Any]) -> str:
             showgrid=False,
             zeroline=False,
             showticklabels=False,
-            range=[-16, 16],
+            range=x_range,
             constrain='domain'
         ),
         yaxis=dict(
@@ -353,7 +393,7 @@ def generate_wafer_map_detail(wafer_data: Dict[str, Any]) -> str:
             showticklabels=False,
             scaleanchor="x",
             scaleratio=1,
-            range=[-16, 16],
+            range=y_range,
             constrain='domain'
         ),
         paper_bgcolor='rgba(0,0,0,0)',
@@ -361,8 +401,9 @@ def generate_wafer_map_detail(wafer_data: Dict[str, Any]) -> str:
         showlegend=False
     )
     
-    return fig.to_html(
-        include_plotlyjs=False,
-        full_html=False,
-        config={'displayModeBar': False, 'responsive': True}
-    )
+    with span("chart.to_html"):
+        return fig.to_html(
+            include_plotlyjs=False,
+            full_html=False,
+            config={'displayModeBar': False, 'responsive': True}
+        )
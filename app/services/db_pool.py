@@ -0,0 +1,127 @@
+"""
+DB Connection Pool
+Pool sizing from settings, pre-warming and telemetry for the SQLAlchemy
+backends: checkout wait, connect (login) time, timeouts and connections
+discarded as broken. Connections checked out for a cancellable request
+are interrupted when the request is cancelled.
+
+Sessions held against the database are at most
+workers x (DB_POOL_SIZE + DB_POOL_MAX_OVERFLOW).
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+from app.core.config import settings
+from app.services import metrics
+from app.services.cancellation import Cancelled, check_cancelled, current_token
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited"""
+
+    def _do_get(self):
+        backend = self._dialect.name
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            metrics.db_pool_timeouts.inc((backend,))
+            raise
+        finally:
+            metrics.db_pool_wait_seconds.observe((backend,), time.perf_counter() - started)
+
+
+def pool_options() -> dict:
+    """create_engine() keyword arguments from the DB_POOL_* settings"""
+    return {
+        "poolclass": TimedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_POOL_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        # Test each connection on checkout; stale ones are replaced transparently
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def _interrupt(dbapi_conn):
+    """Abort the statement running on a DBAPI connection (from another thread)"""
+    # python-oracledb: cancel(); sqlite3: interrupt()
+    abort = getattr(dbapi_conn, "cancel", None) or getattr(dbapi_conn, "interrupt", None)
+    if abort is not None:
+        abort()
+
+
+def instrument_pool(engine):
+    """Time new connections, count invalidated ones and wire up request cancellation"""
+    backend = engine.dialect.name
+
+    @event.listens_for(engine, "do_connect")
+    def _timed_connect(dialect, _record, cargs, cparams):
+        started = time.perf_counter()
+        try:
+            conn = dialect.connect(*cargs, **cparams)
+        finally:
+            metrics.db_connect_seconds.observe((backend,), time.perf_counter() - started)
+        if settings.DB_CALL_TIMEOUT_MS and hasattr(conn, "call_timeout"):
+            conn.call_timeout = settings.DB_CALL_TIMEOUT_MS
+        return conn
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(_dbapi_conn, _record, _exception):
+        metrics.db_pool_invalidations.inc((backend,))
+
+    # While a cancellable request holds a connection, cancelling it aborts
+    # the running statement (execute and fetch) and frees the connection
+    @event.listens_for(engine, "checkout")
+    def _bind_cancel(dbapi_conn, record, _proxy):
+        token = current_token()
+        if token is not None:
+            record.info["release_cancel"] = token.on_cancel(lambda: _interrupt(dbapi_conn))
+
+    @event.listens_for(engine, "checkin")
+    def _unbind_cancel(_dbapi_conn, record):
+        release = record.info.pop("release_cancel", None)
+        if release is not None:
+            release()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _check_before_execute(*_args):
+        check_cancelled()
+
+    @event.listens_for(engine, "handle_error")
+    def _cancelled_error(context):
+        # Report the interrupted statement as Cancelled, not as a DB error
+        # the service would log and turn into an empty result
+        token = current_token()
+        if token is not None and token.cancelled:
+            raise Cancelled(token.reason) from context.original_exception
+
+    return engine
+
+
+def prewarm_pool(engine, connections: int) -> int:
+    """
+    Open pooled connections in parallel and return them to the pool, so
+    the first requests after a deploy skip the connect/login handshake
+
+    Returns:
+        Number of connections opened
+    """
+    if connections <= 0:
+        return 0
+    opened = []
+    with ThreadPoolExecutor(max_workers=connections, thread_name_prefix="pool-warm") as executor:
+        futures = [executor.submit(engine.connect) for _ in range(connections)]
+        for future in futures:
+            try:
+                opened.append(future.result())
+            except Exception as e:
+                print(f"Pool pre-warm connection failed: {e}")
+    for conn in opened:
+        conn.close()
+    return len(opened)
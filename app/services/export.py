@@ -0,0 +1,86 @@
+"""
+CP Data Export
+Formatters that turn batches of SEMI_CP_HEADER rows (with bins) into
+streamed CSV, NDJSON or columnar NDJSON chunks, one chunk per batch.
+"""
+import csv
+import io
+import json
+import re
+from datetime import date, datetime
+from typing import Iterable, Iterator, List
+
+EXPORT_COLUMNS = [
+    "SUBSTRATE_ID", "LOT_ID", "WAFER_ID", "PRODUCT_ID", "PROCESS",
+    "PASS_CHIP", "PASS_CHIP_RATE", "EFFECTIVE_NUM", "REGIST_DATE", "REWORK_NEW"
+]
+
+FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    # One JSON object per batch: {"COLUMN": [values...], ..., "bins": {"3_Open": [...]}}
+    "columnar": "application/x-ndjson",
+}
+
+EXTENSIONS = {"csv": "csv", "ndjson": "ndjson", "columnar": "columnar.ndjson"}
+
+# Characters allowed from user input in export file names
+UNSAFE_FILENAME_CHARS = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+def export_filename(product_id: str, start_date, end_date, format: str) -> str:
+    """
+    File name for an export. The product id is user input: anything outside
+    [A-Za-z0-9._-] is replaced, so the name is safe both on disk and in a
+    Content-Disposition header (no quotes, latin-1 only).
+    """
+    safe_product = UNSAFE_FILENAME_CHARS.sub("_", str(product_id)).strip("._") or "export"
+    return f"{safe_product}_{start_date}_{end_date}.{EXTENSIONS[format]}"
+
+
+def _value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, "item"):  # NumPy scalar
+        return value.item()
+    return value
+
+
+def iter_csv(batches: Iterable[List[dict]], bin_keys: List[str]) -> Iterator[str]:
+    """Header line, then one chunk of wide rows (a column per bin) per batch"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS + bin_keys)
+    yield buffer.getvalue()
+
+    for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        for row in batch:
+            bins = row.get("bins", {})
+            writer.writerow(
+                [_value(row.get(c)) for c in EXPORT_COLUMNS] + [bins.get(k, 0) for k in bin_keys]
+            )
+        yield buffer.getvalue()
+
+
+def iter_ndjson(batches: Iterable[List[dict]]) -> Iterator[str]:
+    """One JSON object per wafer with a nested bins object"""
+    for batch in batches:
+        yield "".join(
+            json.dumps({
+                **{c: _value(row.get(c)) for c in EXPORT_COLUMNS},
+                "bins": {k: _value(v) for k, v in row.get("bins", {}).items()}
+            }) + "\n"
+            for row in batch
+        )
+
+
+def iter_columnar(batches: Iterable[List[dict]], bin_keys: List[str]) -> Iterator[str]:
+    """One column-major JSON object per batch"""
+    for batch in batches:
+        columns = {c: [_value(row.get(c)) for row in batch] for c in EXPORT_COLUMNS}
+        columns["bins"] = {
+            k: [_value(row.get("bins", {}).get(k, 0)) for row in batch] for k in bin_keys
+        }
+        yield json.dumps(columns) + "\n"
@@ -0,0 +1,232 @@
+"""
+Background Jobs
+In-process queue for analytics that can outlast an HTTP request: long
+trends, exports and stacked wafer maps run on a bounded worker pool while
+clients poll (or stream) progress by job id.
+
+- Identical submissions while a job is queued, running or retained return
+  the existing job instead of starting another.
+- Parameters are checked against the handler's signature at submission,
+  and new jobs are refused once max_pending are queued or running.
+- Finished jobs keep their result for a retention period, then expire.
+- Cancellation is cooperative: handlers call job.report() between steps,
+  which raises JobCancelled once the job has been cancelled.
+"""
+import inspect
+import json
+import logging
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.services import metrics
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED = {DONE, FAILED, CANCELLED}
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler when its job has been cancelled"""
+
+
+class JobQueueFull(Exception):
+    """Too many jobs queued or running to accept another"""
+
+
+class Job:
+    def __init__(self, kind: str, params: Dict[str, Any], key: str):
+        self.id = secrets.token_urlsafe(9)
+        self.kind = kind
+        self.params = params
+        self.key = key
+        self.status = QUEUED
+        self.progress = 0.0
+        self.message = "Queued"
+        self.result = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.future = None
+        self._cancel = threading.Event()
+        # Called with the result once when the job expires (e.g. delete files)
+        self.cleanup: Optional[Callable[[Any], None]] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+    def report(self, progress: float, message: str = None):
+        """Record progress (0..1) and stop here if the job was cancelled"""
+        if self._cancel.is_set():
+            raise JobCancelled()
+        self.progress = max(0.0, min(1.0, progress))
+        if message is not None:
+            self.message = message
+
+    def to_dict(self) -> dict:
+        elapsed_end = self.finished_at or time.time()
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "params": self.params,
+            "status": self.status,
+            "progress": round(self.progress, 4),
+            "message": self.message,
+            "error": self.error,
+            "created_at": self.created_at,
+            "elapsed_s": round(elapsed_end - (self.started_at or elapsed_end), 3),
+        }
+
+
+class JobQueue:
+    """
+    Bounded pool of analytics jobs
+
+    Args:
+        workers: Jobs run concurrently (the rest wait in the queue)
+        retention: Seconds a finished job and its result are kept
+        max_jobs: Upper bound on tracked jobs; oldest finished are dropped first
+        max_pending: Queued plus running jobs accepted before submit refuses
+    """
+
+    def __init__(self, workers: int = 2, retention: float = 900.0, max_jobs: int = 256, max_pending: int = 32):
+        self.retention = retention
+        self.max_jobs = max_jobs
+        self.max_pending = max_pending
+        self._handlers: Dict[str, Callable] = {}
+        self._jobs: Dict[str, Job] = {}
+        self._by_key: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+
+    def register(self, kind: str, handler: Callable):
+        """handler(job, **params) -> result; call job.report() between steps"""
+        self._handlers[kind] = handler
+
+    @property
+    def kinds(self):
+        return sorted(self._handlers)
+
+    def submit(self, kind: str, params: Dict[str, Any]) -> Job:
+        """
+        Queue a job (or return the identical one already tracked)
+
+        Raises:
+            ValueError: Unknown kind, or params the handler does not accept
+            JobQueueFull: max_pending jobs are already queued or running
+        """
+        handler = self._handlers.get(kind)
+        if handler is None:
+            raise ValueError(f"Unknown job kind: {kind}")
+        try:
+            inspect.signature(handler).bind(None, **params)
+        except TypeError as e:
+            raise ValueError(f"Invalid params for {kind}: {e}")
+        key = f"{kind}:{json.dumps(params, sort_keys=True, default=str)}"
+        with self._lock:
+            self._purge()
+            existing = self._by_key.get(key)
+            if existing is not None and existing.status not in (FAILED, CANCELLED):
+                return existing
+            pending = sum(1 for j in self._jobs.values() if not j.finished)
+            if pending >= self.max_pending:
+                raise JobQueueFull(f"{pending} jobs are queued or running; try again later")
+            job = Job(kind, params, key)
+            self._jobs[job.id] = job
+            self._by_key[key] = job
+        job.future = self._pool.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            self._purge()
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return job
+        job._cancel.set()
+        if job.future is not None and job.future.cancel():
+            # Never started
+            self._finish(job, CANCELLED, message="Cancelled")
+        return job
+
+    def _run(self, job: Job):
+        if job.cancelled:
+            self._finish(job, CANCELLED, message="Cancelled")
+            return
+        job.status = RUNNING
+        job.started_at = time.time()
+        job.message = "Running"
+        try:
+            result = self._handlers[job.kind](job, **job.params)
+        except JobCancelled:
+            self._finish(job, CANCELLED, message="Cancelled")
+        except Exception as e:
+            logger.exception("Job %s %s failed", job.kind, job.id)
+            self._finish(job, FAILED, message="Failed", error=str(e))
+        else:
+            job.result = result
+            job.progress = 1.0
+            self._finish(job, DONE, message="Done")
+
+    def _finish(self, job: Job, status: str, message: str, error: str = None):
+        metrics.jobs_finished.inc((job.kind, status))
+        job.status = status
+        job.message = message
+        job.error = error
+        job.finished_at = time.time()
+
+    def _purge(self):
+        """Drop expired jobs (caller holds the lock)"""
+        now = time.time()
+        finished = sorted(
+            (j for j in self._jobs.values() if j.finished),
+            key=lambda j: j.finished_at
+        )
+        overflow = len(self._jobs) - self.max_jobs
+        for job in finished:
+            if now - job.finished_at < self.retention and overflow <= 0:
+                break
+            overflow -= 1
+            self._drop(job)
+
+    def _drop(self, job: Job):
+        self._jobs.pop(job.id, None)
+        if self._by_key.get(job.key) is job:
+            del self._by_key[job.key]
+        if job.cleanup is not None:
+            try:
+                job.cleanup(job.result)
+            except Exception:
+                logger.exception("Job cleanup failed for %s", job.id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+        return {"jobs": len(self._jobs), **counts}
+
+
+job_queue = JobQueue(
+    workers=settings.JOB_WORKERS,
+    retention=settings.JOB_RETENTION_SECONDS,
+    max_pending=settings.JOB_MAX_PENDING
+)
@@ -0,0 +1,125 @@
+"""
+Latency Injection
+Wraps any DB service and injects Oracle-like latency, per-row fetch cost,
+timeouts and intermittent errors for local load testing.
+"""
+import itertools
+import math
+import time
+import numpy as np
+from typing import Optional
+
+from app.core.config import settings
+from app.services.cancellation import cancellable_sleep
+
+# Service methods that never reach the database (settings store / in-memory)
+NON_DB_METHODS = {"get_target", "set_target", "set_targets", "toggle_product", "settings_version"}
+
+# z-score of the 99th percentile of a standard normal
+_Z99 = 2.3263
+
+
+class InjectedDBError(Exception):
+    """Intermittent failure injected by LatencyInjectingDBService"""
+
+
+class InjectedDBTimeout(InjectedDBError, TimeoutError):
+    """Call exceeded the injected timeout"""
+
+
+class LatencyProfile:
+    """
+    Latency distribution and failure rates for injected DB calls
+
+    Per-call latency is log-normal, parameterized by its median and p99.
+    """
+
+    def __init__(
+        self,
+        median_ms: float = 40.0,
+        p99_ms: float = 400.0,
+        per_row_ms: float = 0.0,
+        timeout_ms: Optional[float] = None,
+        error_rate: float = 0.0,
+        seed: int = 0
+    ):
+        self.median_ms = median_ms
+        self.p99_ms = max(p99_ms, median_ms)
+        self.per_row_ms = per_row_ms
+        self.timeout_ms = timeout_ms
+        self.error_rate = error_rate
+        self.seed = seed
+        self.sigma = math.log(self.p99_ms / self.median_ms) / _Z99 if self.median_ms > 0 else 0.0
+
+    @classmethod
+    def from_settings(cls) -> "LatencyProfile":
+        return cls(
+            median_ms=settings.DB_LATENCY_MEDIAN_MS,
+            p99_ms=settings.DB_LATENCY_P99_MS,
+            per_row_ms=settings.DB_LATENCY_PER_ROW_MS,
+            timeout_ms=settings.DB_LATENCY_TIMEOUT_MS,
+            error_rate=settings.DB_LATENCY_ERROR_RATE,
+            seed=settings.DB_LATENCY_SEED
+        )
+
+    def sample_ms(self, rng: np.random.Generator) -> float:
+        if self.median_ms <= 0:
+            return 0.0
+        return float(self.median_ms * math.exp(self.sigma * rng.standard_normal()))
+
+
+class LatencyInjectingDBService:
+    """
+    Proxy that delays and fails calls to the wrapped DB service
+
+    The n-th call draws from a Generator seeded by (seed, n), so a replay
+    with the same seed and call order sees the same latencies and errors.
+    """
+
+    def __init__(self, inner, profile: LatencyProfile = None):
+        self.inner = inner
+        self.profile = profile or LatencyProfile.from_settings()
+        self._calls = itertools.count()
+        # Coalesced service methods are coalesced around the injected latency too
+        self._flights = {}
+
+    def __getattr__(self, name):
+        attr = getattr(self.inner, name)
+        if name.startswith("_") or name in NON_DB_METHODS or not callable(attr):
+            return attr
+
+        if getattr(attr, "single_flight", None) is not None:
+            from app.services.single_flight import SingleFlight
+            flight = self._flights.setdefault(name, SingleFlight(f"injected.{name}"))
+
+            def injected(*args, **kwargs):
+                key = (args, tuple(sorted(kwargs.items())))
+                return flight.do(key, self._call, name, attr, args, kwargs)[0]
+        else:
+            def injected(*args, **kwargs):
+                return self._call(name, attr, args, kwargs)
+
+        injected.__name__ = name
+        return injected
+
+    def _call(self, name, method, args, kwargs):
+        profile = self.profile
+        rng = np.random.default_rng([profile.seed, next(self._calls)])
+        started = time.perf_counter()
+
+        if rng.random() < profile.error_rate:
+            cancellable_sleep(profile.sample_ms(rng) / 1000.0)
+            raise InjectedDBError(f"Injected error in {name}")
+
+        result = method(*args, **kwargs)
+
+        rows = len(result) if isinstance(result, list) else 0
+        delay_ms = profile.sample_ms(rng) + rows * profile.per_row_ms
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+
+        if profile.timeout_ms is not None and elapsed_ms + delay_ms > profile.timeout_ms:
+            cancellable_sleep(max(0.0, profile.timeout_ms - elapsed_ms) / 1000.0)
+            raise InjectedDBTimeout(f"{name} exceeded {profile.timeout_ms:.0f}ms")
+
+        cancellable_sleep(delay_ms / 1000.0)
+        return result
@@ -0,0 +1,137 @@
+"""
+Live Yield Feed
+One background poller per watched product pushes day-bucket deltas to every
+open dashboard, so N screens cost one shared poll instead of N reloads.
+
+The poller checks the product's watermark (latest REGIST_DATE); only when
+it moves does it re-query the most recent days and broadcast the daily
+buckets that changed or appeared.
+"""
+import asyncio
+import json
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.services.analytics import analytics_service
+
+
+def _bucket(day: dict) -> dict:
+    return {
+        "date": str(day["date"]),
+        "lot_id": day.get("lot_id"),
+        "mean_yield": day["mean_yield"],
+        "wafer_count": day["wafer_count"],
+        "bin_stats": day.get("bin_stats", {}),
+    }
+
+
+class ProductFeed:
+    """Subscribers and poll state for a single product"""
+
+    def __init__(self, product_id: str, get_db_service: Callable, interval: float, days: int):
+        self.product_id = product_id
+        self.get_db_service = get_db_service
+        self.interval = interval
+        self.days = days
+        self.subscribers: List[asyncio.Queue] = []
+        self.watermark: Optional[str] = None
+        self.buckets: Dict[str, dict] = {}
+        self.task: Optional[asyncio.Task] = None
+
+    def _recent_buckets(self) -> Dict[str, dict]:
+        end_date = date.today()
+        start_date = end_date - timedelta(days=self.days - 1)
+        data = self.get_db_service().get_cp_yield_trend(self.product_id, start_date, end_date)
+        stats = analytics_service.calculate_yield_stats(data)
+        return {b["date"]: b for b in map(_bucket, stats.get("daily_trends", []))}
+
+    def _poll(self) -> Optional[List[dict]]:
+        """Changed day buckets since the last poll (None if nothing moved)"""
+        watermark = self.get_db_service().get_product_watermark(self.product_id)
+        if watermark is None or watermark == self.watermark:
+            return None
+        first_poll = self.watermark is None
+        self.watermark = watermark
+
+        buckets = self._recent_buckets()
+        changed = [b for key, b in sorted(buckets.items()) if self.buckets.get(key) != b]
+        self.buckets = buckets
+        return None if first_poll else changed
+
+    async def run(self):
+        while self.subscribers:
+            try:
+                changed = await run_in_threadpool(self._poll)
+            except Exception as e:
+                print(f"Live yield poll failed for {self.product_id}: {e}")
+                changed = None
+            if changed:
+                self.publish({"product_id": self.product_id, "days": changed})
+            await asyncio.sleep(self.interval)
+
+    def publish(self, event: dict):
+        message = json.dumps(event)
+        for queue in self.subscribers:
+            if queue.full():
+                # A stalled client skips a delta rather than holding up the feed
+                queue.get_nowait()
+            queue.put_nowait(message)
+
+
+class LiveYieldHub:
+    """
+    Per-product fan-out of live yield deltas
+
+    Args:
+        get_db_service: Returns the DB service to poll
+        interval: Seconds between watermark checks
+        days: Trailing days re-aggregated when the watermark moves
+    """
+
+    def __init__(self, get_db_service: Callable, interval: float = 30.0, days: int = 2):
+        self.get_db_service = get_db_service
+        self.interval = interval
+        self.days = days
+        self.feeds: Dict[str, ProductFeed] = {}
+
+    def subscribe(self, product_id: str) -> asyncio.Queue:
+        feed = self.feeds.get(product_id)
+        if feed is None:
+            feed = self.feeds[product_id] = ProductFeed(
+                product_id, self.get_db_service, self.interval, self.days
+            )
+        queue = asyncio.Queue(maxsize=16)
+        feed.subscribers.append(queue)
+        if feed.task is None or feed.task.done():
+            feed.task = asyncio.create_task(feed.run())
+        return queue
+
+    def unsubscribe(self, product_id: str, queue: asyncio.Queue):
+        feed = self.feeds.get(product_id)
+        if feed is None:
+            return
+        if queue in feed.subscribers:
+            feed.subscribers.remove(queue)
+        if not feed.subscribers:
+            # Stop the poller now: left sleeping, it would still be running
+            # next to the new one of a resubscribe within the interval
+            del self.feeds[product_id]
+            if feed.task is not None and not feed.task.done():
+                feed.task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "products": len(self.feeds),
+            "subscribers": sum(len(f.subscribers) for f in self.feeds.values()),
+        }
+
+
+def _default_db_service():
+    from app.api.deps import get_db_service
+    return get_db_service()
+
+
+live_yield_hub = LiveYieldHub(_default_db_service, interval=settings.LIVE_POLL_SECONDS)
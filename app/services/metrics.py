@@ -0,0 +1,245 @@
+"""
+Request Metrics
+Timed spans around the hot path (DB calls, analytics, chart generation,
+template rendering). Each span is added to the current request's
+Server-Timing header and aggregated into Prometheus latency histograms.
+"""
+import contextvars
+import functools
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+import jinja2
+
+from app.services.latency_injection import NON_DB_METHODS
+
+# Latency buckets in seconds
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Spans of the request being served (None outside a request, e.g. job workers)
+_request_spans: contextvars.ContextVar = contextvars.ContextVar("request_spans", default=None)
+# Set while inside an instrumented DB call so nested calls are not counted twice
+_in_db_call: contextvars.ContextVar = contextvars.ContextVar("in_db_call", default=False)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Tuple[str, ...], values: tuple) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+class Histogram:
+    """Cumulative Prometheus histogram keyed by label values"""
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...], buckets=BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, values: tuple, seconds: float):
+        with self._lock:
+            series = self._series.get(values)
+            if series is None:
+                # [bucket counts..., sum, count]
+                series = self._series[values] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    series[i] += 1
+            series[-2] += seconds
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        for values, series in items:
+            for bound, count in zip(self.buckets, series):
+                lines.append(
+                    f"{self.name}_bucket{_labels(self.labels + ('le',), values + (repr(bound),))} {count}"
+                )
+            lines.append(f"{self.name}_bucket{_labels(self.labels + ('le',), values + ('+Inf',))} {series[-1]}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, values)} {series[-2]:.6f}")
+            lines.append(f"{self.name}_count{_labels(self.labels, values)} {series[-1]}")
+        return lines
+
+
+class Counter:
+    """Monotonic Prometheus counter keyed by label values"""
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...]):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._series: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, values: tuple, amount: float = 1):
+        with self._lock:
+            self._series[values] = self._series.get(values, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._series.items())
+        for values, total in items:
+            lines.append(f"{self.name}{_labels(self.labels, values)} {total:g}")
+        return lines
+
+
+def sample_lines(name: str, help: str, samples, kind: str = "gauge") -> List[str]:
+    """Prometheus metric from (labels dict, value) samples read at scrape time"""
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        lines.append(f"{name}{_labels(tuple(labels), tuple(labels.values()))} {value:g}")
+    return lines
+
+
+span_seconds = Histogram(
+    "sonar_span_duration_seconds", "Time spent in instrumented spans", ("span",)
+)
+db_rows = Counter(
+    "sonar_db_rows_total", "Rows returned by instrumented DB calls", ("span",)
+)
+db_pool_wait_seconds = Histogram(
+    "sonar_db_pool_wait_seconds", "Time to check a connection out of the pool (includes opening one)", ("backend",)
+)
+db_connect_seconds = Histogram(
+    "sonar_db_connect_seconds", "Time to open a new DB connection (driver connect / login)", ("backend",)
+)
+db_pool_timeouts = Counter(
+    "sonar_db_pool_timeouts_total", "Checkouts that gave up after DB_POOL_TIMEOUT_SECONDS", ("backend",)
+)
+db_pool_invalidations = Counter(
+    "sonar_db_pool_invalidated_total", "Pooled connections discarded as broken (failed pre-ping or error)", ("backend",)
+)
+singleflight_calls = Counter(
+    "sonar_singleflight_calls_total", "Coalesced calls: leaders ran the work, followers shared its result", ("call", "role")
+)
+cancelled_requests = Counter(
+    "sonar_cancelled_requests_total", "Requests whose work was abandoned (client disconnected or superseded)", ("handler", "reason")
+)
+jobs_finished = Counter(
+    "sonar_jobs_finished_total", "Background jobs by outcome (done, failed, cancelled)", ("kind", "status")
+)
+request_seconds = Histogram(
+    "sonar_http_request_duration_seconds", "HTTP request latency until the response completes",
+    ("method", "handler", "status")
+)
+
+
+def start_request() -> Tuple[list, contextvars.Token]:
+    """Collect spans for the current request; pass the token to end_request()"""
+    spans = []
+    return spans, _request_spans.set(spans)
+
+
+def end_request(token: contextvars.Token):
+    _request_spans.reset(token)
+
+
+def record(name: str, seconds: float, rows: Optional[int] = None, detail: str = None):
+    span_seconds.observe((name,), seconds)
+    if rows is not None:
+        db_rows.inc((name,), rows)
+    spans = _request_spans.get()
+    if spans is not None:
+        spans.append((name, seconds, rows, detail))
+
+
+@contextmanager
+def span(name: str, detail: str = None):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - started, detail=detail)
+
+
+def timed(name: str):
+    """Decorator form of span()"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _timed_db(name: str, fn):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if _in_db_call.get():
+            return fn(*args, **kwargs)
+        token = _in_db_call.set(True)
+        started = time.perf_counter()
+        rows = None
+        try:
+            result = fn(*args, **kwargs)
+            rows = len(result) if isinstance(result, list) else None
+            return result
+        finally:
+            _in_db_call.reset(token)
+            record(name, time.perf_counter() - started, rows=rows)
+    return wrapper
+
+
+def instrument_db(cls):
+    """
+    Class decorator timing the get_* queries a DB service defines
+
+    Settings-store lookups are skipped, and so are generators (their time
+    is spent by whoever iterates them).
+    """
+    for attr, fn in list(vars(cls).items()):
+        if (
+            attr.startswith("get_") and attr not in NON_DB_METHODS
+            and inspect.isfunction(fn) and not inspect.isgeneratorfunction(fn)
+        ):
+            setattr(cls, attr, _timed_db(f"db.{attr}", fn))
+    return cls
+
+
+class TimedTemplate(jinja2.Template):
+    """Jinja template whose render() is recorded as a "template" span"""
+
+    def render(self, *args, **kwargs):
+        with span("template", detail=self.name):
+            return super().render(*args, **kwargs)
+
+
+def server_timing(spans: list, total: float) -> str:
+    """Server-Timing header value: one entry per span name, in first-seen order"""
+    merged: Dict[str, list] = {}
+    for name, seconds, rows, detail in list(spans):
+        entry = merged.setdefault(name, [0.0, 0, None, detail])
+        entry[0] += seconds
+        entry[1] += 1
+        if rows is not None:
+            entry[2] = (entry[2] or 0) + rows
+
+    parts = []
+    for name, (seconds, calls, rows, detail) in merged.items():
+        desc = []
+        if detail and calls == 1:
+            desc.append(detail)
+        if calls > 1:
+            desc.append(f"{calls} calls")
+        if rows is not None:
+            desc.append(f"{rows} rows")
+        part = f"{name};dur={seconds * 1000:.1f}"
+        if desc:
+            part += ';desc="' + ", ".join(desc).replace('"', "'") + '"'
+        parts.append(part)
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
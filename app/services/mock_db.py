@@ -1,11 +1,14 @@
 import random
 from datetime import date, timedelta, datetime
-import pandas as pd
 import numpy as np
-from typing import List
+from typing import Dict, Iterator, List, Optional
 from app.models.sonar_schema import SemiCpHeader
 from app.models.wafer_map import WaferMapResponse
-import math
+from app.core.config import settings
+from app.services.metrics import instrument_db
+from app.services.single_flight import coalesce
+from app.services.wafer_synth import WaferSynthesizer, stable_seed
+from app.services.synthetic_dataset import SyntheticDataset, read_dataset_meta
 
 class MockSettingsService:
     def __init__(self):
@@ -15,12 +18,19 @@ class MockSettingsService:
             {"id": "PRODUCT-B", "name": "Product B", "active": False},
             {"id": "PRODUCT-C", "name": "Product C", "active": False},
         ]
+        if settings.MOCK_DATASET_DIR:
+            # Products come from the generated dataset (first one active)
+            self.products = [
+                {"id": p, "name": p, "active": i == 0}
+                for i, p in enumerate(read_dataset_meta(settings.MOCK_DATASET_DIR)["products"])
+            ]
         self.yield_targets = {
             # Format: 'YYYY-MM': { 'PRODUCT-ID': target_val }
             "2023-10": {"PRODUCT-A": 98.0, "PRODUCT-B": 95.0},
             "2023-11": {"PRODUCT-A": 98.5, "PRODUCT-B": 96.0},
             "2023-12": {"PRODUCT-A": 99.0, "PRODUCT-B": 97.0},
         }
+        self.version = 0
 
     def get_products(self):
         return self.products
@@ -29,6 +39,7 @@ class MockSettingsService:
         for p in self.products:
             if p["id"] == product_id:
                 p["active"] = active
+                self.version += 1
                 return p
         return None
 
@@ -43,21 +54,49 @@ class MockSettingsService:
         if month not in self.yield_targets:
             self.yield_targets[month] = {}
         self.yield_targets[month][product_id] = target
+        self.version += 1
         return self.yield_targets[month]
 
+    def set_targets(self, product_id: str, targets: Dict[str, float]):
+        if not targets:
+            return targets
+        for month, target in targets.items():
+            self.yield_targets.setdefault(month, {})[product_id] = target
+        self.version += 1
+        return targets
+
+    def settings_version(self) -> int:
+        """Changes whenever products or targets change"""
+        return self.version
+
 mock_settings_service = MockSettingsService()
 
+@instrument_db
 class MockDBService:
-    def __init__(self):
-        pass
+    def __init__(self, dataset_dir: str = None):
+        dataset_dir = dataset_dir or settings.MOCK_DATASET_DIR
+        # Persistent synthetic dataset (memory-mapped), see synthetic_dataset.py
+        self.dataset = SyntheticDataset(dataset_dir) if dataset_dir else None
+        if self.dataset is not None:
+            self.synthesizer = self.dataset.synthesizer()
+        else:
+            self.synthesizer = WaferSynthesizer(
+                diameter_mm=settings.MOCK_WAFER_DIAMETER_MM,
+                die_width_mm=settings.MOCK_DIE_SIZE_MM
+            )
 
+    @coalesce("db.get_cp_yield_trend")
     def get_cp_yield_trend(self, product_id: str, start_date: date, end_date: date) -> List[dict]:
+        if self.dataset is not None:
+            rows = self.dataset.rows_between(product_id, start_date, end_date)
+            return self.dataset.records(rows, product_id)
+        
         # Generate mock data using SEMI_CP_HEADER schema
         data = []
         current_date = start_date
         
-        # Base yield depends on product_id hash
-        base_yield = 90.0 + (hash(product_id) % 10) / 2.0
+        # Base yield depends on a stable product_id digest
+        base_yield = 90.0 + (stable_seed(product_id) % 10) / 2.0
         
         # Get target from settings for simplistic comparison in trend (optional, handled in frontend mostly)
         
@@ -115,10 +154,46 @@ class MockDBService:
             
         return data
 
+    def get_export_bin_keys(self, product_id: str, start_date: date, end_date: date) -> List[str]:
+        if self.dataset is not None:
+            return list(self.dataset.bin_keys)
+        return ["1_Pass", "3_Open", "7_Short", "99_Other"]
+
+    def iter_cp_export(self, product_id: str, start_date: date, end_date: date, batch_size: int = 5000) -> Iterator[List[dict]]:
+        """Header rows (with bins) for whole days [start_date, end_date], in batches"""
+        if self.dataset is not None:
+            rows = self.dataset.rows_between(product_id, start_date, end_date)
+            for start in range(rows.start, rows.stop, batch_size):
+                yield self.dataset.records(slice(start, min(start + batch_size, rows.stop)), product_id)
+            return
+        data = self.get_cp_yield_trend(product_id, start_date, end_date)
+        for start in range(0, len(data), batch_size):
+            yield data[start:start + batch_size]
+
+    @coalesce("db.get_product_watermark")
+    def get_product_watermark(self, product_id: str) -> Optional[str]:
+        """Latest REGIST_DATE of a product (data version for HTTP validators)"""
+        if self.dataset is not None:
+            rows = self.dataset.product_slice(product_id)
+            if rows.stop <= rows.start:
+                return None
+            return str(self.dataset.regist_date[rows.stop - 1])
+        # Generated data only changes with the date window
+        return date.today().isoformat()
+
+    def get_lot_watermark(self, lot_id: str) -> Optional[str]:
+        """Data version of a lot's wafer maps (maps are deterministic per lot)"""
+        if self.dataset is not None:
+            rows = self.dataset.lot_rows(lot_id)
+            return f"{self.dataset.path.name}:{rows.start}:{rows.stop}"
+        return self.synthesizer.namespace
+
     def get_lots(self, product_id: str) -> List[str]:
+        if self.dataset is not None:
+            # Five most recent lots, newest first
+            return self.dataset.product_lots(product_id)[-5:][::-1].tolist()
+        
         # Generate deterministic lots for a product
-        seed = int(hash(product_id)) % 1000
-        random.seed(seed)
         lots = []
         for i in range(5):
             date_part = (datetime.now() - timedelta(days=i*5)).strftime('%Y%m%d')
@@ -129,71 +204,132 @@ class MockDBService:
         """Alias for get_lots to match views API"""
         return self.get_lots(product_id)
     
+    def get_lot_summaries(self, product_id: str, limit: int = 20, before: Optional[tuple] = None) -> List[dict]:
+        """One page of lots (newest first) with wafer count and mean yield"""
+        if self.dataset is not None:
+            # Same 30-day window as the Oracle lot query
+            cutoff = datetime.now() - timedelta(days=30)
+            summaries = [s for s in self._dataset_lot_summaries(product_id) if s["last_date"] >= cutoff]
+        else:
+            # One generated lot per day over the last 30 days
+            base_yield = 90.0 + (stable_seed(product_id) % 10) / 2.0
+            summaries = []
+            for i in range(30):
+                day = datetime.combine(date.today() - timedelta(days=i), datetime.min.time())
+                lot_id = f"LOT-{day.strftime('%Y%m%d')}-{product_id[-1]}"
+                rng = np.random.default_rng(stable_seed(product_id, lot_id))
+                summaries.append({
+                    "lot_id": lot_id,
+                    "last_date": day,
+                    "wafer_count": 25,
+                    "mean_yield": round(float(base_yield + rng.normal(0, 1.5)), 2)
+                })
+        
+        if before is not None:
+            summaries = [s for s in summaries if (s["last_date"], s["lot_id"]) < tuple(before)]
+        return summaries[:limit]
+
+    def _dataset_lot_summaries(self, product_id: str) -> List[dict]:
+        """All lots of a dataset product, newest first"""
+        lots = self.dataset.product_lots(product_id)
+        if not len(lots):
+            return []
+        # Lots are contiguous row blocks; reduce each block in one pass
+        bounds = self.dataset.product_lot_bounds(product_id)
+        starts = bounds[:-1] - bounds[0]
+        counts = np.diff(bounds)
+        rates = self.dataset.pass_chip_rate[bounds[0]:bounds[-1]].astype(np.float64)
+        means = np.add.reduceat(rates, starts) / counts
+        last_dates = self.dataset.regist_date[bounds[1:] - 1].astype(datetime)
+        summaries = [{
+            "lot_id": str(lot_id),
+            "last_date": last_date,
+            "wafer_count": int(count),
+            "mean_yield": round(float(mean), 2)
+        } for lot_id, last_date, count, mean in zip(lots.tolist(), last_dates.tolist(), counts, means)]
+        summaries.sort(key=lambda s: (s["last_date"], s["lot_id"]), reverse=True)
+        return summaries
+
+    @coalesce("db.get_wafer_maps")
     def get_wafer_maps(self, lot_id: str) -> List[dict]:
         """Get all wafer maps for a lot as dicts"""
         maps = self.get_lot_wafer_maps(lot_id)
         return [m.model_dump() for m in maps]
 
+    def _wafer_bins(self, lot_id: str, wafer_id: int) -> np.ndarray:
+        """Materialized dataset map if present, otherwise synthesized"""
+        if self.dataset is not None:
+            rows = self.dataset.lot_rows(lot_id)
+            wafer_ids = self.dataset.wafer_id[rows]
+            hits = np.flatnonzero(wafer_ids == wafer_id)
+            if hits.size:
+                map_row = int(self.dataset.map_row[rows.start + int(hits[0])])
+                if map_row >= 0:
+                    return np.asarray(self.dataset.die_bins[map_row])
+        return self.synthesizer.wafer_bins(lot_id, wafer_id)
+
+    def _lot_info(self, lot_id: str):
+        """(product_id, wafer_ids) for a lot"""
+        if self.dataset is not None:
+            rows = self.dataset.lot_rows(lot_id)
+            if rows.stop > rows.start:
+                return self.dataset.lot_product(rows), self.dataset.wafer_id[rows].tolist()
+        return "TEST-PRODUCT", list(range(1, 26)) # Mock product, 25 wafers
+
     def get_wafer_map(self, lot_id: str, wafer_id: int) -> WaferMapResponse:
-        # Generate synthetic wafer map
-        # Deterministic generation based on lot_id + wafer_id
-        seed = hash(f"{lot_id}-{wafer_id}")
-        random.seed(seed)
-        
-        # Assume 300mm wafer, die size ~10mm -> ~30x30 grid
-        radius = 15
-        x_coords = []
-        y_coords = []
-        bins = []
+        # Deterministic synthetic wafer map (stable across processes)
+        x_coords, y_coords = self.synthesizer.die_coords()
+        bins = self._wafer_bins(lot_id, wafer_id)
+        product_id, _ = self._lot_info(lot_id)
         
-        product_id = "TEST-PRODUCT" # Mock product
-        
-        for x in range(-radius, radius + 1):
-            for y in range(-radius, radius + 1):
-                # Check if inside wafer circle
-                if x*x + y*y <= radius*radius:
-                    
-                    # Generate bin
-                    dist = math.sqrt(x*x + y*y)
-                    prob_fail = 0.05
-                    
-                    # Edge failure signature -> Soft Bin 3 (Open)
-                    # Use deterministic random checks
-                    is_edge_fail = False
-                    if dist > radius - 2: 
-                        if random.random() < 0.4:
-                            is_edge_fail = True
-
-                    if is_edge_fail:
-                        x_coords.append(x)
-                        y_coords.append(y)
-                        bins.append(3) # Open
-                    elif random.random() < prob_fail:
-                        # Random defects -> Mix of 7 (Short) and 99 (Other)
-                        if random.random() < 0.6:
-                            bins.append(7) # Short
-                        else:
-                            bins.append(99) # Other
-                        x_coords.append(x)
-                        y_coords.append(y)
-                    else:
-                        bins.append(1) # Pass
-                        x_coords.append(x)
-                        y_coords.append(y)
-                        
         return WaferMapResponse(
             lot_id=lot_id,
             wafer_id=wafer_id,
             product_id=product_id,
-            x=x_coords,
-            y=y_coords,
-            bin=bins
+            x=x_coords.tolist(),
+            y=y_coords.tolist(),
+            bin=bins.tolist()
         )
 
+    def get_wafer(self, lot_id: str, wafer_id: int) -> Optional[dict]:
+        """Single wafer map as a dict, or None if the lot has no such wafer"""
+        _, wafer_ids = self._lot_info(lot_id)
+        if wafer_id not in wafer_ids:
+            return None
+        return self.get_wafer_map(lot_id, wafer_id).model_dump()
+
     def get_lot_wafer_maps(self, lot_id: str) -> List[WaferMapResponse]:
-        maps = []
-        for i in range(1, 26): # 25 wafers
-            maps.append(self.get_wafer_map(lot_id, i))
-        return maps
+        product_id, wafer_ids = self._lot_info(lot_id)
+        x_coords, y_coords = self.synthesizer.die_coords()
+        x_list, y_list = x_coords.tolist(), y_coords.tolist()
+        if self.dataset is not None:
+            lot_bins = [self._wafer_bins(lot_id, w) for w in wafer_ids]
+        else:
+            lot_bins = self.synthesizer.lot_bins(lot_id, wafer_ids)
+        return [
+            WaferMapResponse(
+                lot_id=lot_id,
+                wafer_id=wafer_id,
+                product_id=product_id,
+                x=x_list,
+                y=y_list,
+                bin=bins.tolist()
+            )
+            for wafer_id, bins in zip(wafer_ids, lot_bins)
+        ]
+
+    def get_lot_wafer_arrays(self, lot_id: str) -> List[dict]:
+        """Lot wafer maps with NumPy die arrays (no int lists, no validation)"""
+        product_id, wafer_ids = self._lot_info(lot_id)
+        x_coords, y_coords = self.synthesizer.die_coords()
+        if self.dataset is not None:
+            lot_bins = [self._wafer_bins(lot_id, w) for w in wafer_ids]
+        else:
+            lot_bins = self.synthesizer.lot_bins(lot_id, wafer_ids)
+        return [
+            {"lot_id": lot_id, "wafer_id": wafer_id, "product_id": product_id,
+             "x": x_coords, "y": y_coords, "bin": bins}
+            for wafer_id, bins in zip(wafer_ids, lot_bins)
+        ]
 
 mock_db_service = MockDBService()
@@ -1,76 +1,182 @@
 """
-JSON-based Settings Store
-Persists product active states and yield targets to a JSON file
+SQLite Settings Store
+Persists product active states and yield targets in an SQLite file (WAL),
+shared by every worker process. Writes are transactions that bump a
+version counter; reads come from an in-memory snapshot reloaded when the
+counter has moved.
 """
 import json
-import os
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Dict, Optional
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS product_active_states (
+    product_id TEXT PRIMARY KEY,
+    active INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS yield_targets (
+    product_id TEXT NOT NULL,
+    month TEXT NOT NULL,
+    target REAL NOT NULL,
+    PRIMARY KEY (product_id, month)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('version', 0);
+"""
+
 
 class SettingsStore:
     def __init__(self, filepath: str = None):
         if filepath is None:
-            # Default to data/settings.json relative to project root
+            # Default to data/settings.db relative to project root
             project_root = Path(__file__).parent.parent.parent
-            self._filepath = project_root / "data" / "settings.json"
+            self._filepath = project_root / "data" / "settings.db"
         else:
             self._filepath = Path(filepath)
-        
-        # Ensure directory exists
-        self._filepath.parent.mkdir(parents=True, exist_ok=True)
-        
-        # Load existing data or initialize empty
-        self._data = self._load()
-    
-    def _load(self) -> Dict:
-        """Load settings from JSON file"""
-        if self._filepath.exists():
-            try:
-                with open(self._filepath, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, IOError):
-                return self._default_data()
-        return self._default_data()
-    
-    def _default_data(self) -> Dict:
-        return {
-            "product_active_states": {},
-            "yield_targets": {}
-        }
-    
-    def _save(self):
-        """Save settings to JSON file"""
+        # Earlier releases kept settings in a JSON file next to the database
+        self._legacy_filepath = self._filepath.with_suffix(".json")
+
+        # Opened on first access; nothing touches the disk at import
+        self._conn = None
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._snapshot_version = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._filepath.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self._filepath), timeout=10.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+            self._import_legacy_json()
+        return self._conn
+
+    def _import_legacy_json(self):
+        """One-time import of settings.json into an empty database"""
+        if not self._legacy_filepath.exists():
+            return
+        try:
+            with open(self._legacy_filepath, 'r', encoding='utf-8') as f:
+                legacy = json.load(f)
+        except (json.JSONDecodeError, IOError) as e:
+            logger.warning("Could not read legacy settings %s: %s", self._legacy_filepath, e)
+            return
+
+        targets = {}
+        for key, target in legacy.get("yield_targets", {}).items():
+            # Keys are "<product_id>-<YYYY-MM>"
+            product_id, month = key[:-8], key[-7:]
+            targets[(product_id, month)] = target
+        with self._transaction() as conn:
+            # Another worker may have imported it first
+            if conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0] > 0:
+                return
+            conn.executemany(
+                "INSERT OR REPLACE INTO product_active_states (product_id, active) VALUES (?, ?)",
+                [(pid, int(bool(active))) for pid, active in legacy.get("product_active_states", {}).items()]
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO yield_targets (product_id, month, target) VALUES (?, ?, ?)",
+                [(pid, month, float(target)) for (pid, month), target in targets.items()]
+            )
+        logger.info("Imported legacy settings from %s", self._legacy_filepath)
+
+    @contextmanager
+    def _transaction(self):
+        """BEGIN IMMEDIATE ... COMMIT; bumps the version if anything changed, rolls back on error"""
+        conn = self._conn
+        # Take the write lock up front so concurrent writers queue instead of failing
+        conn.execute("BEGIN IMMEDIATE")
+        changes_before = conn.total_changes
         try:
-            with open(self._filepath, 'w', encoding='utf-8') as f:
-                json.dump(self._data, f, indent=2, ensure_ascii=False)
-        except IOError as e:
-            print(f"Warning: Could not save settings: {e}")
-    
+            yield conn
+            if conn.total_changes != changes_before:
+                conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _current(self) -> Dict:
+        """Snapshot of all settings, reloaded when another writer bumped the version"""
+        with self._lock:
+            conn = self._connect()
+            version = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+            if self._snapshot is None or version != self._snapshot_version:
+                # Read both tables from one snapshot of the database
+                conn.execute("BEGIN")
+                try:
+                    version = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+                    active_states = dict(conn.execute("SELECT product_id, active FROM product_active_states"))
+                    targets = {
+                        f"{pid}-{month}": target
+                        for pid, month, target in conn.execute("SELECT product_id, month, target FROM yield_targets")
+                    }
+                finally:
+                    conn.execute("COMMIT")
+                self._snapshot = {
+                    "product_active_states": {pid: bool(active) for pid, active in active_states.items()},
+                    "yield_targets": targets,
+                }
+                self._snapshot_version = version
+            return self._snapshot
+
+    @property
+    def version(self) -> int:
+        """Bumped by every write from any worker; part of HTTP cache validators"""
+        with self._lock:
+            return self._connect().execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+
     # Product active states
     def get_product_active(self, product_id: str) -> bool:
         """Get product active state, default False"""
-        return self._data["product_active_states"].get(product_id, False)
-    
+        return self._current()["product_active_states"].get(product_id, False)
+
     def set_product_active(self, product_id: str, active: bool):
-        """Set product active state and save"""
-        self._data["product_active_states"][product_id] = active
-        self._save()
-    
+        """Set product active state"""
+        with self._lock:
+            self._connect()
+            with self._transaction() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO product_active_states (product_id, active) VALUES (?, ?)",
+                    (product_id, int(active))
+                )
+
     # Yield targets
     def get_target(self, product_id: str, month: str = None) -> Optional[float]:
         """Get yield target for product/month, returns None if not set"""
         if not month:
             month = datetime.now().strftime("%Y-%m")
         key = f"{product_id}-{month}"
-        return self._data["yield_targets"].get(key)
-    
+        return self._current()["yield_targets"].get(key)
+
     def set_target(self, product_id: str, month: str, target: float):
-        """Set yield target and save"""
-        key = f"{product_id}-{month}"
-        self._data["yield_targets"][key] = target
-        self._save()
+        """Set yield target"""
+        self.set_targets(product_id, {month: target})
+
+    def set_targets(self, product_id: str, targets: Dict[str, float]):
+        """Set several months' targets for a product in one transaction"""
+        if not targets:
+            return
+        with self._lock:
+            self._connect()
+            with self._transaction() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO yield_targets (product_id, month, target) VALUES (?, ?, ?)",
+                    [(product_id, month, float(target)) for month, target in targets.items()]
+                )
 
 
 # Singleton instance
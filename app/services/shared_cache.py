@@ -0,0 +1,285 @@
+"""
+Shared Cache
+Host-wide cache tier in an SQLite file, shared by every worker process.
+Entries carry their own expiry; the file is bounded by size, least
+recently used entries evicted first.
+
+Values are stored as tagged JSON, never pickle: anything that can write the
+file can change cached data, but not run code in the workers.
+"""
+import base64
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    expires REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+"""
+
+# Hits refresh the LRU timestamp at most this often (a refresh is a write)
+ACCESS_RESOLUTION_SECONDS = 10.0
+# The size bound is enforced every this many writes
+TRIM_EVERY = 32
+# Evict down to this fraction of max_bytes so trims don't run back to back
+TRIM_TARGET = 0.8
+
+
+def _encode(value: Any) -> Any:
+    """JSON-ready form of a cached value; other types raise TypeError"""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value.item() if isinstance(value, np.generic) else value
+    if isinstance(value, np.ndarray):
+        data = base64.b64encode(np.ascontiguousarray(value).tobytes()).decode("ascii")
+        return {"__ndarray__": [value.dtype.str, list(value.shape), data]}
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, date):
+        return {"__date__": value.isoformat()}
+    if isinstance(value, list):
+        return [_encode(v) for v in value]
+    if isinstance(value, tuple):
+        return {"__tuple__": [_encode(v) for v in value]}
+    if isinstance(value, dict):
+        if all(isinstance(k, str) and not k.startswith("__") for k in value):
+            return {k: _encode(v) for k, v in value.items()}
+        return {"__dict__": [[_encode(k), _encode(v)] for k, v in value.items()]}
+    raise TypeError(f"{type(value).__name__} is not storable in the shared cache")
+
+
+def _decode_tagged(obj: dict) -> Any:
+    if len(obj) == 1:
+        (tag, payload), = obj.items()
+        if tag == "__ndarray__":
+            dtype, shape, data = payload
+            return np.frombuffer(base64.b64decode(data), dtype=np.dtype(dtype)).reshape(shape).copy()
+        if tag == "__datetime__":
+            return datetime.fromisoformat(payload)
+        if tag == "__date__":
+            return date.fromisoformat(payload)
+        if tag == "__tuple__":
+            return tuple(payload)
+        if tag == "__dict__":
+            return {k: v for k, v in payload}
+    return obj
+
+
+def dumps(value: Any) -> bytes:
+    return json.dumps(_encode(value), separators=(",", ":")).encode()
+
+
+def loads(blob: bytes) -> Any:
+    return json.loads(blob, object_hook=_decode_tagged)
+
+
+class SharedCache:
+    """
+    JSON-encoded values keyed by string in an SQLite file (WAL, one
+    connection per thread). Values may be built from dicts, lists, tuples,
+    scalars, dates and NumPy arrays. Storage errors are logged and behave as misses, so the
+    in-process tier keeps working if the file is unavailable.
+
+    Args:
+        path: SQLite file; every worker on the host must use the same one
+        max_bytes: Upper bound on the stored (encoded) bytes
+        max_item_bytes: Larger values are not shared
+        namespace: Prefix for every key (see cache_namespace), so processes
+            serving different data never share entries
+    """
+
+    def __init__(self, path: str, max_bytes: int, max_item_bytes: Optional[int] = None, namespace: str = ""):
+        self.path = Path(path)
+        self.namespace = f"{namespace}/" if namespace else ""
+        self.max_bytes = max_bytes
+        self.max_item_bytes = max_item_bytes or max_bytes // 8
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.evictions = 0
+        self.errors = 0
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def _failed(self, action: str, e: Exception):
+        with self._lock:
+            self.errors += 1
+        print(f"Shared cache {action} failed: {e}")
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """(value, expires as wall-clock time) or None"""
+        key = self.namespace + key
+        now = time.time()
+        try:
+            conn = self._conn()
+            row = conn.execute("SELECT value, expires, accessed FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            blob, expires, accessed = row
+            if expires < now:
+                conn.execute("DELETE FROM entries WHERE key = ? AND expires < ?", (key, now))
+                return None
+            if now - accessed > ACCESS_RESOLUTION_SECONDS:
+                conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+        except sqlite3.Error as e:
+            self._failed("read", e)
+            return None
+        try:
+            return loads(blob), expires
+        except Exception as e:
+            # Written by an incompatible release (or not by us); drop it
+            print(f"Shared cache entry {key} unreadable, discarding: {e}")
+            self.delete(key[len(self.namespace):])
+            return None
+
+    def set(self, key: str, value: Any, ttl: float):
+        try:
+            blob = dumps(value)
+        except (TypeError, ValueError) as e:
+            print(f"Shared cache cannot store {key}: {e}")
+            return
+        if len(blob) > self.max_item_bytes:
+            return
+        key = self.namespace + key
+        now = time.time()
+        try:
+            self._conn().execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, expires, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, blob, len(blob), now + ttl, now)
+            )
+        except sqlite3.Error as e:
+            self._failed("write", e)
+            return
+        with self._lock:
+            self._writes += 1
+            trim = self._writes % TRIM_EVERY == 1
+        if trim:
+            self.trim()
+
+    def contains(self, key: str) -> bool:
+        try:
+            row = self._conn().execute("SELECT 1 FROM entries WHERE key = ? AND expires >= ?", (self.namespace + key, time.time())).fetchone()
+        except sqlite3.Error as e:
+            self._failed("read", e)
+            return False
+        return row is not None
+
+    def delete(self, key: str):
+        try:
+            self._conn().execute("DELETE FROM entries WHERE key = ?", (self.namespace + key,))
+        except sqlite3.Error as e:
+            self._failed("delete", e)
+
+    def clear(self, prefix: str = ""):
+        """Delete every entry whose key starts with `prefix`"""
+        prefix = self.namespace + prefix
+        try:
+            self._conn().execute("DELETE FROM entries WHERE substr(key, 1, ?) = ?", (len(prefix), prefix))
+        except sqlite3.Error as e:
+            self._failed("delete", e)
+
+    def trim(self) -> int:
+        """Drop expired entries, then least recently used ones until under the size bound"""
+        try:
+            conn = self._conn()
+            removed = conn.execute("DELETE FROM entries WHERE expires < ?", (time.time(),)).rowcount
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total > self.max_bytes:
+                removed += conn.execute(
+                    """
+                    DELETE FROM entries WHERE key IN (
+                        SELECT key FROM (
+                            SELECT key, SUM(size) OVER (ORDER BY accessed DESC, key) AS kept FROM entries
+                        ) WHERE kept > ?
+                    )
+                    """,
+                    (int(self.max_bytes * TRIM_TARGET),)
+                ).rowcount
+        except sqlite3.Error as e:
+            self._failed("trim", e)
+            return 0
+        with self._lock:
+            self.evictions += removed
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            entries, size = self._conn().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        except sqlite3.Error as e:
+            self._failed("read", e)
+            entries = size = 0
+        return {
+            "path": str(self.path),
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "errors": self.errors,
+        }
+
+
+def cache_namespace() -> str:
+    """
+    Backend, its data source and the release
+
+    Deployments sharing a host (other dataset, database file or DSN, or
+    another code version) never read each other's entries.
+    """
+    from app.api.deps import get_db_backend
+    from app.core.release import RELEASE_ID
+    backend = get_db_backend()
+    if backend == "sqlite":
+        source = str(Path(settings.SQLITE_DB_PATH).resolve())
+    elif backend == "oracle":
+        source = f"{settings.ORACLE_USER}@{settings.ORACLE_DSN}"
+    elif settings.MOCK_DATASET_DIR:
+        source = str(Path(settings.MOCK_DATASET_DIR).resolve())
+    else:
+        source = f"generated:{settings.MOCK_WAFER_DIAMETER_MM}:{settings.MOCK_DIE_SIZE_MM}"
+    digest = hashlib.blake2b(source.encode(), digest_size=8).hexdigest()
+    return f"{backend}-{digest}-{RELEASE_ID}"
+
+
+_shared_cache: Optional[SharedCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_shared_cache() -> Optional[SharedCache]:
+    """The host-wide cache, or None when SHARED_CACHE_ENABLED is off"""
+    global _shared_cache
+    if not settings.SHARED_CACHE_ENABLED:
+        return None
+    if _shared_cache is None:
+        with _shared_cache_lock:
+            if _shared_cache is None:
+                _shared_cache = SharedCache(
+                    settings.SHARED_CACHE_PATH,
+                    int(settings.SHARED_CACHE_MAX_MB * 1024 * 1024),
+                    namespace=cache_namespace()
+                )
+    return _shared_cache
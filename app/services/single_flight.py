@@ -0,0 +1,137 @@
+"""
+Single-Flight Coalescing
+Concurrent callers asking for the same key wait on one in-flight call and
+share its result (or its exception). Nothing is kept afterwards: the next
+caller once the call has returned starts a new one.
+
+Every caller of a shared call gets its own deep copy of the result, so one
+caller mutating what it got cannot change it for the others.
+"""
+import copy
+import functools
+import threading
+from datetime import date
+from decimal import Decimal
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from app.services import metrics
+from app.services.cancellation import Cancelled, check_cancelled
+
+# Followers re-check their own request's cancellation this often while waiting
+WAIT_SLICE_SECONDS = 0.1
+
+_IMMUTABLE = (str, int, float, bool, bytes, date, Decimal, type(None))
+
+
+def isolated(value: Any) -> Any:
+    """
+    Deep copy of a result built from dicts, lists and immutable scalars
+
+    Query rows and stats are exactly that; walking them directly takes
+    about a third of copy.deepcopy's time. Anything else falls back to
+    deepcopy.
+    """
+    if isinstance(value, _IMMUTABLE):
+        return value
+    if type(value) is dict:
+        return {k: isolated(v) for k, v in value.items()}
+    if type(value) is list:
+        return [isolated(v) for v in value]
+    if type(value) is tuple:
+        return tuple(isolated(v) for v in value)
+    return copy.deepcopy(value)
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "followers")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """In-flight calls of one kind, keyed by their arguments"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Tuple[Any, bool]:
+        """
+        Run fn(*args, **kwargs) unless an identical call is already running
+
+        Returns:
+            (result, shared) - shared is True when another caller ran it
+        """
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = _Call()
+                else:
+                    call.followers += 1
+            if leader:
+                break
+
+            metrics.singleflight_calls.inc((self.name, "follower"))
+            while not call.done.wait(WAIT_SLICE_SECONDS):
+                check_cancelled()
+            if isinstance(call.error, Cancelled):
+                # The leader's request went away, not this one: run it again
+                continue
+            if call.error is not None:
+                raise call.error
+            # call.result itself is never handed out, so it stays as computed
+            return isolated(call.result), True
+
+        metrics.singleflight_calls.inc((self.name, "leader"))
+        try:
+            result = fn(*args, **kwargs)
+            call.result = result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                # Nobody can join once the call is unregistered
+                shared = call.followers > 0
+            call.done.set()
+        # Copying only when someone waited keeps the uncontended path free
+        return (isolated(result) if shared else result), False
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+
+def coalesce(name: str, key: Optional[Callable[..., Hashable]] = None):
+    """
+    Method decorator: identical concurrent calls run once
+
+    Args:
+        name: Label for metrics
+        key: key(self, *args, **kwargs) identifying identical calls; default
+            is the instance and the arguments. Unhashable keys skip coalescing.
+    """
+    flight = SingleFlight(name)
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            call_key = key(self, *args, **kwargs) if key else (id(self), args, tuple(sorted(kwargs.items())))
+            try:
+                hash(call_key)
+            except TypeError:
+                return fn(self, *args, **kwargs)
+            result, _ = flight.do(call_key, fn, self, *args, **kwargs)
+            return result
+
+        wrapper.single_flight = flight
+        return wrapper
+
+    return decorator
@@ -0,0 +1,305 @@
+"""
+SQLite DB Service
+Embedded stand-in for Oracle that runs the same SQL as OracleDBService
+against local SEMI_CP_HEADER / SEMI_CP_BIN_SUM tables.
+
+REGIST_DATE is stored as a Julian day number, so Oracle-style
+"SYSDATE - n" day arithmetic works unchanged with SYSDATE mapped to
+julianday('now', 'localtime').
+
+Usage:
+    python -m app.services.sqlite_db load --dataset data/synthetic --days 90
+    python -m app.services.sqlite_db explain PRODUCT-A --days 30
+"""
+import argparse
+import time
+import numpy as np
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+from sqlalchemy import create_engine, event, text
+
+from app.core.config import settings
+from app.models.wafer_map import WaferMapResponse
+from app.services.db_pool import instrument_pool, pool_options
+from app.services.metrics import instrument_db
+from app.services.oracle_db import OracleDBService
+from app.services.wafer_synth import WaferSynthesizer
+
+UNIX_EPOCH_JULIAN_DAY = 2440587.5
+_UNIX_EPOCH = datetime(1970, 1, 1)
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS SEMI_CP_HEADER (
+        SUBSTRATE_ID      TEXT NOT NULL,
+        LOT_ID            TEXT,
+        WAFER_ID          INTEGER NOT NULL,
+        PRODUCT_ID        TEXT NOT NULL,
+        PROCESS           TEXT NOT NULL,
+        PASS_CHIP         INTEGER,
+        PERFECT_PASS_CHIP REAL,
+        PASS_CHIP_RATE    REAL,
+        REGIST_DATE       REAL,
+        DEL_FLAG          INTEGER,
+        REWORK_NEW        INTEGER NOT NULL,
+        EFFECTIVE_NUM     INTEGER,
+        PRIMARY KEY (SUBSTRATE_ID, PROCESS, REWORK_NEW)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS SEMI_CP_BIN_SUM (
+        SUBSTRATE_ID TEXT NOT NULL,
+        LOT_ID       TEXT,
+        WAFER_ID     INTEGER NOT NULL,
+        PRODUCT_ID   TEXT NOT NULL,
+        PROCESS      TEXT NOT NULL,
+        BIN_CODE     INTEGER NOT NULL,
+        BIN_NAME     TEXT,
+        BIN_COUNT    INTEGER,
+        REGIST_DATE  REAL,
+        REWORK_NEW   INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS SONAR_META (
+        KEY   TEXT PRIMARY KEY,
+        VALUE TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS IX_CP_HEADER_PRODUCT_DATE ON SEMI_CP_HEADER (PRODUCT_ID, PROCESS, REGIST_DATE)",
+    "CREATE INDEX IF NOT EXISTS IX_CP_HEADER_LOT ON SEMI_CP_HEADER (LOT_ID)",
+    "CREATE INDEX IF NOT EXISTS IX_CP_HEADER_DATE ON SEMI_CP_HEADER (REGIST_DATE)",
+    "CREATE INDEX IF NOT EXISTS IX_CP_BIN_SUM_SUBSTRATE ON SEMI_CP_BIN_SUM (SUBSTRATE_ID, PROCESS)",
+]
+
+
+def to_julian_day(value: datetime) -> float:
+    return (value - _UNIX_EPOCH).total_seconds() / 86400.0 + UNIX_EPOCH_JULIAN_DAY
+
+
+def from_julian_day(value: float) -> datetime:
+    seconds = round((value - UNIX_EPOCH_JULIAN_DAY) * 86400.0)
+    return _UNIX_EPOCH + timedelta(seconds=seconds)
+
+
+@instrument_db
+class SQLiteDBService(OracleDBService):
+    SYSDATE = "julianday('now', 'localtime')"
+    IN_LIST_LIMIT = 900  # Stay under SQLITE_MAX_VARIABLE_NUMBER on old builds
+    FETCH_FIRST = "LIMIT {n}"
+
+    def __init__(self, db_path: str = None):
+        super().__init__()
+        self.db_path = Path(db_path or settings.SQLITE_DB_PATH)
+        self._synthesizer = None
+
+    def _create_engine(self):
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._database_url = f"sqlite:///{self.db_path}"
+        engine = instrument_pool(create_engine(
+            self._database_url,
+            connect_args={"check_same_thread": False},
+            **pool_options()
+        ))
+
+        @event.listens_for(engine, "connect")
+        def _on_connect(dbapi_conn, _record):
+            dbapi_conn.execute("PRAGMA journal_mode=WAL")
+            dbapi_conn.execute("PRAGMA synchronous=NORMAL")
+
+        with engine.begin() as conn:
+            for ddl in SCHEMA:
+                conn.execute(text(ddl))
+        return engine
+
+    def _row_dict(self, row) -> dict:
+        row_dict = super()._row_dict(row)
+        if isinstance(row_dict.get("REGIST_DATE"), float):
+            row_dict["REGIST_DATE"] = from_julian_day(row_dict["REGIST_DATE"])
+        return row_dict
+
+    def _row_dict_value(self, value):
+        return from_julian_day(value) if isinstance(value, float) else value
+
+    def _date_param(self, value: datetime):
+        return to_julian_day(value)
+
+    # ==================== Wafer maps ====================
+    # No die-level table exists in Oracle; maps are synthesized with the
+    # geometry and seed of the dataset the database was loaded from.
+
+    def _meta(self) -> Dict[str, str]:
+        with self.engine.connect() as conn:
+            return dict(conn.execute(text("SELECT KEY, VALUE FROM SONAR_META")).fetchall())
+
+    @property
+    def synthesizer(self) -> WaferSynthesizer:
+        if self._synthesizer is None:
+            meta = self._meta()
+            self._synthesizer = WaferSynthesizer(
+                diameter_mm=float(meta.get("diameter_mm", settings.MOCK_WAFER_DIAMETER_MM)),
+                die_width_mm=float(meta.get("die_size_mm", settings.MOCK_DIE_SIZE_MM)),
+                namespace=meta.get("namespace", "sonar-mock")
+            )
+        return self._synthesizer
+
+    def get_wafer_map(self, lot_id: str, wafer_id: int) -> WaferMapResponse:
+        x_coords, y_coords = self.synthesizer.die_coords()
+        return WaferMapResponse(
+            lot_id=lot_id,
+            wafer_id=wafer_id,
+            product_id="UNKNOWN",
+            x=x_coords.tolist(),
+            y=y_coords.tolist(),
+            bin=self.synthesizer.wafer_bins(lot_id, wafer_id).tolist()
+        )
+
+    def get_lot_wafer_arrays(self, lot_id: str) -> List[dict]:
+        try:
+            with self.engine.connect() as conn:
+                wafer_ids = [int(row[0]) for row in conn.execute(self.lot_wafers_query(), {"lot_id": lot_id})]
+        except Exception as e:
+            print(f"SQLite DB Error getting lot wafers: {e}")
+            return []
+        x_coords, y_coords = self.synthesizer.die_coords()
+        return [
+            {"lot_id": lot_id, "wafer_id": wafer_id, "product_id": "UNKNOWN",
+             "x": x_coords, "y": y_coords, "bin": bins}
+            for wafer_id, bins in zip(wafer_ids, self.synthesizer.lot_bins(lot_id, wafer_ids))
+        ]
+
+    # ==================== Loading ====================
+
+    def load_dataset(self, dataset, days: Optional[int] = None, batch_size: int = 50_000, log=print) -> int:
+        """
+        Load a SyntheticDataset into the tables (replacing existing rows)
+
+        Args:
+            dataset: SyntheticDataset to read from
+            days: Only load the most recent N days (all if None)
+            batch_size: Rows per executemany batch
+
+        Returns:
+            Number of header rows loaded
+        """
+        end = date.fromisoformat(dataset.meta["end_date"])
+        start = date.fromisoformat(dataset.meta["start_date"])
+        if days is not None:
+            start = max(start, end - timedelta(days=days - 1))
+
+        bin_codes = dataset.meta["bin_codes"]
+        bin_names = dataset.meta["bin_names"]
+        raw = self.engine.raw_connection()
+        total = 0
+        try:
+            cur = raw.cursor()
+            cur.execute("DELETE FROM SEMI_CP_HEADER")
+            cur.execute("DELETE FROM SEMI_CP_BIN_SUM")
+            cur.executemany("INSERT OR REPLACE INTO SONAR_META (KEY, VALUE) VALUES (?, ?)", [
+                ("diameter_mm", str(dataset.meta["diameter_mm"])),
+                ("die_size_mm", str(dataset.meta["die_size_mm"])),
+                ("namespace", f"sonar-dataset-{dataset.meta['seed']}"),
+            ])
+
+            for product_id in dataset.products:
+                rows = dataset.rows_between(product_id, start, end)
+                for batch_start in range(rows.start, rows.stop, batch_size):
+                    batch = slice(batch_start, min(batch_start + batch_size, rows.stop))
+                    lot_ids = dataset.lots[dataset.lot_idx[batch]].tolist()
+                    wafer_ids = dataset.wafer_id[batch].tolist()
+                    substrate_ids = [f"{l}-{w:02d}" for l, w in zip(lot_ids, wafer_ids)]
+                    seconds = dataset.regist_date[batch].astype(np.int64)
+                    julian = (seconds / 86400.0 + UNIX_EPOCH_JULIAN_DAY).tolist()
+                    pass_chip = dataset.pass_chip[batch].tolist()
+                    rates = dataset.pass_chip_rate[batch].astype(np.float64).round(2).tolist()
+                    effective = dataset.effective_num[batch].tolist()
+                    counts = dataset.bin_counts[batch].tolist()
+
+                    # PERFECT_PASS_CHIP carries the yield rate, as the trend query expects
+                    cur.executemany(
+                        "INSERT INTO SEMI_CP_HEADER (SUBSTRATE_ID, LOT_ID, WAFER_ID, PRODUCT_ID, PROCESS, "
+                        "PASS_CHIP, PERFECT_PASS_CHIP, PASS_CHIP_RATE, REGIST_DATE, DEL_FLAG, REWORK_NEW, EFFECTIVE_NUM) "
+                        "VALUES (?, ?, ?, ?, 'CP', ?, ?, ?, ?, 0, 0, ?)",
+                        zip(substrate_ids, lot_ids, wafer_ids, [product_id] * len(lot_ids),
+                            pass_chip, rates, rates, julian, effective)
+                    )
+                    cur.executemany(
+                        "INSERT INTO SEMI_CP_BIN_SUM (SUBSTRATE_ID, LOT_ID, WAFER_ID, PRODUCT_ID, PROCESS, "
+                        "BIN_CODE, BIN_NAME, BIN_COUNT, REGIST_DATE, REWORK_NEW) "
+                        "VALUES (?, ?, ?, ?, 'CP', ?, ?, ?, ?, 0)",
+                        (
+                            (substrate_ids[i], lot_ids[i], wafer_ids[i], product_id,
+                             code, name, counts[i][k], julian[i])
+                            for i in range(len(lot_ids))
+                            for k, (code, name) in enumerate(zip(bin_codes, bin_names))
+                        )
+                    )
+                    total += len(lot_ids)
+                log(f"  {product_id}: {rows.stop - rows.start:,} wafers")
+            raw.commit()
+            cur.execute("ANALYZE")
+            raw.commit()
+        finally:
+            raw.close()
+        self._synthesizer = None
+        return total
+
+    # ==================== Profiling ====================
+
+    def explain_trend(self, product_id: str, days: int = 30) -> Dict[str, object]:
+        """Query plan, row volume and timing of the trend + bin queries"""
+        params = {"product_id": product_id}
+        trend = self.trend_query(days, 0)
+        with self.engine.connect() as conn:
+            plan = [row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {trend.text}"), params)]
+
+        end = date.today()
+        t0 = time.perf_counter()
+        data = self.get_cp_yield_trend(product_id, end - timedelta(days=days), end)
+        elapsed = time.perf_counter() - t0
+        round_trips = 1 + -(-len(data) // self.IN_LIST_LIMIT) if data else 1
+        return {
+            "plan": plan,
+            "rows": len(data),
+            "bin_rows": sum(len(d["bins"]) for d in data),
+            "round_trips": round_trips,
+            "seconds": round(elapsed, 4),
+        }
+
+
+sqlite_db_service = SQLiteDBService()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local SQLite stand-in for the Oracle CP tables")
+    parser.add_argument("--db", default=None, help="SQLite file (default: SQLITE_DB_PATH)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    load = sub.add_parser("load", help="Load a synthetic dataset")
+    load.add_argument("--dataset", default="data/synthetic", help="Dataset directory")
+    load.add_argument("--days", type=int, default=None, help="Only the most recent N days")
+
+    explain = sub.add_parser("explain", help="Show plan, rows and timing of the trend query")
+    explain.add_argument("product_id")
+    explain.add_argument("--days", type=int, default=30)
+
+    args = parser.parse_args(argv)
+    service = SQLiteDBService(args.db)
+
+    if args.command == "load":
+        from app.services.synthetic_dataset import SyntheticDataset
+        t0 = time.perf_counter()
+        print(f"Loading {args.dataset} into {service.db_path}")
+        count = service.load_dataset(SyntheticDataset(args.dataset), days=args.days)
+        print(f"Done: {count:,} wafers in {time.perf_counter() - t0:.1f}s")
+    else:
+        report = service.explain_trend(args.product_id, args.days)
+        for line in report.pop("plan"):
+            print(f"PLAN  {line}")
+        for key, value in report.items():
+            print(f"{key:<12}{value}")
+
+
+if __name__ == "__main__":
+    main()
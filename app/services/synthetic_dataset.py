@@ -0,0 +1,341 @@
+"""
+Synthetic CP Dataset
+Generates a persistent, production-scale synthetic dataset as columnar .npy
+files and memory-maps it back for the mock backend.
+
+Usage:
+    python -m app.services.synthetic_dataset --out data/synthetic \\
+        --products 5 --days 730 --wafers-per-day 2000 --map-days 2
+"""
+import argparse
+import json
+import math
+import time
+import numpy as np
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from app.services.wafer_synth import (
+    BIN_OPEN, BIN_OTHER, BIN_PASS, BIN_SHORT, WaferSynthesizer, stable_seed
+)
+
+DATASET_VERSION = 1
+WAFERS_PER_LOT = 25
+BIN_CODES = [BIN_PASS, BIN_OPEN, BIN_SHORT, BIN_OTHER]
+BIN_NAMES = ["Pass", "Open", "Short", "Other"]
+
+# Per-wafer columns, one row per wafer, rows sorted by (product, REGIST_DATE)
+HEADER_COLUMNS = {
+    "product_idx": np.uint16,
+    "lot_idx": np.uint32,
+    "wafer_id": np.uint8,
+    "regist_date": "datetime64[s]",
+    "pass_chip": np.int32,
+    "effective_num": np.int32,
+    "pass_chip_rate": np.float32,
+    "map_row": np.int32,
+}
+
+
+def product_names(count: int) -> List[str]:
+    """PRODUCT-A .. PRODUCT-Z, then PRODUCT-027 onwards"""
+    names = []
+    for i in range(count):
+        names.append(f"PRODUCT-{chr(ord('A') + i)}" if i < 26 else f"PRODUCT-{i + 1:03d}")
+    return names
+
+
+def read_dataset_meta(path) -> Dict:
+    with open(Path(path) / "meta.json", "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+# ==================== Generation ====================
+
+def generate_dataset(
+    out_dir,
+    products: int = 3,
+    days: int = 365,
+    wafers_per_day: int = 200,
+    map_days: int = 7,
+    end_date: Optional[date] = None,
+    diameter_mm: float = 300.0,
+    die_size_mm: float = 10.0,
+    seed: int = 0,
+    log=print
+) -> Dict:
+    """
+    Write a synthetic dataset to out_dir and return its metadata
+
+    Header rows and bin counts are generated for every wafer. Die-level maps
+    are materialized only for the last map_days days (the rest can be
+    synthesized on demand from the same seeds).
+    """
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+
+    end_date = end_date or date.today()
+    start_date = end_date - timedelta(days=days - 1)
+    names = product_names(products)
+    synth = WaferSynthesizer(diameter_mm=diameter_mm, die_width_mm=die_size_mm,
+                             namespace=f"sonar-dataset-{seed}")
+    n_dies = synth.die_count
+
+    lots_per_day = math.ceil(wafers_per_day / WAFERS_PER_LOT)
+    rows_per_product = days * wafers_per_day
+    lots_per_product = days * lots_per_day
+    map_days = max(0, min(map_days, days))
+    maps_per_product = map_days * wafers_per_day
+
+    n_rows = products * rows_per_product
+    n_lots = products * lots_per_product
+    n_maps = products * maps_per_product
+
+    cols = {
+        name: np.lib.format.open_memmap(out / f"{name}.npy", mode="w+", dtype=dtype, shape=(n_rows,))
+        for name, dtype in HEADER_COLUMNS.items()
+    }
+    bin_counts = np.lib.format.open_memmap(
+        out / "bin_counts.npy", mode="w+", dtype=np.int32, shape=(n_rows, len(BIN_CODES)))
+    lots = np.lib.format.open_memmap(out / "lots.npy", mode="w+", dtype="U24", shape=(n_lots,))
+    lot_offsets = np.lib.format.open_memmap(
+        out / "lot_offsets.npy", mode="w+", dtype=np.int64, shape=(n_lots + 1,))
+    die_bins = np.lib.format.open_memmap(
+        out / "die_bins.npy", mode="w+", dtype=np.uint8, shape=(n_maps, n_dies))
+    die_x, die_y = synth.die_coords()
+    np.save(out / "die_x.npy", die_x)
+    np.save(out / "die_y.npy", die_y)
+
+    day_starts = np.datetime64(start_date, "s") + np.arange(days) * np.timedelta64(1, "D")
+    # Spread each day's wafers evenly over the day, in row order
+    seconds_in_day = (np.arange(wafers_per_day) * (86400 // max(wafers_per_day, 1))).astype("timedelta64[s]")
+    day_labels = [(start_date + timedelta(days=d)).strftime("%Y%m%d") for d in range(days)]
+    local = np.arange(rows_per_product)
+    day_of_row = local // wafers_per_day
+    slot = local % wafers_per_day
+    lot_of_row = day_of_row * lots_per_day + slot // WAFERS_PER_LOT
+
+    for p, product_id in enumerate(names):
+        t0 = time.perf_counter()
+        rng = np.random.default_rng(stable_seed("dataset", seed, product_id))
+        rs = slice(p * rows_per_product, (p + 1) * rows_per_product)
+        ls = slice(p * lots_per_product, (p + 1) * lots_per_product)
+
+        # Yield model: product base + slow drift + lot effect + wafer noise
+        base = 88.0 + (stable_seed(product_id) % 80) / 10.0
+        drift = 2.0 * np.sin(2 * np.pi * np.arange(days) / 180.0 + rng.uniform(0, 2 * np.pi))
+        drift += np.clip(np.cumsum(rng.normal(0, 0.15, days)), -3, 3)
+        lot_effect = rng.normal(0, 0.8, lots_per_product)
+        excursions = rng.random(lots_per_product) < 0.03
+        lot_effect[excursions] -= rng.uniform(5, 20, int(excursions.sum()))
+        yields = base + drift[day_of_row] + lot_effect[lot_of_row] + rng.normal(0, 1.0, rows_per_product)
+        yields = np.clip(yields, 0.0, 100.0)
+
+        pass_chip = np.round(n_dies * yields / 100.0).astype(np.int32)
+        fail_mix = rng.dirichlet([4.5, 3.5, 2.0])
+        counts = np.empty((rows_per_product, len(BIN_CODES)), dtype=np.int32)
+        counts[:, 0] = pass_chip
+        counts[:, 1:] = rng.multinomial(n_dies - pass_chip, fail_mix)
+
+        map_row = np.full(rows_per_product, -1, dtype=np.int32)
+        first_map = rows_per_product - maps_per_product
+        lot_ids = np.array([
+            f"LOT-{day_labels[d]}-{p + 1:02d}{s:03d}" for d in range(days) for s in range(lots_per_day)
+        ], dtype="U24")
+
+        # Materialize die maps for the most recent days; bin counts follow the map
+        for i in range(first_map, rows_per_product):
+            m = p * maps_per_product + (i - first_map)
+            wafer_bins = synth.wafer_bins(lot_ids[lot_of_row[i]], int(slot[i] % WAFERS_PER_LOT) + 1)
+            die_bins[m] = wafer_bins
+            map_row[i] = m
+            counts[i] = [int(np.count_nonzero(wafer_bins == code)) for code in BIN_CODES]
+        pass_chip = counts[:, 0]
+
+        cols["product_idx"][rs] = p
+        cols["lot_idx"][rs] = p * lots_per_product + lot_of_row
+        cols["wafer_id"][rs] = slot % WAFERS_PER_LOT + 1
+        cols["regist_date"][rs] = day_starts[day_of_row] + seconds_in_day[slot]
+        cols["pass_chip"][rs] = pass_chip
+        cols["effective_num"][rs] = n_dies
+        cols["pass_chip_rate"][rs] = np.round(pass_chip * 100.0 / n_dies, 2)
+        cols["map_row"][rs] = map_row
+        bin_counts[rs] = counts
+        lots[ls] = lot_ids
+
+        wafers_in_lot = np.bincount(lot_of_row, minlength=lots_per_product)
+        lot_offsets[ls] = p * rows_per_product + np.concatenate(([0], np.cumsum(wafers_in_lot)[:-1]))
+        log(f"  {product_id}: {rows_per_product:,} wafers, {maps_per_product:,} maps "
+            f"({time.perf_counter() - t0:.1f}s)")
+
+    lot_offsets[n_lots] = n_rows
+    for arr in (*cols.values(), bin_counts, lots, lot_offsets, die_bins):
+        arr.flush()
+
+    meta = {
+        "version": DATASET_VERSION,
+        "products": names,
+        "product_offsets": [p * rows_per_product for p in range(products + 1)],
+        "product_lot_offsets": [p * lots_per_product for p in range(products + 1)],
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "wafers_per_day": wafers_per_day,
+        "wafers_per_lot": WAFERS_PER_LOT,
+        "bin_codes": BIN_CODES,
+        "bin_names": BIN_NAMES,
+        "diameter_mm": diameter_mm,
+        "die_size_mm": die_size_mm,
+        "die_count": n_dies,
+        "map_days": map_days,
+        "seed": seed,
+        "rows": n_rows,
+        "lots": n_lots,
+        "maps": n_maps,
+    }
+    with open(out / "meta.json", "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+# ==================== Reading ====================
+
+class SyntheticDataset:
+    """Read-only, memory-mapped view of a generated dataset"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.meta = read_dataset_meta(self.path)
+        self.products = self.meta["products"]
+        self._product_index = {p: i for i, p in enumerate(self.products)}
+
+        for name in HEADER_COLUMNS:
+            setattr(self, name, np.load(self.path / f"{name}.npy", mmap_mode="r"))
+        self.bin_counts = np.load(self.path / "bin_counts.npy", mmap_mode="r")
+        self.lots = np.load(self.path / "lots.npy", mmap_mode="r")
+        self.lot_offsets = np.load(self.path / "lot_offsets.npy", mmap_mode="r")
+        self.die_bins = np.load(self.path / "die_bins.npy", mmap_mode="r")
+        self.die_x = np.load(self.path / "die_x.npy")
+        self.die_y = np.load(self.path / "die_y.npy")
+
+        self.bin_keys = [f"{c}_{n}" for c, n in zip(self.meta["bin_codes"], self.meta["bin_names"])]
+        self._lot_index = None
+
+    def synthesizer(self) -> WaferSynthesizer:
+        """Synthesizer that reproduces this dataset's die maps"""
+        return WaferSynthesizer(
+            diameter_mm=self.meta["diameter_mm"],
+            die_width_mm=self.meta["die_size_mm"],
+            namespace=f"sonar-dataset-{self.meta['seed']}"
+        )
+
+    def product_slice(self, product_id: str) -> slice:
+        p = self._product_index.get(product_id)
+        if p is None:
+            return slice(0, 0)
+        offsets = self.meta["product_offsets"]
+        return slice(offsets[p], offsets[p + 1])
+
+    def rows_between(self, product_id: str, start_date: date, end_date: date) -> slice:
+        """Row range for a product within [start_date, end_date] (inclusive days)"""
+        block = self.product_slice(product_id)
+        dates = self.regist_date[block]
+        lo = np.datetime64(start_date, "s")
+        hi = np.datetime64(end_date + timedelta(days=1), "s")
+        start = int(np.searchsorted(dates, lo, side="left"))
+        stop = int(np.searchsorted(dates, hi, side="left"))
+        return slice(block.start + start, block.start + stop)
+
+    def records(self, rows: slice, product_id: str) -> List[dict]:
+        """SEMI_CP_HEADER-shaped dicts (with bins) for a row range"""
+        lot_idx = self.lot_idx[rows]
+        lot_ids = self.lots[lot_idx].tolist()
+        wafer_ids = self.wafer_id[rows].tolist()
+        dates = self.regist_date[rows].astype(datetime).tolist()
+        pass_chip = self.pass_chip[rows].tolist()
+        rates = self.pass_chip_rate[rows].astype(np.float64).round(2).tolist()
+        effective = self.effective_num[rows].tolist()
+        counts = self.bin_counts[rows].tolist()
+        keys = self.bin_keys
+
+        data = []
+        for i in range(len(lot_ids)):
+            data.append({
+                "SUBSTRATE_ID": f"{lot_ids[i]}-{wafer_ids[i]:02d}",
+                "LOT_ID": lot_ids[i],
+                "WAFER_ID": wafer_ids[i],
+                "PRODUCT_ID": product_id,
+                "PROCESS": "CP",
+                "PASS_CHIP": pass_chip[i],
+                "PASS_CHIP_RATE": rates[i],
+                "REGIST_DATE": dates[i],
+                "REWORK_NEW": 0,
+                "EFFECTIVE_NUM": effective[i],
+                "bins": dict(zip(keys, counts[i])),
+            })
+        return data
+
+    def product_lots(self, product_id: str) -> np.ndarray:
+        """Lot ids of a product, oldest first"""
+        p = self._product_index.get(product_id)
+        if p is None:
+            return self.lots[0:0]
+        offsets = self.meta["product_lot_offsets"]
+        return self.lots[offsets[p]:offsets[p + 1]]
+
+    def product_lot_bounds(self, product_id: str) -> np.ndarray:
+        """Row boundaries of a product's lots (len(product_lots) + 1 offsets)"""
+        p = self._product_index.get(product_id)
+        if p is None:
+            return np.zeros(1, dtype=np.int64)
+        offsets = self.meta["product_lot_offsets"]
+        return np.asarray(self.lot_offsets[offsets[p]:offsets[p + 1] + 1], dtype=np.int64)
+
+    def lot_rows(self, lot_id: str) -> slice:
+        if self._lot_index is None:
+            self._lot_index = {lot: i for i, lot in enumerate(self.lots.tolist())}
+        i = self._lot_index.get(lot_id)
+        if i is None:
+            return slice(0, 0)
+        return slice(int(self.lot_offsets[i]), int(self.lot_offsets[i + 1]))
+
+    def lot_product(self, rows: slice) -> Optional[str]:
+        if rows.stop <= rows.start:
+            return None
+        return self.products[int(self.product_idx[rows.start])]
+
+
+# ==================== CLI ====================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic CP dataset")
+    parser.add_argument("--out", default="data/synthetic", help="Output directory")
+    parser.add_argument("--products", type=int, default=3)
+    parser.add_argument("--days", type=int, default=365, help="Days of history")
+    parser.add_argument("--wafers-per-day", type=int, default=200, help="Wafers per product per day")
+    parser.add_argument("--map-days", type=int, default=7, help="Recent days with die-level maps")
+    parser.add_argument("--end-date", type=date.fromisoformat, default=None, help="Last day (YYYY-MM-DD)")
+    parser.add_argument("--diameter-mm", type=float, default=300.0)
+    parser.add_argument("--die-size-mm", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    print(f"Generating synthetic dataset in {args.out}")
+    meta = generate_dataset(
+        args.out,
+        products=args.products,
+        days=args.days,
+        wafers_per_day=args.wafers_per_day,
+        map_days=args.map_days,
+        end_date=args.end_date,
+        diameter_mm=args.diameter_mm,
+        die_size_mm=args.die_size_mm,
+        seed=args.seed,
+    )
+    print(f"Done: {meta['rows']:,} wafers, {meta['lots']:,} lots, {meta['maps']:,} die maps "
+          f"x {meta['die_count']:,} dies in {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
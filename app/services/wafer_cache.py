@@ -0,0 +1,86 @@
+"""
+Wafer Map Cache
+Per-wafer cache keyed by (lot_id, wafer_id) with neighbour prefetch
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Optional
+
+from app.core.config import settings
+from app.services.cache import TTLCache
+from app.services.wafer_codec import as_arrays
+
+
+class WaferCache:
+    """
+    Constant-time wafer lookups for the detail modal
+
+    A hit returns the cached wafer; a miss fetches only that wafer through
+    the DB service's get_wafer. After each lookup the neighbouring wafers
+    are fetched in the background so stepping through a lot stays warm.
+    """
+
+    def __init__(self, maxsize: int = 512, ttl: float = 900.0, prefetch_radius: int = 1, workers: int = 2):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl, name="wafer_maps", shared=True)
+        self.prefetch_radius = prefetch_radius
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="wafer-prefetch")
+        self._inflight = set()
+        self._lock = threading.Lock()
+
+    def get(self, db_service, lot_id: str, wafer_id: int) -> Optional[dict]:
+        key = (lot_id, wafer_id)
+        wafer = self._cache.get(key)
+        if wafer is None:
+            wafer = self._load(db_service, lot_id, wafer_id)
+        if wafer is not None and self.prefetch_radius:
+            self.prefetch(db_service, lot_id, (
+                wafer_id + offset
+                for offset in range(-self.prefetch_radius, self.prefetch_radius + 1)
+                if offset
+            ))
+        return wafer
+
+    def put_lot(self, lot_id: str, maps: Iterable[dict]):
+        """Seed the cache with wafers already fetched as a lot"""
+        for m in maps:
+            self._cache.set((lot_id, int(m["wafer_id"])), as_arrays(m))
+
+    def prefetch(self, db_service, lot_id: str, wafer_ids: Iterable[int]):
+        for wafer_id in wafer_ids:
+            key = (lot_id, wafer_id)
+            if wafer_id < 1 or key in self._cache:
+                continue
+            with self._lock:
+                if key in self._inflight:
+                    continue
+                self._inflight.add(key)
+            self._pool.submit(self._prefetch_one, db_service, lot_id, wafer_id)
+
+    def _prefetch_one(self, db_service, lot_id: str, wafer_id: int):
+        try:
+            self._load(db_service, lot_id, wafer_id)
+        except Exception as e:
+            print(f"Wafer prefetch failed for {lot_id}#{wafer_id}: {e}")
+        finally:
+            with self._lock:
+                self._inflight.discard((lot_id, wafer_id))
+
+    def _load(self, db_service, lot_id: str, wafer_id: int) -> Optional[dict]:
+        wafer = db_service.get_wafer(lot_id, wafer_id)
+        if wafer is None:
+            return None
+        wafer = as_arrays(wafer)
+        self._cache.set((lot_id, wafer_id), wafer)
+        return wafer
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+wafer_cache = WaferCache(
+    maxsize=settings.WAFER_CACHE_SIZE,
+    prefetch_radius=settings.WAFER_PREFETCH_RADIUS
+)
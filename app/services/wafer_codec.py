@@ -0,0 +1,160 @@
+"""
+Wafer Map Wire Format
+Compact binary encoding of wafer maps, built straight from NumPy buffers.
+
+All integers are little-endian. A lot is a container of wafer records:
+
+    lot:    b"SWL1" | uint32 count | record * count
+
+    record: b"SWM1"
+            uint8  layout        0 = coordinates, 1 = grid
+            uint8  bin_bytes     1 (uint8 bins) or 2 (uint16 bins)
+            uint16 lot_id_len
+            uint16 product_id_len
+            uint32 wafer_id
+            uint32 die_count
+            int16  x0, y0        grid origin (minimum die coordinate)
+            uint16 width, height grid size
+            lot_id, product_id   UTF-8, padded to an even length
+            payload, padded to an even length:
+              grid:        bins[height][width], EMPTY_BIN where no die
+              coordinates: x int16[n] | y int16[n] | bins[n]
+
+Every array starts on an even offset, so a JS decoder can view the buffer
+with typed arrays without copying. Full wafers are dense, so the grid
+layout is normally the smaller one; sparse maps fall back to coordinates.
+Compression is left to the HTTP layer (Content-Encoding: deflate).
+"""
+import struct
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+MEDIA_TYPE = "application/vnd.sonar.wafermap"
+
+LOT_MAGIC = b"SWL1"
+WAFER_MAGIC = b"SWM1"
+LAYOUT_COORDS = 0
+LAYOUT_GRID = 1
+
+_LOT_HEADER = struct.Struct("<4sI")
+_WAFER_HEADER = struct.Struct("<4sBBHHIIhhHH")
+
+# Grid cell value for positions without a die
+EMPTY_BIN = {1: 0xFF, 2: 0xFFFF}
+
+
+def as_arrays(wafer: dict) -> dict:
+    """Wafer dict with die lists as NumPy arrays (a fraction of the memory of int lists)"""
+    return {
+        **wafer,
+        "x": np.asarray(wafer.get("x", []), dtype=np.int16),
+        "y": np.asarray(wafer.get("y", []), dtype=np.int16),
+        "bin": np.asarray(wafer.get("bin", []), dtype=np.uint16),
+    }
+
+
+def _padded(data: bytes) -> bytes:
+    return data + b"\0" if len(data) % 2 else data
+
+
+def encode_wafer(wafer: dict, layout: Optional[int] = None) -> List:
+    """
+    Encode one wafer as a list of buffers (header bytes and array views)
+
+    Args:
+        wafer: Dict with lot_id, wafer_id, product_id and x, y, bin arrays
+        layout: Force LAYOUT_GRID or LAYOUT_COORDS (smallest if None)
+    """
+    x = np.asarray(wafer["x"], dtype="<i2")
+    y = np.asarray(wafer["y"], dtype="<i2")
+    bins = np.asarray(wafer["bin"])
+    n = len(bins)
+
+    bin_bytes = 1 if n == 0 or int(bins.max()) < EMPTY_BIN[1] else 2
+    bin_dtype = "<u1" if bin_bytes == 1 else "<u2"
+
+    x0, y0 = (int(x.min()), int(y.min())) if n else (0, 0)
+    width, height = (int(x.max()) - x0 + 1, int(y.max()) - y0 + 1) if n else (0, 0)
+    if layout is None:
+        layout = LAYOUT_GRID if width * height * bin_bytes <= n * (4 + bin_bytes) else LAYOUT_COORDS
+
+    if layout == LAYOUT_GRID:
+        grid = np.full((height, width), EMPTY_BIN[bin_bytes], dtype=bin_dtype)
+        grid[y - y0, x - x0] = bins
+        payload = [grid]
+        payload_bytes = grid.nbytes
+    else:
+        payload = [x, y, bins.astype(bin_dtype, copy=False)]
+        payload_bytes = n * (4 + bin_bytes)
+
+    lot_id = _padded(str(wafer["lot_id"]).encode())
+    product_id = _padded(str(wafer.get("product_id", "")).encode())
+    header = _WAFER_HEADER.pack(
+        WAFER_MAGIC, layout, bin_bytes, len(lot_id), len(product_id),
+        int(wafer["wafer_id"]), n, x0, y0, width, height
+    )
+    parts = [header, lot_id, product_id]
+    # Empty arrays add no bytes (and a zero-sized view cannot be cast)
+    parts.extend(memoryview(np.ascontiguousarray(a)).cast("B") for a in payload if a.size)
+    if payload_bytes % 2:
+        parts.append(b"\0")
+    return parts
+
+
+def encode_lot(wafers: Iterable[dict]) -> bytes:
+    parts = []
+    count = 0
+    for wafer in wafers:
+        parts.extend(encode_wafer(wafer))
+        count += 1
+    return b"".join([_LOT_HEADER.pack(LOT_MAGIC, count), *parts])
+
+
+def decode_wafer(buffer, offset: int = 0) -> Tuple[dict, int]:
+    """Decode one record; arrays are read-only views into buffer. Returns (wafer, next_offset)"""
+    (magic, layout, bin_bytes, lot_len, product_len,
+     wafer_id, n, x0, y0, width, height) = _WAFER_HEADER.unpack_from(buffer, offset)
+    if magic != WAFER_MAGIC:
+        raise ValueError(f"Not a wafer record at offset {offset}")
+    offset += _WAFER_HEADER.size
+    lot_id = bytes(buffer[offset:offset + lot_len]).rstrip(b"\0").decode()
+    offset += lot_len
+    product_id = bytes(buffer[offset:offset + product_len]).rstrip(b"\0").decode()
+    offset += product_len
+
+    bin_dtype = "<u1" if bin_bytes == 1 else "<u2"
+    if layout == LAYOUT_GRID:
+        grid = np.frombuffer(buffer, dtype=bin_dtype, count=width * height, offset=offset).reshape(height, width)
+        rows, cols = np.nonzero(grid != EMPTY_BIN[bin_bytes])
+        x = (cols + x0).astype(np.int16)
+        y = (rows + y0).astype(np.int16)
+        bins = grid[rows, cols]
+        size = grid.nbytes
+    else:
+        x = np.frombuffer(buffer, dtype="<i2", count=n, offset=offset)
+        y = np.frombuffer(buffer, dtype="<i2", count=n, offset=offset + 2 * n)
+        bins = np.frombuffer(buffer, dtype=bin_dtype, count=n, offset=offset + 4 * n)
+        size = n * (4 + bin_bytes)
+    offset += size + size % 2
+
+    return {
+        "lot_id": lot_id,
+        "wafer_id": wafer_id,
+        "product_id": product_id,
+        "x": x,
+        "y": y,
+        "bin": bins,
+    }, offset
+
+
+def decode_lot(buffer) -> List[dict]:
+    magic, count = _LOT_HEADER.unpack_from(buffer, 0)
+    if magic != LOT_MAGIC:
+        raise ValueError("Not a wafer lot container")
+    offset = _LOT_HEADER.size
+    wafers = []
+    for _ in range(count):
+        wafer, offset = decode_wafer(buffer, offset)
+        wafers.append(wafer)
+    return wafers
@@ -0,0 +1,51 @@
+"""
+Wafer Grid Helpers
+Converts sparse die lists (x, y, bin) into dense 2D bin grids
+"""
+import numpy as np
+from typing import Any, Dict, Sequence, Tuple
+
+
+def build_bin_grid(
+    x_coords: Sequence[int],
+    y_coords: Sequence[int],
+    bins: Sequence[int]
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Scatter die bins into a dense grid covering the die bounding box
+
+    Args:
+        x_coords: Die column coordinates
+        y_coords: Die row coordinates
+        bins: Bin code per die
+
+    Returns:
+        (x_axis, y_axis, grid) where grid[row, col] holds the bin code of the
+        die at (x_axis[col], y_axis[row]) and NaN where there is no die
+    """
+    x = np.asarray(x_coords, dtype=np.int32)
+    y = np.asarray(y_coords, dtype=np.int32)
+    b = np.asarray(bins, dtype=np.float32)
+
+    if x.size == 0:
+        empty = np.zeros(0, dtype=np.int32)
+        return empty, empty, np.zeros((0, 0), dtype=np.float32)
+
+    min_x, max_x = int(x.min()), int(x.max())
+    min_y, max_y = int(y.min()), int(y.max())
+
+    grid = np.full((max_y - min_y + 1, max_x - min_x + 1), np.nan, dtype=np.float32)
+    grid[y - min_y, x - min_x] = b
+
+    x_axis = np.arange(min_x, max_x + 1, dtype=np.int32)
+    y_axis = np.arange(min_y, max_y + 1, dtype=np.int32)
+    return x_axis, y_axis, grid
+
+
+def wafer_bin_grid(wafer_data: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Build the bin grid for a wafer dict with x, y, bin arrays"""
+    return build_bin_grid(
+        wafer_data.get("x", []),
+        wafer_data.get("y", []),
+        wafer_data.get("bin", [])
+    )
@@ -0,0 +1,169 @@
+"""
+Synthetic Wafer Generator
+Deterministic, vectorized die-level bin maps for the mock backend
+"""
+import hashlib
+import numpy as np
+from typing import Dict, Iterable, Optional, Tuple
+
+# Bin codes used by the mock data (see chart_generator bin colours)
+BIN_PASS = 1
+BIN_OPEN = 3
+BIN_SHORT = 7
+BIN_OTHER = 99
+
+# Per-wafer probability that each spatial defect signature is present
+DEFAULT_SIGNATURE_RATES = {
+    "edge_ring": 0.8,
+    "center": 0.15,
+    "scratch": 0.1,
+    "cluster": 0.25,
+}
+
+
+def stable_seed(*parts) -> int:
+    """
+    Derive a 64-bit seed from the given parts
+
+    Unlike hash(), the digest is identical in every process, so all workers
+    generate the same wafer for the same key.
+    """
+    key = "|".join(str(p) for p in parts).encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+
+class WaferSynthesizer:
+    """
+    Generates wafer bin maps as NumPy arrays
+
+    Every wafer draws from its own Generator seeded by (lot_id, wafer_id),
+    so a single wafer is identical whether it is generated alone or as
+    part of its lot.
+    """
+
+    def __init__(
+        self,
+        diameter_mm: float = 300.0,
+        die_width_mm: float = 10.0,
+        die_height_mm: Optional[float] = None,
+        edge_exclusion_mm: float = 0.0,
+        base_fail_rate: float = 0.05,
+        signature_rates: Optional[Dict[str, float]] = None,
+        namespace: str = "sonar-mock"
+    ):
+        self.diameter_mm = diameter_mm
+        self.die_width_mm = die_width_mm
+        self.die_height_mm = die_height_mm or die_width_mm
+        self.edge_exclusion_mm = edge_exclusion_mm
+        self.base_fail_rate = base_fail_rate
+        self.signature_rates = dict(DEFAULT_SIGNATURE_RATES if signature_rates is None else signature_rates)
+        self.namespace = namespace
+
+        self._x, self._y = self._build_die_grid()
+        # Die centre positions in mm and normalised radius (0 = centre, 1 = usable edge)
+        self._px = self._x * self.die_width_mm
+        self._py = self._y * self.die_height_mm
+        self._usable_radius = self.diameter_mm / 2 - self.edge_exclusion_mm
+        self._r = np.hypot(self._px, self._py) / self._usable_radius
+
+    def _build_die_grid(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Die coordinates whose centres fall inside the usable wafer area"""
+        radius = self.diameter_mm / 2 - self.edge_exclusion_mm
+        nx = int(radius // self.die_width_mm)
+        ny = int(radius // self.die_height_mm)
+        # Row-major by x then y, matching the original mock ordering
+        xs, ys = np.meshgrid(
+            np.arange(-nx, nx + 1, dtype=np.int16),
+            np.arange(-ny, ny + 1, dtype=np.int16),
+            indexing="ij"
+        )
+        xs, ys = xs.ravel(), ys.ravel()
+        inside = (xs * self.die_width_mm) ** 2 + (ys * self.die_height_mm) ** 2 <= radius * radius
+        x, y = xs[inside], ys[inside]
+        x.flags.writeable = False
+        y.flags.writeable = False
+        return x, y
+
+    @property
+    def die_count(self) -> int:
+        return int(self._x.size)
+
+    def die_coords(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Shared (read-only) die x/y coordinate arrays"""
+        return self._x, self._y
+
+    def rng(self, lot_id: str, wafer_id: int) -> np.random.Generator:
+        return np.random.default_rng(stable_seed(self.namespace, lot_id, int(wafer_id)))
+
+    def wafer_bins(self, lot_id: str, wafer_id: int) -> np.ndarray:
+        """Bin code per die (aligned with die_coords) for one wafer"""
+        rng = self.rng(lot_id, wafer_id)
+        n = self.die_count
+        bins = np.full(n, BIN_PASS, dtype=np.uint8)
+
+        # Random background defects, with wafer-to-wafer variation
+        fail_rate = self.base_fail_rate * rng.lognormal(0.0, 0.35)
+        fails = rng.random(n) < fail_rate
+        bins[fails] = np.where(rng.random(int(fails.sum())) < 0.6, BIN_SHORT, BIN_OTHER)
+
+        rates = self.signature_rates
+        if rng.random() < rates.get("cluster", 0.0):
+            self._apply_clusters(rng, bins)
+        if rng.random() < rates.get("scratch", 0.0):
+            self._apply_scratch(rng, bins)
+        if rng.random() < rates.get("center", 0.0):
+            self._apply_center(rng, bins)
+        if rng.random() < rates.get("edge_ring", 0.0):
+            self._apply_edge_ring(rng, bins)
+
+        return bins
+
+    def lot_bins(self, lot_id: str, wafer_ids: Iterable[int] = range(1, 26)) -> np.ndarray:
+        """Bin codes for a whole lot as a (wafers, dies) array"""
+        wafer_ids = list(wafer_ids)
+        out = np.empty((len(wafer_ids), self.die_count), dtype=np.uint8)
+        for i, wafer_id in enumerate(wafer_ids):
+            out[i] = self.wafer_bins(lot_id, wafer_id)
+        return out
+
+    # --- Spatial defect signatures ---
+
+    def _apply_edge_ring(self, rng: np.random.Generator, bins: np.ndarray):
+        """Opens on the outermost ~2 die rows"""
+        width = 2 * max(self.die_width_mm, self.die_height_mm) / self._usable_radius
+        ring = self._r > 1.0 - width
+        hit = ring & (rng.random(bins.size) < rng.uniform(0.25, 0.55))
+        bins[hit] = BIN_OPEN
+
+    def _apply_center(self, rng: np.random.Generator, bins: np.ndarray):
+        """Bullseye of failures around the wafer centre"""
+        radius = rng.uniform(0.12, 0.3)
+        prob = np.where(self._r < radius, rng.uniform(0.4, 0.8), 0.0)
+        bins[rng.random(bins.size) < prob] = BIN_OTHER
+
+    def _apply_scratch(self, rng: np.random.Generator, bins: np.ndarray):
+        """Thin straight line of shorts across part of the wafer"""
+        angle = rng.uniform(0, np.pi)
+        dx, dy = np.cos(angle), np.sin(angle)
+        # Line through a random point inside the inner half of the wafer
+        cx, cy = rng.uniform(-0.5, 0.5, size=2) * self._usable_radius
+        rel_x, rel_y = self._px - cx, self._py - cy
+        along = rel_x * dx + rel_y * dy
+        across = np.abs(rel_x * dy - rel_y * dx)
+        half_length = rng.uniform(0.3, 0.9) * self._usable_radius
+        half_width = 0.6 * max(self.die_width_mm, self.die_height_mm)
+        hit = (across < half_width) & (np.abs(along) < half_length)
+        bins[hit & (rng.random(bins.size) < 0.85)] = BIN_SHORT
+
+    def _apply_clusters(self, rng: np.random.Generator, bins: np.ndarray):
+        """A few Gaussian blobs of mixed failures"""
+        prob = np.zeros(bins.size)
+        for _ in range(int(rng.integers(1, 4))):
+            r = np.sqrt(rng.uniform(0, 0.8))
+            theta = rng.uniform(0, 2 * np.pi)
+            cx, cy = r * np.cos(theta) * self._usable_radius, r * np.sin(theta) * self._usable_radius
+            sigma = rng.uniform(0.04, 0.12) * self._usable_radius
+            d2 = (self._px - cx) ** 2 + (self._py - cy) ** 2
+            prob = np.maximum(prob, rng.uniform(0.5, 0.9) * np.exp(-d2 / (2 * sigma * sigma)))
+        hit = rng.random(bins.size) < prob
+        bins[hit] = np.where(rng.random(int(hit.sum())) < 0.5, BIN_OPEN, BIN_SHORT)
@@ -0,0 +1,86 @@
+"""
+Startup Warm-Up
+Loads what the app no longer imports up front (Plotly, the SQL backend and
+its driver) and compiles the templates, on a background thread started
+once the server is up, so the first real requests don't pay for it.
+"""
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+# Filled in as steps finish; reported by the health endpoint
+warmup_status: Dict[str, object] = {"state": "pending", "steps": {}}
+
+
+def _warm_db_backend():
+    from app.api.deps import get_db_service
+    from app.core.config import settings
+    service = get_db_service()
+    service = getattr(service, "inner", service)
+    # SQL backends: build the engine (imports SQLAlchemy and the driver) and open the base pool
+    if settings.DB_POOL_PREWARM and hasattr(service, "warm_pool"):
+        warmup_status["pool_connections"] = service.warm_pool()
+    else:
+        getattr(service, "engine", None)
+
+
+def _warm_plotly():
+    from app.services.chart_generator import (
+        generate_fail_ratio_chart, generate_wafer_map_detail, generate_yield_trend_chart
+    )
+    from datetime import date, timedelta
+
+    today = date.today()
+    trend = {
+        "daily_trends": [
+            {"date": today - timedelta(days=i), "lot_id": f"LOT-{i}", "mean_yield": 95.0,
+             "bin_stats": {"1_Pass": 95.0, "3_Open": 5.0}}
+            for i in range(3)
+        ],
+        "statistics": {"target": 95.0, "ucl": 99.0, "lcl": 90.0, "average": 95.0},
+    }
+    # One figure per trace type the app draws (Scatter, Bar, Pie, Heatmap)
+    generate_yield_trend_chart(trend, "daily", include_plotlyjs=False)
+    generate_fail_ratio_chart(trend)
+    generate_wafer_map_detail({
+        "wafer_id": 0, "lot_id": "WARMUP",
+        "x": np.array([0, 1, 0, 1]), "y": np.array([0, 0, 1, 1]), "bin": np.array([1, 1, 3, 1])
+    })
+
+
+def _warm_templates():
+    from app.views.pages import templates
+    for name in templates.env.list_templates(extensions=["html"]):
+        templates.env.get_template(name)
+
+
+WARMUP_STEPS: List[Tuple[str, Callable[[], None]]] = [
+    ("db_backend", _warm_db_backend),
+    ("plotly", _warm_plotly),
+    ("templates", _warm_templates),
+]
+
+
+def warm_up() -> Dict[str, object]:
+    """Run every step, timing each; failures are logged and skipped"""
+    warmup_status["state"] = "running"
+    started = time.perf_counter()
+    for name, step in WARMUP_STEPS:
+        step_started = time.perf_counter()
+        try:
+            step()
+            warmup_status["steps"][name] = round((time.perf_counter() - step_started) * 1000.0, 1)
+        except Exception as e:
+            print(f"Warm-up step {name} failed: {e}")
+            warmup_status["steps"][name] = f"failed: {e}"
+    warmup_status["state"] = "done"
+    warmup_status["total_ms"] = round((time.perf_counter() - started) * 1000.0, 1)
+    return warmup_status
+
+
+def start_warmup() -> threading.Thread:
+    thread = threading.Thread(target=warm_up, name="warmup", daemon=True)
+    thread.start()
+    return thread
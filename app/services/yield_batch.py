@@ -0,0 +1,119 @@
+"""
+Batch Yield Trends
+Serve many (product, start, end) specs with as few queries as possible.
+
+Specs for the same product whose ranges overlap or touch are merged into
+one covering range; each covering range is fetched once on a bounded
+worker pool and every spec is then cut from the rows it covers.
+
+Batch windows are whole calendar days (start and end inclusive), so a
+nightly report returns the same rows whatever time it runs.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Callable, Iterable, Iterator, List, Tuple
+
+from app.core.config import settings
+from app.models.yield_data import YieldTrendBatchResult, YieldTrendResponse, YieldTrendSpec
+from app.services.analytics import analytics_service
+
+# Shared by all batch requests so total load on the DB pool stays bounded
+batch_pool = ThreadPoolExecutor(
+    max_workers=settings.YIELD_BATCH_CONCURRENCY,
+    thread_name_prefix="yield-batch"
+)
+
+
+class CoveringRange:
+    """One query serving every spec (by index) that falls inside it"""
+
+    def __init__(self, product_id: str, start_date: date, end_date: date):
+        self.product_id = product_id
+        self.start_date = start_date
+        self.end_date = end_date
+        self.members: List[Tuple[int, date, date]] = []
+
+
+def resolve_spec(spec: YieldTrendSpec, today: date = None) -> Tuple[date, date]:
+    """Fill defaults the same way as the single-product endpoint"""
+    end_date = spec.end_date or today or date.today()
+    start_date = spec.start_date or end_date - timedelta(days=30)
+    return start_date, end_date
+
+
+def plan_ranges(specs: List[YieldTrendSpec]) -> List[CoveringRange]:
+    """Merge overlapping or adjacent ranges per product"""
+    today = date.today()
+    by_product = {}
+    for index, spec in enumerate(specs):
+        start_date, end_date = resolve_spec(spec, today)
+        by_product.setdefault(spec.product_id, []).append((start_date, end_date, index))
+
+    ranges = []
+    for product_id, windows in by_product.items():
+        current = None
+        for start_date, end_date, index in sorted(windows):
+            if current is None or start_date > current.end_date + timedelta(days=1):
+                current = CoveringRange(product_id, start_date, end_date)
+                ranges.append(current)
+            current.end_date = max(current.end_date, end_date)
+            current.members.append((index, start_date, end_date))
+    return ranges
+
+
+def _row_day(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return value
+
+
+def run_range(db_service, get_target: Callable, covering: CoveringRange) -> List[YieldTrendBatchResult]:
+    """Fetch a covering range once and compute every member spec from it"""
+    try:
+        # get_cp_yield_trend windows are relative to the current time of day;
+        # pad a day each side so the calendar-day cut below sees whole days
+        rows = db_service.get_cp_yield_trend(
+            covering.product_id,
+            covering.start_date - timedelta(days=1),
+            covering.end_date + timedelta(days=1)
+        )
+        days = [_row_day(r.get("REGIST_DATE") or r.get("regist_date")) for r in rows]
+    except Exception as e:
+        return [YieldTrendBatchResult(index=i, error=str(e)) for i, _, _ in covering.members]
+
+    results = []
+    for index, start_date, end_date in covering.members:
+        try:
+            data = [r for r, d in zip(rows, days) if d is not None and start_date <= d <= end_date]
+            stats = analytics_service.calculate_yield_stats(data)
+            stats["target"] = get_target(covering.product_id, start_date.strftime("%Y-%m"))
+            results.append(YieldTrendBatchResult(index=index, trend=YieldTrendResponse(
+                product_id=covering.product_id,
+                start_date=start_date,
+                end_date=end_date,
+                daily_trends=stats.get("daily_trends", []),
+                statistics=stats
+            )))
+        except Exception as e:
+            results.append(YieldTrendBatchResult(index=index, error=str(e)))
+    return results
+
+
+def submit_batch(db_service, get_target: Callable, ranges: Iterable[CoveringRange]) -> list:
+    """Schedule every covering range on the shared pool; returns futures"""
+    return [batch_pool.submit(run_range, db_service, get_target, covering) for covering in ranges]
+
+
+def ordered_results(futures: list, count: int) -> List[YieldTrendBatchResult]:
+    results = [None] * count
+    for future in futures:
+        for result in future.result():
+            results[result.index] = result
+    return results
+
+
+def iter_ndjson(results: Iterable[YieldTrendBatchResult]) -> Iterator[str]:
+    for result in results:
+        yield result.model_dump_json() + "\n"
@@ -2,74 +2,108 @@
 Views module for rendering HTML pages with Jinja2 templates
 """
 from fastapi import APIRouter, Request, Query
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
+from starlette.concurrency import run_in_threadpool
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, List
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta
+import asyncio
+import base64
+import html
+import json
+import secrets
+import threading
 
-from app.api.deps import get_db_service
+from app.api.deps import get_db_service, get_settings_service
+from app.api.caching import lot_etag, not_modified, product_etag, product_version, set_validators
+from app.api.cancellation import cancellable
 from app.services.chart_generator import (
     generate_yield_trend_chart,
     generate_fail_ratio_chart,
     generate_wafer_svg,
     generate_wafer_map_detail
 )
-from app.services.mock_db import mock_settings_service
 from app.services.analytics import analytics_service
+from app.services.live_yield import live_yield_hub
+from app.services.metrics import TimedTemplate
+from app.services.jobs import DONE, JobQueueFull, job_queue
+import app.services.analytics_jobs  # registers the job kinds
+from app.services.cache import TTLCache
+from app.services.cancellation import check_cancelled
+from app.services.single_flight import SingleFlight
+from app.services.wafer_cache import wafer_cache
 from app.core.config import settings as app_settings
 
 def get_products_list():
-    """Get products from Oracle or Mock based on settings"""
-    if app_settings.USE_MOCK_DB:
-        return mock_settings_service.get_products()
-    else:
-        from app.services.oracle_db import oracle_db_service
-        return oracle_db_service.get_products()
+    """Get products from the configured backend"""
+    return get_settings_service().get_products()
 
 router = APIRouter()
 templates = Jinja2Templates(directory="templates")
+# Time every render as a "template" span (Server-Timing / metrics)
+templates.env.template_class = TimedTemplate
+
+# Computed dashboard series keyed by opaque token, so switching aggregation
+# re-buckets the cached daily series instead of re-querying the database.
+# Its shared tier is an SQLite file: async handlers reach it off the loop.
+stats_cache = TTLCache(maxsize=512, ttl=1800, name="dashboard_stats", shared=True)
+
+# Identical concurrent dashboard loads (same product and range) query and
+# compute the stats once
+dashboard_flight = SingleFlight("dashboard.yield_stats")
+
+# Concurrent lot fetches share the DB connection pool; thumbnails render
+# in a dedicated worker pool so the event loop keeps serving requests
+lot_fetch_limit = threading.BoundedSemaphore(app_settings.WAFER_LOT_CONCURRENCY)
+render_pool = ThreadPoolExecutor(max_workers=app_settings.RENDER_WORKERS, thread_name_prefix="render")
+
+# Lots listed per page of the lot selector
+LOT_PAGE_SIZE = 20
 
 
 # ==================== Dashboard ====================
 
 @router.get("/", response_class=HTMLResponse)
+@cancellable
 async def dashboard(
     request: Request,
     product_id: Optional[str] = None,
     aggregation: str = "daily"
 ):
     """Main dashboard page"""
-    products = get_products_list()
+    products = await run_in_threadpool(get_products_list)
     active_products = [p for p in products if p.get("active", True)]
     
     if not product_id and active_products:
         product_id = active_products[0]["id"]
     
+    etag = None
+    if product_id:
+        etag = await run_in_threadpool(
+            product_etag, request, get_db_service(), get_settings_service(), [product_id],
+            product_id, [p["id"] for p in active_products]
+        )
+        cached = not_modified(request, etag)
+        if cached:
+            return cached
+    
     # Get yield data
     data = {}
+    stats_token = None
     if product_id:
-        db_service = get_db_service()
-        end_date = date.today()
-        start_date = end_date - timedelta(days=30)
-        data = db_service.get_cp_yield_trend(product_id, start_date, end_date)
-        stats = analytics_service.calculate_yield_stats(data)
-        # Get target from appropriate service (None if not set)
-        if app_settings.USE_MOCK_DB:
-            target = mock_settings_service.get_target(product_id)
-        else:
-            from app.services.oracle_db import oracle_db_service
-            target = oracle_db_service.get_target(product_id)
-        stats['target'] = target
-        data = {"daily_trends": stats.get("daily_trends", []), "statistics": stats}
+        data, stats_token = await run_in_threadpool(load_and_store_dashboard_data, product_id)
     
     # Generate charts
+    check_cancelled()
     yield_chart_html = generate_yield_trend_chart(data, aggregation) if data else ""
+    check_cancelled()
     fail_ratio_chart_html = generate_fail_ratio_chart(data) if data else ""
     
     # Calculate fail ratio data for the list
     fail_ratio_data = calculate_fail_ratio_list(data)
     
-    return templates.TemplateResponse("pages/dashboard.html", {
+    return set_validators(templates.TemplateResponse("pages/dashboard.html", {
         "request": request,
         "active_page": "dashboard",
         "page_title": "Yield Overview",
@@ -77,69 +111,121 @@ async def dashboard(
         "selected_product": product_id,
         "aggregation": aggregation,
         "statistics": data.get("statistics", {}),
+        "stats_token": stats_token,
         "yield_chart_html": yield_chart_html,
         "fail_ratio_chart_html": fail_ratio_chart_html,
         "fail_ratio_data": fail_ratio_data
-    })
+    }), etag)
 
 
 @router.get("/partials/dashboard-content", response_class=HTMLResponse)
+@cancellable
 async def dashboard_content_partial(
     request: Request,
     product_id: str,
     aggregation: str = "daily"
 ):
     """Partial for dashboard content (HTMX)"""
-    db_service = get_db_service()
-    end_date = date.today()
-    start_date = end_date - timedelta(days=30)
+    etag = await run_in_threadpool(
+        product_etag, request, get_db_service(), get_settings_service(), [product_id]
+    )
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
     
-    data = db_service.get_cp_yield_trend(product_id, start_date, end_date)
-    stats = analytics_service.calculate_yield_stats(data)
-    if app_settings.USE_MOCK_DB:
-        target = mock_settings_service.get_target(product_id)
-    else:
-        from app.services.oracle_db import oracle_db_service
-        target = oracle_db_service.get_target(product_id)
-    stats['target'] = target
-    data = {"daily_trends": stats.get("daily_trends", []), "statistics": stats}
+    data, stats_token = await run_in_threadpool(load_and_store_dashboard_data, product_id)
+    stats = data["statistics"]
     
+    # A newer product selection (or a closed tab) makes the rest pointless
+    check_cancelled()
     yield_chart_html = generate_yield_trend_chart(data, aggregation)
+    check_cancelled()
     fail_ratio_chart_html = generate_fail_ratio_chart(data)
     fail_ratio_data = calculate_fail_ratio_list(data)
     
-    return templates.TemplateResponse("partials/dashboard_content.html", {
+    return set_validators(templates.TemplateResponse("partials/dashboard_content.html", {
         "request": request,
+        "selected_product": product_id,
         "aggregation": aggregation,
         "statistics": stats,
+        "stats_token": stats_token,
         "yield_chart_html": yield_chart_html,
         "fail_ratio_chart_html": fail_ratio_chart_html,
         "fail_ratio_data": fail_ratio_data
-    })
+    }), etag)
 
 
 @router.get("/partials/yield-chart", response_class=HTMLResponse)
+@cancellable
 async def yield_chart_partial(
     request: Request,
     product_id: str,
-    aggregation: str = "daily"
+    aggregation: str = "daily",
+    stats_token: Optional[str] = None
 ):
-    """Partial for yield chart only (HTMX)"""
-    db_service = get_db_service()
-    end_date = date.today()
-    start_date = end_date - timedelta(days=30)
+    """
+    Partial for yield chart only (HTMX)
+    
+    Aggregation switches reuse the daily series stored under stats_token
+    while the product's data version is unchanged; on a miss (expired,
+    other worker, new data or settings) the product is re-queried.
+    """
+    etag = await run_in_threadpool(
+        product_etag, request, get_db_service(), get_settings_service(), [product_id]
+    )
+    unchanged = not_modified(request, etag)
+    if unchanged:
+        return unchanged
+    
+    cached = await run_in_threadpool(lookup_dashboard_data, product_id, stats_token) if stats_token else None
+    if cached is not None:
+        check_cancelled()
+        chart_html = generate_yield_trend_chart(cached, aggregation, include_plotlyjs=False)
+        return set_validators(HTMLResponse(content=chart_html), etag)
+    
+    data, stats_token = await run_in_threadpool(load_and_store_dashboard_data, product_id)
+    
+    # Hand the fresh token back to the page with an out-of-band swap
+    token_input = (
+        f'<input type="hidden" id="stats-token" name="stats_token" '
+        f'value="{stats_token}" hx-swap-oob="true">'
+    )
+    check_cancelled()
+    chart_html = generate_yield_trend_chart(data, aggregation, include_plotlyjs=False)
+    return set_validators(HTMLResponse(content=chart_html + token_input), etag)
+
+
+@router.get("/events/yield")
+async def yield_events(
+    request: Request,
+    product_id: str
+):
+    """
+    Server-Sent Events stream of live yield deltas for a product
     
-    data = db_service.get_cp_yield_trend(product_id, start_date, end_date)
-    stats = analytics_service.calculate_yield_stats(data)
-    if app_settings.USE_MOCK_DB:
-        target = mock_settings_service.get_target(product_id)
-    else:
-        from app.services.oracle_db import oracle_db_service
-        target = oracle_db_service.get_target(product_id)
-    stats['target'] = target
-    data = {"daily_trends": stats.get("daily_trends", []), "statistics": stats}
+    Each "yield" event carries the daily buckets that changed since the
+    last shared poll; the page extends its chart in place.
+    """
+    queue = live_yield_hub.subscribe(product_id)
     
-    return generate_yield_trend_chart(data, aggregation, include_plotlyjs=False)
+    async def stream():
+        try:
+            yield "retry: 10000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    # Keep proxies from closing an idle connection
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: yield\ndata: {message}\n\n"
+        finally:
+            live_yield_hub.unsubscribe(product_id, queue)
+    
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
 
 
 # ==================== Wafer Map ====================
@@ -150,25 +236,18 @@ async def wafermap(
     product_id: Optional[str] = None
 ):
     """Wafer map viewer page"""
-    products = get_products_list()
+    products = await run_in_threadpool(get_products_list)
     active_products = [p for p in products if p.get("active", True)]
     
     if not product_id and active_products:
         product_id = active_products[0]["id"]
     
-    # Get lots for product
-    db_service = get_db_service()
-    lots = db_service.get_lots_for_product(product_id) if product_id else []
-    selected_lots = [lots[0]] if lots else []
-    
-    # Get wafer maps for selected lots
-    wafer_maps = {}
-    for lot_id in selected_lots:
-        maps = db_service.get_wafer_maps(lot_id)
-        wafer_maps[lot_id] = [
-            {**m, "svg": generate_wafer_svg(m, size=90)}
-            for m in maps
-        ]
+    # First page of lots; later pages load as the selector scrolls
+    lot_page = {"lots": [], "next_cursor": None}
+    if product_id:
+        lot_page = await run_in_threadpool(load_lot_page, product_id, None)
+    lots = lot_page["lots"]
+    selected_lots = [lots[0]["lot_id"]] if lots else []
     
     return templates.TemplateResponse("pages/wafermap.html", {
         "request": request,
@@ -177,25 +256,42 @@ async def wafermap(
         "products": active_products,
         "selected_product": product_id,
         "lots": lots,
+        "next_cursor": lot_page["next_cursor"],
         "selected_lots": selected_lots,
-        "wafer_maps": wafer_maps
+        "lot_ids": selected_lots
     })
 
 
 @router.get("/partials/wafer-lots", response_class=HTMLResponse)
 async def wafer_lots_partial(
     request: Request,
-    product_id: str
+    product_id: str,
+    cursor: Optional[str] = None
 ):
-    """Partial for lot selection (HTMX)"""
-    db_service = get_db_service()
-    lots = db_service.get_lots_for_product(product_id)
+    """
+    Partial for lot selection (HTMX)
+    
+    Without a cursor returns the whole selector with the first page; with
+    one returns only the next page of lot buttons and its own sentinel.
+    """
+    etag = await run_in_threadpool(
+        product_etag, request, get_db_service(), get_settings_service(), [product_id]
+    )
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
     
-    return templates.TemplateResponse("partials/wafer_lots.html", {
+    lot_page = await run_in_threadpool(load_lot_page, product_id, cursor)
+    lots = lot_page["lots"]
+    template = "partials/wafer_lot_page.html" if cursor else "partials/wafer_lots.html"
+    
+    return set_validators(templates.TemplateResponse(template, {
         "request": request,
+        "selected_product": product_id,
         "lots": lots,
-        "selected_lots": [lots[0]] if lots else []
-    })
+        "next_cursor": lot_page["next_cursor"],
+        "selected_lots": [lots[0]["lot_id"]] if lots and not cursor else []
+    }), etag)
 
 
 @router.get("/partials/wafer-maps", response_class=HTMLResponse)
@@ -204,23 +300,39 @@ async def wafer_maps_partial(
     product_id: str,
     lot_id: List[str] = Query(default=[])
 ):
-    """Partial for wafer maps grid (HTMX)"""
-    db_service = get_db_service()
-    
-    wafer_maps = {}
-    for lid in lot_id:
-        maps = db_service.get_wafer_maps(lid)
-        wafer_maps[lid] = [
-            {**m, "svg": generate_wafer_svg(m, size=90)}
-            for m in maps
-        ]
+    """
+    Partial for wafer maps grid (HTMX)
     
+    Returns one placeholder card per lot immediately; each placeholder
+    fetches its own lot card once it scrolls into view, so only visible
+    lots are queried and each is swapped in as soon as it is ready.
+    """
     return templates.TemplateResponse("partials/wafer_maps.html", {
         "request": request,
-        "wafer_maps": wafer_maps
+        "lot_ids": lot_id
     })
 
 
+@router.get("/partials/wafer-lot", response_class=HTMLResponse)
+async def wafer_lot_partial(
+    request: Request,
+    lot_id: str
+):
+    """Partial for a single lot's wafer thumbnails (HTMX)"""
+    etag = await run_in_threadpool(lot_etag, request, get_db_service(), lot_id)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    
+    maps = await load_lot_thumbnails(lot_id)
+    
+    return set_validators(templates.TemplateResponse("partials/wafer_lot_card.html", {
+        "request": request,
+        "lot_id": lot_id,
+        "maps": maps
+    }), etag)
+
+
 @router.get("/partials/wafer-detail", response_class=HTMLResponse)
 async def wafer_detail_partial(
     request: Request,
@@ -228,17 +340,99 @@ async def wafer_detail_partial(
     lot_id: str
 ):
     """Partial for wafer detail modal (HTMX)"""
+    try:
+        wafer_num = int(wafer_id)
+    except ValueError:
+        return HTMLResponse(content="<div>Wafer not found</div>")
+    
     db_service = get_db_service()
-    maps = db_service.get_wafer_maps(lot_id)
+    etag = await run_in_threadpool(lot_etag, request, db_service, lot_id)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
     
-    wafer_data = next((m for m in maps if str(m.get("wafer_id")) == wafer_id), None)
+    wafer_data = await run_in_threadpool(wafer_cache.get, db_service, lot_id, wafer_num)
     if wafer_data:
-        wafer_data["lot_id"] = lot_id
-        return HTMLResponse(content=generate_wafer_map_detail(wafer_data))
+        wafer_data = {**wafer_data, "lot_id": lot_id}
+        return set_validators(HTMLResponse(content=generate_wafer_map_detail(wafer_data)), etag)
     
     return HTMLResponse(content="<div>Wafer not found</div>")
 
 
+# ==================== Background Jobs ====================
+
+# Longest range the dashboard's job buttons may ask for
+MAX_JOB_DAYS = 3650
+
+
+@router.post("/partials/jobs", response_class=HTMLResponse)
+async def submit_job_partial(request: Request):
+    """Submit a long-range trend or export job and return its progress card (HTMX)"""
+    form_data = await request.form()
+    kind = form_data.get("kind", "trend")
+    try:
+        days = int(form_data.get("days", 365))
+    except (TypeError, ValueError):
+        days = 0
+    if not 1 <= days <= MAX_JOB_DAYS:
+        return HTMLResponse(content=f"<div>days must be between 1 and {MAX_JOB_DAYS}</div>", status_code=400)
+    end_date = date.today()
+    start_date = end_date - timedelta(days=days - 1)
+    
+    params = {
+        "product_id": form_data.get("product_id"),
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat()
+    }
+    if kind == "export":
+        params["format"] = form_data.get("format", "csv")
+    try:
+        job = job_queue.submit(kind, params)
+    except ValueError as e:
+        return HTMLResponse(content=f"<div>{html.escape(str(e))}</div>", status_code=400)
+    except JobQueueFull as e:
+        return HTMLResponse(content=f"<div>{html.escape(str(e))}</div>", status_code=503)
+    return render_job(request, job)
+
+
+@router.get("/partials/job", response_class=HTMLResponse)
+async def job_partial(request: Request, job_id: str):
+    """Progress card for a job; polls itself until the job finishes (HTMX)"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return HTMLResponse(content="<div>Job expired</div>")
+    return render_job(request, job)
+
+
+@router.post("/partials/job-cancel", response_class=HTMLResponse)
+async def cancel_job_partial(request: Request):
+    form_data = await request.form()
+    job = job_queue.cancel(form_data.get("job_id", ""))
+    if job is None:
+        return HTMLResponse(content="<div>Job expired</div>")
+    return render_job(request, job)
+
+
+def render_job(request: Request, job):
+    params = job.params
+    title = {
+        "trend": f"Yield Trend {params.get('start_date')} - {params.get('end_date')}",
+        "export": f"Export {params.get('product_id')} ({params.get('format', 'csv')})",
+        "stacked_map": f"Stacked Map ({len(params.get('lot_ids', []))} lots)"
+    }.get(job.kind, job.kind)
+    
+    chart_html = ""
+    if job.status == DONE and job.kind == "trend":
+        chart_html = generate_yield_trend_chart(job.result, "weekly", include_plotlyjs=False)
+    
+    return templates.TemplateResponse("partials/job_status.html", {
+        "request": request,
+        "job": job,
+        "title": title,
+        "chart_html": chart_html
+    })
+
+
 # ==================== Settings ====================
 
 @router.get("/settings", response_class=HTMLResponse)
@@ -252,25 +446,11 @@ async def settings(
     if year is None:
         year = datetime.now().year
     
-    products = get_products_list()
-    
     months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
               'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
     
-    # Get targets for all active products using appropriate service
-    targets = {}
-    for product in products:
-        if product.get("active"):
-            for month in range(1, 13):
-                month_str = f"{year}-{month:02d}"
-                if app_settings.USE_MOCK_DB:
-                    target = mock_settings_service.get_target(product["id"], month_str)
-                else:
-                    from app.services.oracle_db import oracle_db_service
-                    target = oracle_db_service.get_target(product["id"], month_str)
-                # Only add to targets if value exists (don't add None or default values)
-                if target is not None:
-                    targets[f"{product['id']}-{month_str}"] = target
+    # Products and targets come from the DB and the settings store: off the loop
+    products, targets = await run_in_threadpool(load_settings_data, year)
     
     return templates.TemplateResponse("pages/settings.html", {
         "request": request,
@@ -292,13 +472,9 @@ async def toggle_product_partial(request: Request):
     active = active_str.lower() == "true"
     
     # Toggle the product using appropriate service
-    if app_settings.USE_MOCK_DB:
-        mock_settings_service.toggle_product(product_id, active)
-        products = mock_settings_service.get_products()
-    else:
-        from app.services.oracle_db import oracle_db_service
-        oracle_db_service.toggle_product(product_id, active)
-        products = oracle_db_service.get_products()
+    settings_service = get_settings_service()
+    await run_in_threadpool(settings_service.toggle_product, product_id, active)
+    products = await run_in_threadpool(settings_service.get_products)
     
     return templates.TemplateResponse("partials/product_list.html", {
         "request": request,
@@ -308,6 +484,117 @@ async def toggle_product_partial(request: Request):
 
 # ==================== Helper Functions ====================
 
+def load_dashboard_data(product_id: str) -> dict:
+    """Query the last 30 days for a product and compute its daily series"""
+    end_date = date.today()
+    start_date = end_date - timedelta(days=30)
+    
+    # Each caller gets its own copy, so setting the target below is safe
+    stats, _ = dashboard_flight.do(
+        (product_id, start_date, end_date), compute_yield_stats, product_id, start_date, end_date
+    )
+    # Get target from appropriate service (None if not set)
+    stats['target'] = get_settings_service().get_target(product_id)
+    return {"daily_trends": stats.get("daily_trends", []), "statistics": stats}
+
+
+def load_settings_data(year: int) -> tuple:
+    """All products and the year's targets of the active ones"""
+    products = get_products_list()
+    settings_service = get_settings_service()
+    targets = {}
+    for product in products:
+        if product.get("active"):
+            for month in range(1, 13):
+                month_str = f"{year}-{month:02d}"
+                target = settings_service.get_target(product["id"], month_str)
+                # Only add to targets if value exists (don't add None or default values)
+                if target is not None:
+                    targets[f"{product['id']}-{month_str}"] = target
+    return products, targets
+
+
+def compute_yield_stats(product_id: str, start_date: date, end_date: date) -> dict:
+    data = get_db_service().get_cp_yield_trend(product_id, start_date, end_date)
+    check_cancelled()
+    return analytics_service.calculate_yield_stats(data)
+
+
+async def load_lot_thumbnails(lot_id: str) -> list:
+    """Fetch a lot off the event loop and render its thumbnails in the render pool"""
+    db_service = get_db_service()
+    
+    def fetch():
+        with lot_fetch_limit:
+            maps = db_service.get_wafer_maps(lot_id)
+        # The detail modal will look these wafers up individually
+        wafer_cache.put_lot(lot_id, maps)
+        return maps
+    
+    maps = await run_in_threadpool(fetch)
+    
+    loop = asyncio.get_running_loop()
+    svgs = await asyncio.gather(*(
+        loop.run_in_executor(render_pool, generate_wafer_svg, m, 90) for m in maps
+    ))
+    return [{**m, "svg": svg} for m, svg in zip(maps, svgs)]
+
+
+def encode_lot_cursor(lot: dict) -> str:
+    raw = json.dumps([lot["last_date"].isoformat(), lot["lot_id"]])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_lot_cursor(cursor: str) -> Optional[tuple]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        last_date, lot_id = json.loads(raw)
+        return datetime.fromisoformat(last_date), lot_id
+    except (ValueError, TypeError):
+        return None
+
+
+def load_lot_page(product_id: str, cursor: Optional[str]) -> dict:
+    """One page of lot summaries plus the cursor for the next page"""
+    before = decode_lot_cursor(cursor) if cursor else None
+    if cursor and before is None:
+        return {"lots": [], "next_cursor": None}
+    # Fetch one extra row to learn whether another page exists
+    lots = get_db_service().get_lot_summaries(product_id, limit=LOT_PAGE_SIZE + 1, before=before)
+    next_cursor = encode_lot_cursor(lots[LOT_PAGE_SIZE - 1]) if len(lots) > LOT_PAGE_SIZE else None
+    return {"lots": lots[:LOT_PAGE_SIZE], "next_cursor": next_cursor}
+
+
+def dashboard_data_version(product_id: str) -> Optional[tuple]:
+    return product_version(get_db_service(), get_settings_service(), product_id)
+
+
+def store_dashboard_data(product_id: str, data: dict, version: Optional[tuple]) -> str:
+    """Keep computed dashboard data server-side and return its opaque token"""
+    token = secrets.token_urlsafe(16)
+    stats_cache.set(token, {"product_id": product_id, "version": version, "data": data})
+    return token
+
+
+def load_and_store_dashboard_data(product_id: str) -> tuple:
+    """Dashboard data and the token it is stored under"""
+    # Version first: if data lands meanwhile the entry is only ever marked too old
+    version = dashboard_data_version(product_id)
+    data = load_dashboard_data(product_id)
+    return data, store_dashboard_data(product_id, data, version)
+
+
+def lookup_dashboard_data(product_id: str, stats_token: str) -> Optional[dict]:
+    """Data stored under stats_token, if it is for this product and still current"""
+    cached = stats_cache.get(stats_token)
+    if not cached or cached["product_id"] != product_id or cached["version"] is None:
+        return None
+    # The ETag ignores stats_token, so a stale series would be cached under a fresh validator
+    if cached["version"] != dashboard_data_version(product_id):
+        return None
+    return cached["data"]
+
+
 def calculate_fail_ratio_list(data: dict) -> list:
     """Calculate fail ratio data for display list"""
     daily_trends = data.get("daily_trends", [])
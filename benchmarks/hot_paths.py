@@ -0,0 +1,279 @@
+"""
+Hot-Path Micro-Benchmarks
+Times the analytics and rendering functions behind the dashboard and
+wafer-map pages on deterministic synthetic inputs, records peak traced
+memory, and compares each case with a stored baseline.
+
+Scales:
+    wafers  1k, 10k, 100k, 1M rows into calculate_yield_stats; the daily
+            series it produces (250 wafers per day) feeds aggregate_data
+            and the Plotly charts
+    dies    ~710, 3k, 11k, 58k dies per wafer for the SVG thumbnail and
+            the detail heatmap
+
+Usage:
+    python -m benchmarks.hot_paths --save-baseline   # record on the reference commit
+    python -m benchmarks.hot_paths                   # compare; exit 1 on regression, 2 without a baseline entry
+    python -m benchmarks.hot_paths --quick --only aggregate_data
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from app.services.analytics import analytics_service
+from app.services.chart_generator import (
+    aggregate_data,
+    generate_fail_ratio_chart,
+    generate_wafer_map_detail,
+    generate_wafer_svg,
+    generate_yield_trend_chart,
+)
+from app.services.wafer_codec import as_arrays
+from app.services.wafer_synth import WaferSynthesizer
+
+WAFER_SCALES = (1_000, 10_000, 100_000, 1_000_000)
+QUICK_WAFER_SCALES = (1_000, 10_000)
+# Die widths (mm) giving roughly 710, 3k, 11k and 58k dies on a 300mm wafer
+DIE_WIDTHS_MM = (10.0, 5.0, 2.5, 1.1)
+QUICK_DIE_WIDTHS_MM = (10.0, 2.5)
+
+AGGREGATION_MODES = ("daily", "weekly", "monthly", "quarterly", "bylot")
+WAFERS_PER_DAY = 250
+SEED = 20240601
+
+DEFAULT_BASELINE = Path(__file__).with_name("hot_paths_baseline.json")
+
+# Differences below these are noise for the smallest cases
+MIN_DELTA_MS = 0.05
+MIN_DELTA_KB = 256.0
+
+# Fast functions are looped until one timing sample takes about this long
+SAMPLE_SECONDS = 0.1
+
+
+def synthetic_rows(wafers: int, seed: int = SEED) -> List[dict]:
+    """SEMI_CP_HEADER rows with bins, shaped like get_cp_yield_trend output"""
+    rng = np.random.default_rng([seed, wafers])
+    effective = 1000
+    yields = np.clip(rng.normal(95.0, 2.5, wafers), 0.0, 100.0).round(2)
+    pass_chips = (effective * yields / 100.0).astype(np.int64)
+    fails = effective - pass_chips
+    opens = (fails * rng.uniform(0.3, 0.6, wafers)).astype(np.int64)
+    shorts = ((fails - opens) * rng.uniform(0.4, 0.8, wafers)).astype(np.int64)
+    others = fails - opens - shorts
+
+    start = datetime(2020, 1, 1)
+    rows = []
+    for i, (rate, ok, op, sh, ot) in enumerate(zip(
+        yields.tolist(), pass_chips.tolist(), opens.tolist(), shorts.tolist(), others.tolist()
+    )):
+        day = i // WAFERS_PER_DAY
+        lot_id = f"LOT-{day:05d}-{(i % WAFERS_PER_DAY) // 25:02d}"
+        rows.append({
+            "SUBSTRATE_ID": f"{lot_id}-{i % 25 + 1:02d}",
+            "LOT_ID": lot_id,
+            "WAFER_ID": i % 25 + 1,
+            "PRODUCT_ID": "PRODUCT-BENCH",
+            "PROCESS": "CP_FINAL",
+            "PASS_CHIP": ok,
+            "PASS_CHIP_RATE": rate,
+            "EFFECTIVE_NUM": effective,
+            "REGIST_DATE": start + timedelta(days=day),
+            "REWORK_NEW": 0,
+            "bins": {"1_Pass": ok, "3_Open": op, "7_Short": sh, "99_Other": ot},
+        })
+    return rows
+
+
+class Inputs:
+    """Builds inputs for one scale at a time, so only one large row set is alive"""
+
+    def __init__(self):
+        self._wafers = None
+        self._rows = None
+        self._stats = None
+        self._die_width = None
+        self._wafer = None
+
+    def rows(self, wafers: int) -> List[dict]:
+        if self._wafers != wafers:
+            self._rows = self._stats = None
+            self._rows = synthetic_rows(wafers)
+            self._wafers = wafers
+        return self._rows
+
+    def trend(self, wafers: int) -> dict:
+        """calculate_yield_stats output wrapped as the chart functions expect"""
+        self.rows(wafers)
+        if self._stats is None:
+            self._stats = analytics_service.calculate_yield_stats(self._rows)
+        return {"daily_trends": self._stats["daily_trends"], "statistics": self._stats}
+
+    def wafer(self, die_width_mm: float) -> dict:
+        """One wafer as get_wafer_maps returns it (int lists)"""
+        if self._die_width != die_width_mm:
+            synth = WaferSynthesizer(die_width_mm=die_width_mm)
+            x, y = synth.die_coords()
+            self._wafer = {
+                "lot_id": "LOT-BENCH", "wafer_id": 1, "product_id": "PRODUCT-BENCH",
+                "x": x.tolist(), "y": y.tolist(), "bin": synth.wafer_bins("LOT-BENCH", 1).tolist()
+            }
+            self._die_width = die_width_mm
+        return self._wafer
+
+
+def build_cases(inputs: Inputs, wafer_scales, die_widths) -> List[tuple]:
+    """(name, scale label, fn) in an order that reuses each scale's inputs"""
+    cases = []
+    for wafers in wafer_scales:
+        cases.append(("calculate_yield_stats", wafers, lambda w=wafers: analytics_service.calculate_yield_stats(inputs.rows(w))))
+        for mode in AGGREGATION_MODES:
+            cases.append((f"aggregate_data[{mode}]", wafers, lambda w=wafers, m=mode: aggregate_data(inputs.trend(w)["daily_trends"], m)))
+        cases.append(("generate_yield_trend_chart", wafers, lambda w=wafers: generate_yield_trend_chart(inputs.trend(w), "daily", include_plotlyjs=False)))
+        cases.append(("generate_fail_ratio_chart", wafers, lambda w=wafers: generate_fail_ratio_chart(inputs.trend(w))))
+    for width in die_widths:
+        dies = WaferSynthesizer(die_width_mm=width).die_count
+        cases.append(("generate_wafer_svg", dies, lambda d=width: generate_wafer_svg(inputs.wafer(d), 90)))
+        # The detail modal receives the NumPy form from wafer_cache
+        cases.append(("generate_wafer_map_detail", dies, lambda d=width: generate_wafer_map_detail(as_arrays(inputs.wafer(d)))))
+    return cases
+
+
+def time_ms(fn: Callable, repeat: int) -> float:
+    """Best of `repeat` samples; fast functions are looped to SAMPLE_SECONDS per sample"""
+    t0 = time.perf_counter()
+    fn()
+    first = time.perf_counter() - t0
+    number = max(1, min(10_000, int(SAMPLE_SECONDS / max(first, 1e-6))))
+    best = first
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - t0) / number)
+    return best * 1000.0
+
+
+def peak_kb(fn: Callable) -> float:
+    """Peak traced allocation (Python and NumPy) during one call"""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 1024.0
+    finally:
+        tracemalloc.stop()
+
+
+def compare(result: dict, base: dict, threshold: float, memory_threshold: float) -> List[str]:
+    """Regression messages for one case (empty when within thresholds)"""
+    problems = []
+    delta_ms = result["time_ms"] - base["time_ms"]
+    if result["time_ms"] > base["time_ms"] * (1 + threshold) and delta_ms > MIN_DELTA_MS:
+        problems.append(f"time {base['time_ms']:.2f} -> {result['time_ms']:.2f} ms")
+    if (
+        result.get("peak_kb") is not None and base.get("peak_kb")
+        and result["peak_kb"] > base["peak_kb"] * (1 + memory_threshold)
+        and result["peak_kb"] - base["peak_kb"] > MIN_DELTA_KB
+    ):
+        problems.append(f"peak {base['peak_kb']:.0f} -> {result['peak_kb']:.0f} KB")
+    return problems
+
+
+def environment() -> Dict[str, str]:
+    import plotly
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "plotly": plotly.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor() or platform.machine(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="Small scales only (1k/10k wafers, 710/11k dies)")
+    parser.add_argument("--only", default=None, help="Run cases whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing samples per case (best is kept)")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Write results to --baseline instead of comparing")
+    parser.add_argument("--threshold", type=float, default=0.20, help="Allowed slowdown (0.20 = 20%%)")
+    parser.add_argument("--memory-threshold", type=float, default=0.10, help="Allowed peak memory growth")
+    parser.add_argument("--output", type=Path, default=None, help="Also write results JSON here")
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if not args.save_baseline:
+        if args.baseline.exists():
+            baseline = json.loads(args.baseline.read_text())["results"]
+        else:
+            # Nothing to compare against is a failure, not a pass
+            print(f"No baseline at {args.baseline}; run with --save-baseline on the reference commit first")
+            return 2
+
+    inputs = Inputs()
+    cases = build_cases(
+        inputs,
+        QUICK_WAFER_SCALES if args.quick else WAFER_SCALES,
+        QUICK_DIE_WIDTHS_MM if args.quick else DIE_WIDTHS_MM
+    )
+    if args.only:
+        cases = [c for c in cases if args.only in c[0]]
+
+    results = {}
+    regressions = []
+    missing = []
+    print(f"{'case':<32}{'scale':>10}{'time':>12}{'peak':>12}{'baseline':>12}{'change':>9}")
+    for name, scale, fn in cases:
+        key = f"{name}@{scale}"
+        result = {"time_ms": round(time_ms(fn, args.repeat), 4)}
+        result["peak_kb"] = None if args.no_memory else round(peak_kb(fn), 1)
+        results[key] = result
+
+        base = baseline.get(key)
+        problems = []
+        if base is not None:
+            problems = compare(result, base, args.threshold, args.memory_threshold)
+            regressions.extend(f"{key}: {p}" for p in problems)
+        elif not args.save_baseline:
+            missing.append(key)
+
+        peak = "-" if result["peak_kb"] is None else f"{result['peak_kb'] / 1024:.1f}MB"
+        base_ms = f"{base['time_ms']:.2f}ms" if base else "-"
+        change = f"{(result['time_ms'] / base['time_ms'] - 1) * 100:+.0f}%" if base else ""
+        flag = "  REGRESSION" if problems else "  NO BASELINE" if key in missing else ""
+        print(f"{name:<32}{scale:>10,}{result['time_ms']:>10.2f}ms{peak:>12}{base_ms:>12}{change:>9}{flag}")
+
+    report = {"created": datetime.now().isoformat(timespec="seconds"), "environment": environment(), "results": results}
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2))
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%} time / {args.memory_threshold:.0%} memory:")
+        for line in regressions:
+            print(f"  {line}")
+    if missing:
+        # A case the baseline has never seen cannot pass the comparison
+        print(f"\n{len(missing)} case(s) missing from {args.baseline}; re-record it with --save-baseline:")
+        for key in missing:
+            print(f"  {key}")
+    if regressions:
+        return 1
+    return 2 if missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
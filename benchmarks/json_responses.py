@@ -0,0 +1,89 @@
+"""
+JSON Response Benchmark
+Compares the response_model path (validate + serialize through pydantic,
+then json.dumps) with the fast path (raw dicts / NumPy arrays straight
+into app.api.responses.dumps) for the largest API payloads.
+
+Usage:
+    python -m benchmarks.json_responses [--die-size-mm 1.2] [--days 365] [--repeat 5]
+"""
+import argparse
+import json
+import time
+from datetime import date, timedelta
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.api import responses
+from app.models.wafer_map import WaferMapResponse
+from app.models.yield_data import YieldTrendResponse
+from app.services.analytics import analytics_service
+from app.services.mock_db import MockDBService
+from app.services.wafer_synth import WaferSynthesizer
+
+
+def best_ms(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times) * 1000.0
+
+
+def response_model_path(adapter: TypeAdapter, value) -> bytes:
+    """What FastAPI does for a declared response_model"""
+    validated = adapter.validate_python(value, from_attributes=True)
+    content = jsonable_encoder(adapter.dump_python(validated, mode="json"))
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--die-size-mm", type=float, default=1.2)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    service = MockDBService()
+    service.synthesizer = WaferSynthesizer(die_width_mm=args.die_size_mm)
+
+    end_date = date.today()
+    rows = service.get_cp_yield_trend("PRODUCT-A", end_date - timedelta(days=args.days), end_date)
+    stats = analytics_service.calculate_yield_stats(rows)
+    trend = {
+        "product_id": "PRODUCT-A",
+        "start_date": end_date - timedelta(days=args.days),
+        "end_date": end_date,
+        "daily_trends": stats["daily_trends"],
+        "statistics": stats,
+    }
+    lot_models = service.get_lot_wafer_maps("LOT-BENCH")
+    lot_arrays = service.get_lot_wafer_arrays("LOT-BENCH")
+
+    cases = [
+        (
+            f"yield trend ({args.days} days)",
+            lambda: response_model_path(TypeAdapter(YieldTrendResponse), YieldTrendResponse(**trend)),
+            lambda: responses.dumps(trend),
+        ),
+        (
+            f"lot maps (25 x {service.synthesizer.die_count:,} dies)",
+            lambda: response_model_path(TypeAdapter(List[WaferMapResponse]), lot_models),
+            lambda: responses.dumps(lot_arrays),
+        ),
+    ]
+
+    print(f"encoder: {'orjson' if responses.orjson else 'json (stdlib)'}")
+    print(f"{'payload':<36}{'response_model':>16}{'fast path':>12}{'speedup':>10}{'size':>10}")
+    for name, slow, fast in cases:
+        slow_ms = best_ms(slow, args.repeat)
+        fast_ms = best_ms(fast, args.repeat)
+        size_mb = len(fast()) / 1e6
+        print(f"{name:<36}{slow_ms:>14.1f}ms{fast_ms:>10.1f}ms{slow_ms / fast_ms:>9.1f}x{size_mb:>8.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+HTTP Load Harness
+Replays engineer sessions against the app, in-process (ASGI transport, no
+server) or over HTTP, and reports throughput and p50/p95/p99 latency per
+route.
+
+A session: open the dashboard, switch aggregation twice, open the wafer
+map, load a lot's thumbnails, open a few wafer details, open settings and
+save a month of targets. Each virtual user keeps its own ETag cache and
+sends If-None-Match like the browser does for HTMX swaps.
+
+Requires httpx (uv run --with httpx ...).
+
+Usage:
+    python -m benchmarks.load_sessions --users 20 --duration 30
+    python -m benchmarks.load_sessions --users 20 --latency          # Oracle-like injected DB latency
+    python -m benchmarks.load_sessions --url http://127.0.0.1:8000 --users 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import sys
+import time
+from datetime import date
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+STATS_TOKEN_RE = re.compile(r'id="stats-token" name="stats_token" value="([^"]*)"')
+LOT_ID_RE = re.compile(r'name="lot_id" value="([^"]+)"')
+WAFER_ID_RE = re.compile(r"showWaferDetail\('(\d+)'")
+
+AGGREGATIONS = ("weekly", "monthly", "quarterly", "bylot")
+
+# Full page loads; every other route is an HTMX swap
+PAGE_ROUTES = {"dashboard", "wafermap", "settings"}
+
+
+class Recorder:
+    """Latency samples per route"""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.not_modified: Dict[str, int] = {}
+        self.sessions = 0
+
+    def add(self, route: str, seconds: float, status: int):
+        self.samples.setdefault(route, []).append(seconds)
+        if status >= 400:
+            self.errors[route] = self.errors.get(route, 0) + 1
+        elif status == 304:
+            self.not_modified[route] = self.not_modified.get(route, 0) + 1
+
+    def report(self, elapsed: float) -> dict:
+        routes = {}
+        for route, samples in self.samples.items():
+            ms = np.asarray(samples) * 1000.0
+            p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+            routes[route] = {
+                "requests": len(samples),
+                "rps": round(len(samples) / elapsed, 2),
+                "errors": self.errors.get(route, 0),
+                "not_modified": self.not_modified.get(route, 0),
+                "mean_ms": round(float(ms.mean()), 2),
+                "p50_ms": round(float(p50), 2),
+                "p95_ms": round(float(p95), 2),
+                "p99_ms": round(float(p99), 2),
+            }
+        total = sum(len(s) for s in self.samples.values())
+        return {
+            "elapsed_s": round(elapsed, 2),
+            "sessions": self.sessions,
+            "requests": total,
+            "rps": round(total / elapsed, 2),
+            "sessions_per_min": round(self.sessions / elapsed * 60.0, 1),
+            "routes": routes,
+        }
+
+
+class VirtualUser:
+    """One engineer clicking through the app with their own browser cache"""
+
+    def __init__(self, client, recorder: Recorder, products: List[str], think_ms: float, rng: random.Random, use_etags: bool):
+        self.client = client
+        self.recorder = recorder
+        self.products = products
+        self.think_ms = think_ms
+        self.rng = rng
+        self.use_etags = use_etags
+        self.etags: Dict[str, str] = {}
+        self.bodies: Dict[str, str] = {}
+
+    async def request(self, route: str, method: str, url: str, **kwargs) -> str:
+        request = self.client.build_request(method, url, **kwargs)
+        key = str(request.url)
+        if route not in PAGE_ROUTES:
+            request.headers["HX-Request"] = "true"
+        if method == "GET" and self.use_etags and key in self.etags:
+            request.headers["If-None-Match"] = self.etags[key]
+
+        started = time.perf_counter()
+        response = await self.client.send(request)
+        body = response.text
+        self.recorder.add(route, time.perf_counter() - started, response.status_code)
+
+        if response.status_code == 304:
+            return self.bodies.get(key, "")
+        if method == "GET" and response.headers.get("etag"):
+            self.etags[key] = response.headers["etag"]
+            self.bodies[key] = body
+        return body
+
+    async def think(self):
+        if self.think_ms > 0:
+            await asyncio.sleep(self.rng.expovariate(1000.0 / self.think_ms))
+
+    async def session(self):
+        product_id = self.rng.choice(self.products)
+
+        page = await self.request("dashboard", "GET", f"/?product_id={product_id}")
+        match = STATS_TOKEN_RE.search(page)
+        stats_token = match.group(1) if match else ""
+        await self.think()
+
+        for aggregation in self.rng.sample(AGGREGATIONS, 2):
+            await self.request(
+                "yield-chart", "GET", "/partials/yield-chart",
+                params={"product_id": product_id, "aggregation": aggregation, "stats_token": stats_token}
+            )
+            await self.think()
+
+        page = await self.request("wafermap", "GET", f"/wafermap?product_id={product_id}")
+        lot_ids = LOT_ID_RE.findall(page)
+        await self.think()
+
+        if lot_ids:
+            lot_id = self.rng.choice(lot_ids[:5])
+            await self.request("wafer-maps", "GET", "/partials/wafer-maps", params={"product_id": product_id, "lot_id": lot_id})
+            card = await self.request("wafer-lot", "GET", "/partials/wafer-lot", params={"lot_id": lot_id})
+            wafer_ids = WAFER_ID_RE.findall(card)
+            await self.think()
+            for wafer_id in self.rng.sample(wafer_ids, min(3, len(wafer_ids))):
+                await self.request("wafer-detail", "GET", "/partials/wafer-detail", params={"lot_id": lot_id, "wafer_id": wafer_id})
+                await self.think()
+
+        year = date.today().year
+        await self.request("settings", "GET", f"/settings?year={year}")
+        await self.think()
+        month = f"{year}-{self.rng.randint(1, 12):02d}"
+        await self.request(
+            "save-targets", "POST", "/api/v1/settings/targets/bulk",
+            data={"product_id": product_id, "year": str(year), f"target_{product_id}_{month}": f"{self.rng.uniform(90, 99):.1f}"}
+        )
+        self.recorder.sessions += 1
+
+
+async def run_users(client, args, products: List[str]) -> dict:
+    recorder = Recorder()
+    deadline = time.perf_counter() + args.duration
+    remaining = {"sessions": args.sessions}
+
+    async def user_loop(index: int):
+        user = VirtualUser(client, recorder, products, args.think_ms, random.Random(args.seed + index), not args.no_etags)
+        while time.perf_counter() < deadline:
+            if args.sessions:
+                if remaining["sessions"] <= 0:
+                    return
+                remaining["sessions"] -= 1
+            await user.session()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user_loop(i) for i in range(args.users)))
+    return recorder.report(time.perf_counter() - started)
+
+
+def print_report(report: dict, label: str):
+    print(f"\n{label}")
+    print(
+        f"{report['sessions']} sessions, {report['requests']} requests in {report['elapsed_s']}s: "
+        f"{report['rps']} req/s, {report['sessions_per_min']} sessions/min"
+    )
+    print(f"{'route':<16}{'reqs':>8}{'req/s':>9}{'err':>6}{'304':>6}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for route, r in report["routes"].items():
+        print(
+            f"{route:<16}{r['requests']:>8}{r['rps']:>9.1f}{r['errors']:>6}{r['not_modified']:>6}"
+            f"{r['p50_ms']:>8.1f}ms{r['p95_ms']:>8.1f}ms{r['p99_ms']:>8.1f}ms"
+        )
+
+
+async def main_async(args) -> dict:
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+        label = f"{args.users} users against {args.url}"
+    else:
+        # Settings are read at import, so configure the backend first
+        os.environ["DB_BACKEND"] = args.backend
+        if args.latency:
+            os.environ["DB_LATENCY_INJECTION"] = "true"
+        from app.main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=args.timeout)
+        label = f"{args.users} users in-process ({args.backend}{', injected latency' if args.latency else ''})"
+
+    async with client:
+        response = await client.get("/api/v1/settings/products")
+        products = [p["id"] for p in response.json() if p.get("active", True)] or ["PRODUCT-A"]
+        report = await run_users(client, args, products)
+    report["label"] = label
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run")
+    parser.add_argument("--sessions", type=int, default=0, help="Stop after this many sessions (0 = run for --duration)")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="Mean pause between clicks (0 = back to back)")
+    parser.add_argument("--url", default=None, help="Target a running server instead of the in-process app")
+    parser.add_argument("--backend", default="mock", choices=["mock", "sqlite"], help="In-process backend")
+    parser.add_argument("--latency", action="store_true", help="In-process: enable DB latency injection (DB_LATENCY_* settings)")
+    parser.add_argument("--no-etags", action="store_true", help="Never send If-None-Match")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=None, help="Write the report JSON here")
+    args = parser.parse_args(argv)
+
+    if httpx is None:
+        print("httpx is required: uv run --with httpx python -m benchmarks.load_sessions ...")
+        return 2
+
+    report = asyncio.run(main_async(args))
+    print_report(report, report["label"])
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    errors = sum(r["errors"] for r in report["routes"].values())
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
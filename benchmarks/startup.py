@@ -0,0 +1,122 @@
+"""
+Startup Import Profile
+Imports app.main in a fresh interpreter under -X importtime and reports
+the total, the heaviest packages and modules, the cost of the modules that
+load eagerly by design, and whether any module that should load lazily was
+imported. Exits 1 when over budget, so it can gate CI.
+
+Usage:
+    python -m benchmarks.startup                       # mock backend, 1200ms budget
+    python -m benchmarks.startup --budget-ms 600 --top 30
+    python -m benchmarks.startup --backend sqlite --warmup
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+# Modules that must not load while importing the app (first use / warm-up only)
+LAZY_MODULES = ("plotly", "pandas", "sqlalchemy", "oracledb")
+# Modules that stay eager: NumPy (~80ms) backs the mock backend, the analytics,
+# the wafer codec and the JSON responses, so every request needs it and
+# deferring it would only move the cost into the first request
+EAGER_MODULES = ("numpy",)
+
+# import app.main measured 700-1100ms (best of 3) on a 1-CPU runner, over half
+# of it FastAPI and Pydantic; the budget leaves room for that spread
+DEFAULT_BUDGET_MS = 1200.0
+
+MARKER = "--- warm-up ---"
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter() - started
+result = {"import_ms": imported * 1000.0, "modules": sorted(sys.modules)}
+if WARMUP:
+    # Imports after the marker belong to the warm-up, not to startup
+    print(MARKER, file=sys.stderr, flush=True)
+    from app.services.warmup import warm_up
+    result["warmup"] = warm_up()
+print(json.dumps(result))
+"""
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """(module, self us, cumulative us) from -X importtime output"""
+    rows = []
+    for line in stderr.split(MARKER)[0].splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def profile(backend: str, warmup: bool) -> Tuple[dict, List[Tuple[str, int, int]]]:
+    env = {**os.environ, "DB_BACKEND": backend, "PYTHONDONTWRITEBYTECODE": "1"}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"WARMUP = {warmup}; MARKER = {MARKER!r}" + PROBE],
+        capture_output=True, text=True, env=env, check=True
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1]), parse_importtime(proc.stderr)
+
+
+def by_package(rows) -> Dict[str, int]:
+    totals: Dict[str, int] = {}
+    for name, self_us, _ in rows:
+        package = name.split(".")[0]
+        totals[package] = totals.get(package, 0) + self_us
+    return totals
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="Maximum wall time to import app.main")
+    parser.add_argument("--backend", default="mock", choices=["mock", "sqlite", "oracle"])
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters to run (best is kept)")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--warmup", action="store_true", help="Also time the background warm-up steps")
+    args = parser.parse_args(argv)
+
+    runs = [profile(args.backend, args.warmup) for _ in range(max(1, args.repeat))]
+    result, rows = min(runs, key=lambda run: run[0]["import_ms"])
+
+    print(f"import app.main ({args.backend}): {result['import_ms']:.0f}ms (best of {len(runs)}, budget {args.budget_ms:.0f}ms)")
+
+    print(f"\n{'package':<28}{'self':>10}")
+    for package, us in sorted(by_package(rows).items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{package:<28}{us / 1000:>8.1f}ms")
+
+    print(f"\n{'module':<48}{'self':>10}{'cumulative':>12}")
+    for name, self_us, cumulative_us in sorted(rows, key=lambda row: -row[1])[:args.top]:
+        print(f"{name:<48}{self_us / 1000:>8.1f}ms{cumulative_us / 1000:>10.1f}ms")
+
+    cumulative = {name: cumulative_us for name, _, cumulative_us in rows}
+    print(f"\n{'eager by design':<48}{'cumulative':>22}")
+    for name in EAGER_MODULES:
+        if name in cumulative:
+            print(f"{name:<48}{cumulative[name] / 1000:>20.1f}ms")
+        else:
+            print(f"{name:<48}{'not imported':>22}")
+
+    if "warmup" in result:
+        steps = ", ".join(f"{k} {v}ms" for k, v in result["warmup"]["steps"].items())
+        print(f"\nwarm-up: {result['warmup']['total_ms']}ms ({steps})")
+
+    failures = []
+    loaded = sorted({m.split(".")[0] for m in result["modules"]} & set(LAZY_MODULES))
+    if loaded:
+        failures.append(f"imported at startup (should load lazily): {', '.join(loaded)}")
+    if result["import_ms"] > args.budget_ms:
+        failures.append(f"import took {result['import_ms']:.0f}ms, over the {args.budget_ms:.0f}ms budget")
+    for failure in failures:
+        print(f"\nFAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
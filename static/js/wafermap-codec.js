@@ -0,0 +1,85 @@
+/*
+ * Decoder for the binary wafer-map wire format (application/vnd.sonar.wafermap).
+ * See app/services/wafer_codec.py for the layout. Arrays are typed-array
+ * views into the response buffer; nothing is copied.
+ *
+ *   const buf = await (await fetch(`/api/v1/wafer/lot_maps?lot_id=${id}&format=binary`)).arrayBuffer();
+ *   const wafers = SonarWaferMap.decode(buf);
+ */
+(function (global) {
+    const EMPTY_BIN = { 1: 0xFF, 2: 0xFFFF };
+    const text = new TextDecoder();
+
+    function magic(view, offset) {
+        return String.fromCharCode(...new Uint8Array(view.buffer, view.byteOffset + offset, 4));
+    }
+
+    function decodeWafer(view, offset) {
+        if (magic(view, offset) !== 'SWM1') throw new Error('Not a wafer record at ' + offset);
+        const layout = view.getUint8(offset + 4);
+        const binBytes = view.getUint8(offset + 5);
+        const lotLen = view.getUint16(offset + 6, true);
+        const productLen = view.getUint16(offset + 8, true);
+        const wafer = {
+            waferId: view.getUint32(offset + 10, true),
+            dieCount: view.getUint32(offset + 14, true),
+            x0: view.getInt16(offset + 18, true),
+            y0: view.getInt16(offset + 20, true),
+            width: view.getUint16(offset + 22, true),
+            height: view.getUint16(offset + 24, true),
+            layout: layout === 1 ? 'grid' : 'coords',
+            empty: EMPTY_BIN[binBytes]
+        };
+        offset += 26;
+        const bytes = (n) => new Uint8Array(view.buffer, view.byteOffset + offset, n);
+        wafer.lotId = text.decode(bytes(lotLen)).replace(/\0+$/, '');
+        offset += lotLen;
+        wafer.productId = text.decode(bytes(productLen)).replace(/\0+$/, '');
+        offset += productLen;
+
+        const Bins = binBytes === 1 ? Uint8Array : Uint16Array;
+        const base = view.byteOffset + offset;
+        let size;
+        if (layout === 1) {
+            wafer.grid = new Bins(view.buffer, base, wafer.width * wafer.height);
+            size = wafer.grid.byteLength;
+        } else {
+            const n = wafer.dieCount;
+            wafer.x = new Int16Array(view.buffer, base, n);
+            wafer.y = new Int16Array(view.buffer, base + 2 * n, n);
+            wafer.bin = new Bins(view.buffer, base + 4 * n, n);
+            size = n * (4 + binBytes);
+        }
+        return [wafer, offset + size + (size % 2)];
+    }
+
+    // Heatmap rows (null where there is no die), e.g. for Plotly z
+    function toRows(wafer) {
+        const rows = [];
+        for (let r = 0; r < wafer.height; r++) rows.push(new Array(wafer.width).fill(null));
+        if (wafer.grid) {
+            wafer.grid.forEach((b, i) => {
+                if (b !== wafer.empty) rows[Math.floor(i / wafer.width)][i % wafer.width] = b;
+            });
+        } else {
+            wafer.bin.forEach((b, i) => { rows[wafer.y[i] - wafer.y0][wafer.x[i] - wafer.x0] = b; });
+        }
+        return rows;
+    }
+
+    function decode(buffer) {
+        const view = new DataView(buffer);
+        if (magic(view, 0) === 'SWM1') return [decodeWafer(view, 0)[0]];
+        if (magic(view, 0) !== 'SWL1') throw new Error('Not a wafer map payload');
+        const wafers = [];
+        let offset = 8;
+        for (let i = view.getUint32(4, true); i > 0; i--) {
+            const [wafer, next] = decodeWafer(view, offset);
+            wafers.push(wafer);
+            offset = next;
+        }
+        return wafers;
+    }
+
+    global.SonarWaferMap = { decode, toRows };
+})(window);
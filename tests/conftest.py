@@ -0,0 +1,68 @@
+"""
+Shared fixtures: a small SQLite database loaded from a synthetic dataset,
+with the latency-injecting proxy in front of it.
+"""
+import os
+
+# Keep test runs out of the host-wide cache file under data/
+os.environ.setdefault("SHARED_CACHE_ENABLED", "false")
+
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.services.latency_injection import LatencyInjectingDBService, LatencyProfile
+from app.services.sqlite_db import SQLiteDBService
+from app.services.synthetic_dataset import SyntheticDataset, generate_dataset, product_names
+
+# Every injected call takes exactly this long (median == p99)
+INJECTED_LATENCY_MS = 300.0
+
+
+def _quiet(*_args):
+    pass
+
+
+@pytest.fixture(scope="session")
+def sqlite_service(tmp_path_factory):
+    root = tmp_path_factory.mktemp("sonar")
+    generate_dataset(root / "dataset", products=1, days=30, wafers_per_day=40, map_days=1, log=_quiet)
+    service = SQLiteDBService(str(root / "sonar.db"))
+    service.load_dataset(SyntheticDataset(root / "dataset"), log=_quiet)
+    yield service
+    service.engine.dispose()
+
+
+@pytest.fixture
+def product_id():
+    return product_names(1)[0]
+
+
+@pytest.fixture
+def trend_range():
+    end_date = date.today()
+    return end_date - timedelta(days=7), end_date
+
+
+@pytest.fixture
+def slow_db(sqlite_service):
+    """The SQLite service behind a fresh latency-injection proxy"""
+    return LatencyInjectingDBService(
+        sqlite_service,
+        LatencyProfile(median_ms=INJECTED_LATENCY_MS, p99_ms=INJECTED_LATENCY_MS)
+    )
+
+
+@pytest.fixture
+def statements(sqlite_service):
+    """SQL statements sent to the database while the test runs"""
+    executed = []
+
+    def record(_conn, _cursor, statement, *_args):
+        executed.append(statement)
+
+    engine = sqlite_service.engine
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
@@ -0,0 +1,74 @@
+import pytest
+from starlette.requests import Request
+
+from app.api.caching import _etag_matches, make_etag
+
+httpx = pytest.importorskip("httpx")
+
+
+def _request(query: str) -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/partials/yield-chart", "query_string": query.encode(), "headers": []})
+
+
+def test_etag_ignores_stats_token_only():
+    etag = make_etag(_request("product_id=P&aggregation=weekly"), "watermark")
+
+    assert make_etag(_request("aggregation=weekly&product_id=P&stats_token=abc"), "watermark") == etag
+    assert make_etag(_request("product_id=P&aggregation=monthly"), "watermark") != etag
+    assert make_etag(_request("product_id=P&aggregation=weekly"), "newer watermark") != etag
+    assert etag.startswith('W/"')
+
+
+def test_if_none_match_forms():
+    etag = 'W/"abc"'
+    assert _etag_matches('W/"abc"', etag)
+    assert _etag_matches('"abc"', etag)
+    assert _etag_matches('W/"old", W/"abc"', etag)
+    assert _etag_matches("*", etag)
+    assert not _etag_matches('W/"old"', etag)
+
+
+@pytest.fixture
+def client():
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    return TestClient(app)
+
+
+def test_chart_partial_revalidates_across_stats_tokens(client):
+    params = {"product_id": "PRODUCT-A", "aggregation": "weekly"}
+    first = client.get("/partials/yield-chart", params=params)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "private, no-cache"
+
+    # The token the page sends back does not change what the chart shows
+    token = first.text.split('name="stats_token" value="')[1].split('"')[0]
+    with_token = client.get("/partials/yield-chart", params={**params, "stats_token": token})
+    assert with_token.status_code == 200
+    assert with_token.headers["etag"] == etag
+
+    revalidated = client.get(
+        "/partials/yield-chart", params={**params, "stats_token": token}, headers={"If-None-Match": etag}
+    )
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["etag"] == etag
+    assert revalidated.headers["vary"] == "Accept-Encoding"
+
+    other = client.get(
+        "/partials/yield-chart", params={**params, "aggregation": "monthly"}, headers={"If-None-Match": etag}
+    )
+    assert other.status_code == 200
+
+
+def test_trend_api_answers_304(client):
+    params = {"product_id": "PRODUCT-A"}
+    first = client.get("/api/v1/yield/trend", params=params)
+    assert first.status_code == 200
+
+    revalidated = client.get("/api/v1/yield/trend", params=params, headers={"If-None-Match": first.headers["etag"]})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == first.headers["etag"]
@@ -0,0 +1,69 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+
+from app.api.cancellation import cancellable
+from app.services.cancellation import CancelToken, Cancelled, reset_current_token, set_current_token
+
+httpx = pytest.importorskip("httpx")
+
+# Takes several seconds unless interrupted
+SLOW_QUERY = """
+    WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n)
+    SELECT COUNT(*) FROM (SELECT x FROM n LIMIT 20000000)
+"""
+
+
+def test_cancel_interrupts_running_statement(sqlite_service):
+    engine = sqlite_service.engine
+    token = CancelToken()
+    timer = threading.Timer(0.2, token.cancel, ("disconnected",))
+    reset = set_current_token(token)
+    started = time.perf_counter()
+    timer.start()
+    try:
+        with pytest.raises(Cancelled):
+            with engine.connect() as conn:
+                conn.execute(text(SLOW_QUERY))
+    finally:
+        reset_current_token(reset)
+        timer.cancel()
+
+    assert time.perf_counter() - started < 2.0
+    # The interrupted connection went back to the pool and still works
+    assert engine.pool.checkedout() == 0
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT 1")).scalar() == 1
+
+
+def test_superseded_request_answers_204(slow_db, product_id, trend_range):
+    app = FastAPI()
+
+    @app.get("/trend")
+    @cancellable
+    async def trend(request: Request):
+        data = await run_in_threadpool(slow_db.get_cp_yield_trend, product_id, *trend_range)
+        return JSONResponse({"rows": len(data)})
+
+    # What HTMX sends for two refreshes of the same element from one tab
+    headers = {"X-Client-Id": "tab-1", "HX-Target": "yield-chart-container"}
+
+    async def refresh_twice():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = asyncio.create_task(client.get("/trend", headers=headers))
+            await asyncio.sleep(0.1)
+            second = await client.get("/trend", headers=headers)
+            return await first, second
+
+    first, second = asyncio.run(refresh_twice())
+
+    assert first.status_code == 204
+    assert second.status_code == 200
+    assert second.json()["rows"] > 0
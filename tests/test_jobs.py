@@ -0,0 +1,30 @@
+import threading
+
+import pytest
+
+from app.services.jobs import JobQueue, JobQueueFull
+
+
+@pytest.fixture
+def queue():
+    gate = threading.Event()
+    queue = JobQueue(workers=1, max_pending=2)
+    queue.register("wait", lambda job, n: gate.wait(5) and n)
+    yield queue
+    gate.set()
+
+
+def test_params_are_checked_against_the_handler(queue):
+    with pytest.raises(ValueError, match="missing a required argument"):
+        queue.submit("wait", {})
+    with pytest.raises(ValueError, match="unexpected keyword argument"):
+        queue.submit("wait", {"n": 1, "extra": 2})
+
+
+def test_submissions_beyond_max_pending_are_refused(queue):
+    first = queue.submit("wait", {"n": 1})
+    queue.submit("wait", {"n": 2})
+    with pytest.raises(JobQueueFull):
+        queue.submit("wait", {"n": 3})
+    # An identical job is still returned rather than refused
+    assert queue.submit("wait", {"n": 1}) is first
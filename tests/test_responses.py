@@ -0,0 +1,21 @@
+from datetime import date
+
+import numpy as np
+from fastapi.responses import JSONResponse
+
+from app.api.responses import FastJSONResponse
+
+
+def test_matches_json_response_for_finite_content():
+    content = {"name": "Ölçüm 歩留まり", "values": [1, 2.5, None], "nested": {"ok": True}}
+    assert FastJSONResponse(content).body == JSONResponse(content).body
+
+
+def test_numpy_and_dates():
+    body = FastJSONResponse({"x": np.arange(3, dtype=np.int16), "mean": np.float64(1.5), "day": date(2026, 1, 2)}).body
+    assert body == b'{"x":[0,1,2],"mean":1.5,"day":"2026-01-02"}'
+
+
+def test_non_finite_floats_become_null():
+    body = FastJSONResponse({"a": float("nan"), "b": [np.float64("inf")], "c": np.array([1.0, np.nan])}).body
+    assert body == b'{"a":null,"b":[null],"c":[1.0,null]}'
@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+from app.services.settings_store import SettingsStore
+
+YEAR = {f"2026-{m:02d}": 90.0 + m / 10 for m in range(1, 13)}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SettingsStore(str(tmp_path / "settings.db"))
+
+
+def test_bulk_save_is_one_transaction(store):
+    before = store.version
+    statements = []
+    store._connect().set_trace_callback(statements.append)
+
+    store.set_targets("PRODUCT-A", YEAR)
+
+    assert store.version == before + 1
+    assert sum(s.startswith("BEGIN") for s in statements) == 1
+    assert [store.get_target("PRODUCT-A", month) for month in YEAR] == list(YEAR.values())
+
+
+def test_failed_bulk_save_changes_nothing(store):
+    store.set_targets("PRODUCT-A", {"2026-01": 95.0})
+    before = store.version
+
+    with pytest.raises(ValueError):
+        store.set_targets("PRODUCT-A", {"2026-01": 80.0, "2026-02": "n/a"})
+
+    assert store.version == before
+    assert store.get_target("PRODUCT-A", "2026-01") == 95.0
+    assert store.get_target("PRODUCT-A", "2026-02") is None
+
+
+def test_other_store_on_the_same_file_sees_writes(store, tmp_path):
+    other = SettingsStore(str(tmp_path / "settings.db"))
+    assert other.get_product_active("PRODUCT-A") is False
+    version = other.version
+
+    store.set_product_active("PRODUCT-A", True)
+    store.set_targets("PRODUCT-A", YEAR)
+
+    assert other.version == version + 2
+    assert other.get_product_active("PRODUCT-A") is True
+    assert other.get_target("PRODUCT-A", "2026-12") == YEAR["2026-12"]
+
+
+def test_legacy_json_is_imported_once(tmp_path):
+    legacy = {
+        "product_active_states": {"PRODUCT-A": True, "PRODUCT-B": False},
+        "yield_targets": {"PRODUCT-A-2026-01": 98.5, "MULTI-PART-ID-2026-02": 97},
+    }
+    (tmp_path / "settings.json").write_text(json.dumps(legacy), encoding="utf-8")
+
+    store = SettingsStore(str(tmp_path / "settings.db"))
+    assert store.get_product_active("PRODUCT-A") is True
+    assert store.get_product_active("PRODUCT-B") is False
+    assert store.get_target("PRODUCT-A", "2026-01") == 98.5
+    assert store.get_target("MULTI-PART-ID", "2026-02") == 97.0
+    assert store.version == 1
+
+    # Settings changed since the import are not overwritten by the JSON file
+    store.set_target("PRODUCT-A", "2026-01", 99.0)
+    reopened = SettingsStore(str(tmp_path / "settings.db"))
+    assert reopened.get_target("PRODUCT-A", "2026-01") == 99.0
+    assert reopened.version == 2
+
+
+def test_unreadable_legacy_json_is_skipped(tmp_path, caplog):
+    (tmp_path / "settings.json").write_text("{not json", encoding="utf-8")
+
+    store = SettingsStore(str(tmp_path / "settings.db"))
+
+    assert store.version == 0
+    assert "Could not read legacy settings" in caplog.text
@@ -0,0 +1,46 @@
+import pickle
+import sqlite3
+from datetime import date, datetime
+
+import numpy as np
+
+from app.services.shared_cache import SharedCache, dumps, loads
+
+
+class _Exploit:
+    def __reduce__(self):
+        return (exec, ("raise SystemExit('unpickled')",))
+
+
+def test_values_round_trip():
+    value = {
+        "daily_trends": [{"date": date(2026, 1, 2), "mean_yield": np.float64(91.5), "wafers": np.int64(25)}],
+        "regist_date": datetime(2026, 1, 2, 3, 4, 5),
+        "bin": np.arange(12, dtype=np.uint16).reshape(3, 4),
+        ("LOT-001", 3): (1, "a"),
+        "__date__": "not a tag",
+    }
+    decoded = loads(dumps(value))
+
+    assert decoded["daily_trends"] == [{"date": date(2026, 1, 2), "mean_yield": 91.5, "wafers": 25}]
+    assert decoded["regist_date"] == value["regist_date"]
+    assert decoded["bin"].dtype == np.uint16 and decoded["bin"].shape == (3, 4)
+    assert np.array_equal(decoded["bin"], value["bin"])
+    assert decoded[("LOT-001", 3)] == (1, "a")
+    assert decoded["__date__"] == "not a tag"
+
+
+def test_pickled_entries_are_discarded_not_loaded(tmp_path):
+    cache = SharedCache(str(tmp_path / "cache.db"), 1 << 20)
+    cache.set("stats", {"mean": 1.0}, ttl=60)
+    with sqlite3.connect(str(tmp_path / "cache.db")) as conn:
+        conn.execute("UPDATE entries SET value = ?", (pickle.dumps(_Exploit()),))
+
+    assert cache.get("stats") is None
+    assert not cache.contains("stats")
+
+
+def test_unsupported_values_are_not_shared(tmp_path):
+    cache = SharedCache(str(tmp_path / "cache.db"), 1 << 20)
+    cache.set("obj", object(), ttl=60)
+    assert cache.get("obj") is None
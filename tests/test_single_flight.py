@@ -0,0 +1,87 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.services.cancellation import CancelToken, Cancelled, reset_current_token, set_current_token
+from app.services.single_flight import SingleFlight
+
+
+def test_leader_and_follower_share_one_query(slow_db, product_id, trend_range, statements):
+    expected = slow_db.get_cp_yield_trend(product_id, *trend_range)
+    assert expected
+    per_call = len(statements)
+    statements.clear()
+
+    barrier = threading.Barrier(2)
+
+    def call():
+        barrier.wait()
+        return slow_db.get_cp_yield_trend(product_id, *trend_range)
+
+    with ThreadPoolExecutor(2) as pool:
+        results = [f.result(timeout=10) for f in [pool.submit(call) for _ in range(2)]]
+
+    assert results == [expected, expected]
+    assert len(statements) == per_call
+
+    # Each caller got its own copy: mutating one leaves the other intact
+    assert results[0] is not results[1]
+    results[0][0]["PASS_CHIP_RATE"] = -1.0
+    results[0].clear()
+    assert results[1] == expected
+
+
+def test_follower_reruns_after_leader_is_cancelled(slow_db, product_id, trend_range, statements):
+    token = CancelToken()
+
+    def leader():
+        reset = set_current_token(token)
+        try:
+            return slow_db.get_cp_yield_trend(product_id, *trend_range)
+        finally:
+            reset_current_token(reset)
+
+    with ThreadPoolExecutor(2) as pool:
+        lead = pool.submit(leader)
+        # Both are inside the leader's injected latency when it is cancelled
+        time.sleep(0.1)
+        follow = pool.submit(slow_db.get_cp_yield_trend, product_id, *trend_range)
+        time.sleep(0.1)
+        token.cancel("superseded")
+
+        with pytest.raises(Cancelled):
+            lead.result(timeout=10)
+        result = follow.result(timeout=10)
+
+    assert result
+    # The follower ran the query itself instead of sharing the cancellation
+    per_call = len(statements) // 2
+    assert per_call > 0 and len(statements) == 2 * per_call
+
+
+def test_shared_results_are_isolated_between_callers():
+    flight = SingleFlight("test.isolation")
+    started, release = threading.Event(), threading.Event()
+
+    def compute():
+        started.set()
+        release.wait(5)
+        return {"statistics": {"mean": 90.0}, "daily_trends": [{"mean_yield": 90.0}]}
+
+    with ThreadPoolExecutor(2) as pool:
+        leader = pool.submit(flight.do, "key", compute)
+        started.wait(5)
+        follower = pool.submit(flight.do, "key", compute)
+        # The follower has joined once it is counted on the in-flight call
+        deadline = time.monotonic() + 5
+        while flight._calls["key"].followers == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        release.set()
+        (lead, lead_shared), (follow, follow_shared) = leader.result(5), follower.result(5)
+
+    assert (lead_shared, follow_shared) == (False, True)
+    lead["statistics"]["target"] = 95.0
+    lead["daily_trends"][0]["mean_yield"] = 0.0
+    assert follow == {"statistics": {"mean": 90.0}, "daily_trends": [{"mean_yield": 90.0}]}
@@ -0,0 +1,95 @@
+import zlib
+
+import numpy as np
+import pytest
+
+from app.services import wafer_codec
+
+httpx = pytest.importorskip("httpx")
+
+
+def _wafer(x, y, bins, wafer_id=7):
+    return wafer_codec.as_arrays({"lot_id": "LOT-001", "wafer_id": wafer_id, "product_id": "PRODUCT-A", "x": x, "y": y, "bin": bins})
+
+
+def _dies(wafer):
+    # The grid layout returns dies in row order, so compare sorted (x, y, bin)
+    return sorted(zip(wafer["x"].tolist(), wafer["y"].tolist(), wafer["bin"].tolist()))
+
+
+def _assert_same_wafer(decoded, wafer):
+    assert (decoded["lot_id"], decoded["wafer_id"], decoded["product_id"]) == ("LOT-001", wafer["wafer_id"], "PRODUCT-A")
+    assert _dies(decoded) == _dies(wafer)
+
+
+@pytest.mark.parametrize("layout", [wafer_codec.LAYOUT_GRID, wafer_codec.LAYOUT_COORDS])
+@pytest.mark.parametrize("max_bin, dtype", [(9, np.uint8), (300, np.uint16)])
+def test_wafer_round_trip(layout, max_bin, dtype):
+    xs, ys = np.meshgrid(np.arange(-5, 6), np.arange(-4, 5))
+    bins = np.arange(xs.size) % 10
+    bins[0] = max_bin
+    wafer = _wafer(xs.ravel(), ys.ravel(), bins)
+    body = b"".join(wafer_codec.encode_wafer(wafer, layout))
+    assert len(body) % 2 == 0
+
+    decoded, end = wafer_codec.decode_wafer(body)
+
+    assert end == len(body)
+    assert decoded["x"].dtype == np.int16 and decoded["y"].dtype == np.int16
+    assert decoded["bin"].dtype == dtype
+    assert decoded["x"].shape == decoded["y"].shape == decoded["bin"].shape == (xs.size,)
+    _assert_same_wafer(decoded, wafer)
+
+
+def test_lot_round_trip_picks_the_smaller_layout():
+    xs, ys = np.meshgrid(np.arange(20), np.arange(20))
+    dense = _wafer(xs.ravel(), ys.ravel(), np.ones(xs.size), wafer_id=1)
+    sparse = _wafer([0, 100], [0, 100], [1, 2], wafer_id=2)
+    empty = _wafer([], [], [], wafer_id=3)
+    body = wafer_codec.encode_lot([dense, sparse, empty])
+
+    decoded = wafer_codec.decode_lot(body)
+
+    assert [w["wafer_id"] for w in decoded] == [1, 2, 3]
+    for wafer, original in zip(decoded, [dense, sparse, empty]):
+        _assert_same_wafer(wafer, original)
+    layouts = [wafer_codec.encode_wafer(w)[0][4] for w in (dense, sparse)]
+    assert layouts == [wafer_codec.LAYOUT_GRID, wafer_codec.LAYOUT_COORDS]
+
+
+def test_rejects_other_buffers():
+    with pytest.raises(ValueError):
+        wafer_codec.decode_lot(b"JSON" + bytes(4))
+
+
+@pytest.mark.parametrize("accept_encoding, deflated", [
+    ("deflate", True),
+    ("gzip, deflate;q=0.5", True),
+    ("deflate;q=0", False),
+    ("identity", False),
+])
+def test_lot_maps_endpoint(accept_encoding, deflated):
+    from fastapi.testclient import TestClient
+
+    from app.api.deps import get_db_service
+    from app.main import app
+
+    db_service = get_db_service()
+    lot_id = db_service.get_lots("PRODUCT-A")[0]
+    client = TestClient(app)
+
+    response = client.get(
+        "/api/v1/wafer/lot_maps", params={"lot_id": lot_id, "format": "binary"},
+        headers={"Accept-Encoding": accept_encoding}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == wafer_codec.MEDIA_TYPE
+    assert response.headers["vary"] == "Accept, Accept-Encoding"
+    assert response.headers.get("content-encoding") == ("deflate" if deflated else None)
+    # httpx has already undone the deflate; the body decodes either way
+    decoded = wafer_codec.decode_lot(response.content)
+    expected = db_service.get_lot_wafer_arrays(lot_id)
+    assert [w["wafer_id"] for w in decoded] == [w["wafer_id"] for w in expected]
+    for wafer, original in zip(decoded, expected):
+        assert _dies(wafer) == _dies(wafer_codec.as_arrays(original))
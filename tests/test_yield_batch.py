@@ -0,0 +1,78 @@
+from datetime import date, timedelta
+
+from app.models.yield_data import YieldTrendSpec
+from app.services.yield_batch import ordered_results, plan_ranges, run_range, submit_batch
+
+
+def _spec(product_id, start, end):
+    return YieldTrendSpec(product_id=product_id, start_date=start, end_date=end)
+
+
+def _plan(specs):
+    return sorted(
+        (r.product_id, r.start_date, r.end_date, sorted(i for i, _, _ in r.members))
+        for r in plan_ranges(specs)
+    )
+
+
+def test_overlapping_and_adjacent_ranges_merge():
+    d = date(2026, 3, 1)
+    specs = [
+        _spec("A", d, d + timedelta(days=5)),
+        _spec("A", d + timedelta(days=3), d + timedelta(days=9)),    # overlaps
+        _spec("A", d + timedelta(days=10), d + timedelta(days=12)),  # starts the day after
+        _spec("A", d + timedelta(days=14), d + timedelta(days=15)),  # one-day gap
+    ]
+    assert _plan(specs) == [
+        ("A", d, d + timedelta(days=12), [0, 1, 2]),
+        ("A", d + timedelta(days=14), d + timedelta(days=15), [3]),
+    ]
+
+
+def test_duplicates_and_contained_ranges_share_one_range():
+    d = date(2026, 3, 1)
+    specs = [
+        _spec("A", d, d + timedelta(days=30)),
+        _spec("A", d, d + timedelta(days=30)),
+        _spec("A", d + timedelta(days=7), d + timedelta(days=8)),
+        _spec("B", d, d + timedelta(days=30)),
+    ]
+    assert _plan(specs) == [
+        ("A", d, d + timedelta(days=30), [0, 1, 2]),
+        ("B", d, d + timedelta(days=30), [3]),
+    ]
+
+
+def test_defaults_match_the_single_product_endpoint():
+    today = date.today()
+    (covering,) = plan_ranges([YieldTrendSpec(product_id="A"), _spec("A", today - timedelta(days=30), today)])
+    assert (covering.start_date, covering.end_date) == (today - timedelta(days=30), today)
+    assert len(covering.members) == 2
+
+
+def test_batch_cuts_each_spec_from_one_query(sqlite_service, product_id, statements):
+    today = date.today()
+    specs = [
+        _spec(product_id, today - timedelta(days=20), today - timedelta(days=10)),
+        _spec(product_id, today - timedelta(days=14), today - timedelta(days=7)),
+        _spec(product_id, today - timedelta(days=14), today - timedelta(days=7)),
+    ]
+    ranges = plan_ranges(specs)
+    assert len(ranges) == 1
+
+    # Each spec on its own, for comparison
+    statements.clear()
+    alone = [run_range(sqlite_service, lambda *_: None, covering)[0] for covering in plan_ranges(specs[:1])]
+    per_query = len(statements)
+    alone += [run_range(sqlite_service, lambda *_: None, covering)[0] for covering in plan_ranges(specs[1:2])]
+    statements.clear()
+
+    results = ordered_results(submit_batch(sqlite_service, lambda *_: None, ranges), len(specs))
+
+    assert per_query > 0 and len(statements) == per_query
+    assert [r.index for r in results] == [0, 1, 2]
+    assert all(r.error is None for r in results)
+    for result, expected in zip(results, alone + alone[1:]):
+        assert result.trend.daily_trends == expected.trend.daily_trends
+    days = [t.date for t in results[0].trend.daily_trends]
+    assert days and min(days) >= specs[0].start_date and max(days) <= specs[0].end_date